@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+"""
+核心接口压测与延迟基准测试
+
+在独立的测试数据库(SQLite或本地MySQL的test_<库名>)中用factory_boy生成租户、用户、文章、评论、
+打卡记录、菜单和API日志，然后通过完整的中间件链依次请求核心接口，统计每个接口的
+p50/p95/p99延迟、每个请求的SQL次数和吞吐量，结果写入JSON文件，便于对比不同版本
+
+延迟包含Django测试客户端构造请求的开销，不包含网络传输，只适合在同一台机器上横向对比
+
+用法:
+    python benchmarks/api_endpoints.py [--tenants 2] [--articles 200] [--requests 200]
+        [--endpoints article_list,article_detail] [--output result.json] [--compare baseline.json]
+        [--keepdb] [--clear-cache]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+
+import django
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import factory.random
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from benchmarks.factories import (
+    DEFAULT_PASSWORD, APILogFactory, ArticleFactory, CategoryFactory, CheckRecordFactory, CommentFactory,
+    MenuFactory, TaskFactory, TenantFactory, UserFactory
+)
+from cms.models import Article
+from menus.models import Menu, UserMenu
+from tenants.models import Tenant
+from users.models import User
+
+# 基准测试数据的租户代码前缀，--keepdb时据此判断是否已生成数据
+TENANT_CODE_PREFIX = 'bench_tenant_'
+
+
+class QueryCounter:
+    """
+    统计SQL次数的connection.execute_wrapper
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def seed(args, rng):
+    """
+    生成基准测试数据
+
+    Args:
+        args: 命令行参数
+        rng: 随机数生成器
+    """
+    menus = []
+    for index in range(args.menus):
+        # 约三分之一为一级菜单，其余挂在已有的一级菜单下
+        parent = None
+        roots = [menu for menu in menus if menu.parent_id is None]
+        if roots and index % 3:
+            parent = rng.choice(roots)
+        menus.append(MenuFactory(parent=parent))
+
+    for tenant_index in range(args.tenants):
+        tenant = TenantFactory()
+        admin = UserFactory(tenant=tenant, username=f'bench_admin_{tenant_index}', is_admin=True, is_member=False)
+        users = [admin] + UserFactory.create_batch(max(args.users - 1, 0), tenant=tenant)
+
+        UserMenu.objects.bulk_create([UserMenu(user=admin, menu=menu) for menu in menus])
+
+        categories = []
+        for index in range(args.categories):
+            parent = rng.choice(categories) if categories and index % 4 else None
+            categories.append(CategoryFactory(tenant=tenant, parent=parent))
+
+        articles = []
+        for _index in range(args.articles):
+            picked = rng.sample(categories, min(len(categories), rng.randint(1, 2))) if categories else []
+            articles.append(ArticleFactory(author=rng.choice(users), categories=picked))
+
+        for article in articles:
+            for _index in range(args.comments):
+                CommentFactory(article=article, user=rng.choice(users))
+
+        today = timezone.localdate()
+        for user in users:
+            task = TaskFactory(user=user)
+            for day in range(1, args.check_records + 1):
+                CheckRecordFactory(task=task, check_date=today - datetime.timedelta(days=day))
+
+        for _index in range(args.api_logs):
+            APILogFactory(user=rng.choice(users))
+
+
+def login(client, username):
+    """
+    通过登录接口获取访问令牌
+
+    Returns:
+        str: access_token
+    """
+    response = client.post(
+        '/api/v1/auth/login/', {'username': username, 'password': DEFAULT_PASSWORD}, content_type='application/json'
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"登录失败({response.status_code}): {response.content[:300]!r}")
+    return response.json()['data']['token']
+
+
+def build_contexts():
+    """
+    为每个基准测试租户准备已登录的客户端和请求用到的数据
+
+    Returns:
+        list: 每个租户一个dict
+    """
+    contexts = []
+    tenants = Tenant.objects.filter(code__startswith=TENANT_CODE_PREFIX).order_by('id')
+    for tenant in tenants:
+        admin = User.objects.filter(tenant=tenant, is_admin=True).order_by('id').first()
+        client = Client()
+        token = login(client, admin.username)
+        # 新建一个没有打卡记录的任务，打卡接口按天向前递推日期，避免重复打卡
+        task = TaskFactory(user=admin, name=f'bench-{int(time.time() * 1000)}')
+        contexts.append({
+            'tenant': tenant,
+            'admin': admin,
+            'client': client,
+            'headers': {'HTTP_AUTHORIZATION': f'Bearer {token}', 'HTTP_X_TENANT_ID': str(tenant.id)},
+            'article_ids': list(
+                Article.objects.filter(tenant=tenant, status='published').values_list('id', flat=True)
+            ),
+            'task': task,
+        })
+    return contexts
+
+
+def _login_request(context, index):
+    return 'post', '/api/v1/auth/login/', {'username': context['admin'].username, 'password': DEFAULT_PASSWORD}, False
+
+
+def _article_list_request(context, index):
+    return 'get', '/api/v1/cms/articles/', {'status': 'published', 'page': index % 5 + 1}, True
+
+
+def _article_detail_request(context, index):
+    article_id = context['article_ids'][index % len(context['article_ids'])]
+    return 'get', f'/api/v1/cms/articles/{article_id}/', None, True
+
+
+def _category_tree_request(context, index):
+    return 'get', '/api/v1/cms/categories/tree/', None, True
+
+
+def _record_view_request(context, index):
+    article_id = context['article_ids'][index % len(context['article_ids'])]
+    return 'post', f'/api/v1/cms/articles/{article_id}/view/', {'session_id': f'bench-{index}', 'reading_time': 30}, True
+
+
+def _check_record_create_request(context, index):
+    check_date = timezone.localdate() - datetime.timedelta(days=index)
+    return 'post', '/api/v1/check-system/check-records/', {
+        'task': context['task'].id,
+        'user': context['admin'].id,
+        'check_date': check_date.isoformat(),
+        'check_time': '08:30:00',
+        'remarks': 'benchmark',
+    }, True
+
+
+def _user_menus_request(context, index):
+    return 'get', '/api/v1/menus/user/', None, True
+
+
+def _api_log_list_request(context, index):
+    return 'get', '/api/v1/common/api-logs/', {'page': index % 5 + 1}, True
+
+
+# 接口名称 -> 请求构造函数，返回(方法, 路径, 参数, 是否需要认证)
+ENDPOINTS = {
+    'login': _login_request,
+    'article_list': _article_list_request,
+    'article_detail': _article_detail_request,
+    'category_tree': _category_tree_request,
+    'record_view': _record_view_request,
+    'check_record_create': _check_record_create_request,
+    'user_menus': _user_menus_request,
+    'api_log_list': _api_log_list_request,
+}
+
+
+def send(context, name, index):
+    """
+    发送一个请求
+
+    Returns:
+        (response, 方法, 路径)
+    """
+    method, path, data, authenticated = ENDPOINTS[name](context, index)
+    headers = context['headers'] if authenticated else {}
+    client = context['client']
+    if method == 'get':
+        response = client.get(path, data, **headers)
+    else:
+        response = client.post(path, data, content_type='application/json', **headers)
+    return response, method.upper(), path
+
+
+def percentile(values, percent):
+    """
+    线性插值计算百分位数
+
+    Args:
+        values: 已排序的数值列表
+        percent: 0-100
+    """
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def run_endpoint(contexts, name, requests, warmup, clear_cache):
+    """
+    压测一个接口，请求按顺序轮流使用各个租户
+
+    Returns:
+        dict: 延迟、SQL次数、吞吐量和状态码分布
+    """
+    for index in range(warmup):
+        send(contexts[index % len(contexts)], name, requests + index)
+
+    latencies = []
+    queries = []
+    status_codes = {}
+    errors = 0
+    method = path = None
+    elapsed = 0.0
+    for index in range(requests):
+        context = contexts[index % len(contexts)]
+        if clear_cache:
+            cache.clear()
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(counter))
+            start = time.perf_counter()
+            response, method, path = send(context, name, index // len(contexts))
+            duration = time.perf_counter() - start
+
+        elapsed += duration
+        latencies.append(duration * 1000)
+        queries.append(counter.count)
+        status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+        if response.status_code >= 400:
+            errors += 1
+            if errors == 1:
+                print(f"[{name}] {response.status_code}: {response.content[:300]!r}", file=sys.stderr)
+
+    latencies.sort()
+    return {
+        'method': method,
+        'path': path,
+        'requests': requests,
+        'errors': errors,
+        'status_codes': status_codes,
+        'latency_ms': {
+            'min': round(latencies[0], 3),
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+        'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def get_environment():
+    """
+    记录运行环境，便于判断两次结果是否可比
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'settings': os.environ.get('DJANGO_SETTINGS_MODULE'),
+        'platform': platform.platform(),
+    }
+
+
+def print_table(results):
+    print(f"{'接口':<22}{'请求数':>8}{'错误':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'SQL/请求':>10}{'吞吐(rps)':>11}")
+    for name, result in results.items():
+        latency = result['latency_ms']
+        print(
+            f"{name:<22}{result['requests']:>8}{result['errors']:>6}{latency['p50']:>10.2f}{latency['p95']:>10.2f}"
+            f"{latency['p99']:>10.2f}{result['queries']['mean']:>10.1f}{result['throughput_rps']:>11.1f}"
+        )
+
+
+def print_comparison(results, baseline_path):
+    """
+    与之前的结果对比p50/p95/p99和SQL次数
+    """
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)['endpoints']
+
+    print(f"\n与 {baseline_path} 对比(变化百分比，负数表示更快)")
+    print(f"{'接口':<22}{'p50':>10}{'p95':>10}{'p99':>10}{'SQL/请求':>16}")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        changes = []
+        for key in ('p50', 'p95', 'p99'):
+            before = old['latency_ms'][key]
+            changes.append(f"{(result['latency_ms'][key] - before) / before * 100:+.1f}%" if before else 'n/a')
+        queries = f"{old['queries']['mean']:.1f} -> {result['queries']['mean']:.1f}"
+        print(f"{name:<22}{changes[0]:>10}{changes[1]:>10}{changes[2]:>10}{queries:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='核心接口压测与延迟基准测试')
+    parser.add_argument('--tenants', type=int, default=2, help='租户数量')
+    parser.add_argument('--users', type=int, default=20, help='每个租户的用户数量(包括一个管理员)')
+    parser.add_argument('--categories', type=int, default=30, help='每个租户的分类数量')
+    parser.add_argument('--articles', type=int, default=200, help='每个租户的文章数量')
+    parser.add_argument('--comments', type=int, default=3, help='每篇文章的评论数量')
+    parser.add_argument('--check-records', type=int, default=30, help='每个用户的历史打卡记录数量')
+    parser.add_argument('--menus', type=int, default=30, help='菜单数量，全部分配给各租户管理员')
+    parser.add_argument('--api-logs', type=int, default=1000, help='每个租户的API日志数量')
+    parser.add_argument('--requests', type=int, default=200, help='每个接口的请求次数')
+    parser.add_argument('--warmup', type=int, default=10, help='每个接口正式计时前的预热请求次数')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='逗号分隔的接口名称')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--keepdb', action='store_true', help='保留测试数据库，已有数据时跳过生成')
+    parser.add_argument('--clear-cache', action='store_true', help='每个请求前清空缓存，测量未命中缓存的路径')
+    parser.add_argument('--output', help='JSON结果文件，默认写入logs/benchmarks/')
+    parser.add_argument('--compare', help='用于对比的历史JSON结果文件')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"未知的接口: {', '.join(unknown)}，可选: {', '.join(ENDPOINTS)}")
+
+    setup_test_environment(debug=False)
+    # 在test_<库名>中运行，不影响配置的数据库
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=args.keepdb)
+    try:
+        rng = random.Random(args.seed)
+        factory.random.reseed_random(args.seed)
+        if not Tenant.objects.filter(code__startswith=TENANT_CODE_PREFIX).exists():
+            start = time.perf_counter()
+            seed(args, rng)
+            print(f"生成测试数据耗时 {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        contexts = build_contexts()
+        cache.clear()
+        results = {}
+        for name in names:
+            results[name] = run_endpoint(contexts, name, args.requests, args.warmup, args.clear_cache)
+
+        report = {
+            'benchmark': 'api_endpoints',
+            'created_at': timezone.now().isoformat(),
+            'environment': get_environment(),
+            'config': {
+                key: getattr(args, key) for key in (
+                    'tenants', 'users', 'categories', 'articles', 'comments', 'check_records', 'menus',
+                    'api_logs', 'requests', 'warmup', 'seed', 'clear_cache'
+                )
+            },
+            'data': {
+                'tenants': Tenant.objects.filter(code__startswith=TENANT_CODE_PREFIX).count(),
+                'articles': Article.objects.count(),
+                'menus': Menu.objects.count(),
+            },
+            'endpoints': results,
+        }
+    finally:
+        if not args.keepdb:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = args.output or os.path.join(
+        BASE_DIR, 'logs', 'benchmarks', f"api_endpoints_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=2)
+
+    print_table(results)
+    print(f"\n结果已写入 {output}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
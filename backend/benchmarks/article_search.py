@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+文章全文检索基准测试
+
+在独立的测试数据库中批量生成中文文章并建立倒排索引，对比每次检索的耗时(毫秒):
+- LIKE: 旧实现，SearchFilter对标题、内容、摘要做 LIKE '%词%' 扫描
+- 倒排索引: search_article_ids，按(租户, 词元)索引分组计分
+
+用法:
+    python benchmarks/article_search.py [--articles 5000] [--repeat 20] [--keepdb]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import factory.random
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import setup_test_environment
+from faker import Faker
+
+from benchmarks.factories import TenantFactory, UserFactory
+from cms.models import Article, ArticleSearchToken
+from cms.search import rebuild_index, search_article_ids
+
+QUERIES = ['新闻', '发布会', '政策 经济', '市场', '技术发展', '学']
+
+
+def seed(total, seed_value):
+    """
+    批量生成文章(不触发信号)并重建索引
+    """
+    fake = Faker('zh_CN')
+    fake.seed_instance(seed_value)
+    tenant = TenantFactory()
+    author = UserFactory(tenant=tenant)
+    batch = []
+    for index in range(total):
+        batch.append(Article(
+            title=fake.sentence(), slug=f'bench-search-{index}', content=fake.text(max_nb_chars=2000),
+            status='published', author=author, tenant=tenant,
+        ))
+        if len(batch) == 1000:
+            Article.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Article.objects.bulk_create(batch)
+    for _articles, _tokens in rebuild_index(tenant.id, batch_size=500):
+        pass
+    return tenant
+
+
+def legacy_search(tenant_id, query):
+    condition = Q()
+    for term in query.split():
+        condition &= Q(title__icontains=term) | Q(content__icontains=term) | Q(excerpt__icontains=term)
+    return list(Article.objects.filter(condition, tenant_id=tenant_id).values_list('id', flat=True)[:1000])
+
+
+def index_search(tenant_id, query):
+    return search_article_ids(query, tenant_id)
+
+
+def run_case(label, func, tenant_id, query, repeat):
+    timings = []
+    for _index in range(repeat):
+        start = time.perf_counter()
+        matched = len(func(tenant_id, query))
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<24}{statistics.median(timings):>12.2f}{max(timings):>12.2f}{matched:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章全文检索基准测试')
+    parser.add_argument('--articles', type=int, default=5000, help='文章数量')
+    parser.add_argument('--repeat', type=int, default=20, help='每个检索词的重复次数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--keepdb', action='store_true', help='保留测试数据库，已有数据时跳过生成')
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=args.keepdb)
+    try:
+        factory.random.reseed_random(args.seed)
+        article = Article.objects.filter(slug='bench-search-0').first()
+        if article is None:
+            start = time.perf_counter()
+            tenant_id = seed(args.articles, args.seed).id
+            print(f"生成测试数据并建立索引耗时 {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        else:
+            tenant_id = article.tenant_id
+        print(f"文章 {Article.objects.filter(tenant_id=tenant_id).count()} 篇，"
+              f"词元 {ArticleSearchToken.objects.filter(tenant_id=tenant_id).count()} 行")
+
+        print(f"{'用例':<22}{'中位数(ms)':>12}{'最大(ms)':>12}{'命中':>10}")
+        for query in QUERIES:
+            run_case(f"{query}: LIKE", legacy_search, tenant_id, query, args.repeat)
+            run_case(f"{query}: 倒排索引", index_search, tenant_id, query, args.repeat)
+    finally:
+        if not args.keepdb:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+数据库连接复用基准测试
+
+模拟请求生命周期(request_started -> 查询 -> request_finished)，
+对比CONN_MAX_AGE=0与持久连接两种模式下的连接建立次数和单请求耗时
+
+用法:
+    python benchmarks/db_connections.py [--requests 500] [--max-age 60]
+"""
+import argparse
+import os
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.core.signals import request_started, request_finished
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+
+def run(requests, conn_max_age):
+    """
+    以指定的CONN_MAX_AGE模拟若干个请求
+
+    Returns:
+        (连接建立次数, 单请求平均耗时毫秒)
+    """
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+    opened = []
+
+    def on_connection_created(sender, **kwargs):
+        opened.append(1)
+
+    connection_created.connect(on_connection_created)
+    try:
+        start = time.perf_counter()
+        for _ in range(requests):
+            # 与WSGIHandler相同：请求开始和结束时调用close_old_connections
+            request_started.send(sender=None)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=None)
+        elapsed = time.perf_counter() - start
+    finally:
+        connection_created.disconnect(on_connection_created)
+        connection.close()
+
+    return len(opened), elapsed / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据库连接复用基准测试')
+    parser.add_argument('--requests', type=int, default=500, help='模拟的请求数')
+    parser.add_argument('--max-age', type=int, default=60, help='持久连接模式的CONN_MAX_AGE')
+    args = parser.parse_args()
+
+    print(f"数据库: {connection.vendor} {connection.settings_dict.get('HOST') or ''}")
+    print(f"模拟请求数: {args.requests}")
+    print(f"{'模式':<24}{'建立连接次数':>12}{'单请求耗时(ms)':>18}")
+
+    for label, max_age in (('CONN_MAX_AGE=0', 0), (f'CONN_MAX_AGE={args.max_age}', args.max_age)):
+        opened, per_request = run(args.requests, max_age)
+        print(f"{label:<24}{opened:>12}{per_request:>18.3f}")
+
+
+if __name__ == '__main__':
+    main()
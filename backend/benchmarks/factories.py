@@ -0,0 +1,180 @@
+"""
+基准测试数据工厂
+
+使用factory_boy/Faker生成租户、用户、文章、评论、打卡记录、菜单和API日志，
+导入前需要先完成django.setup()
+"""
+import datetime
+from functools import lru_cache
+
+import factory
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from check_system.models import CheckRecord, Task, TaskCategory
+from cms.models import Article, ArticleCategory, ArticleStatistics, Category, Comment
+from common.models import APILog
+from menus.models import Menu, UserMenu
+from tenants.models import Tenant, TenantQuota
+from users.models import User
+
+# 所有基准测试用户的登录密码
+DEFAULT_PASSWORD = 'Bench@123456'
+
+
+@lru_cache(maxsize=None)
+def get_password_hash():
+    """
+    只计算一次密码哈希，避免每创建一个用户都执行一次PBKDF2
+    """
+    return make_password(DEFAULT_PASSWORD)
+
+
+class TenantFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tenant
+
+    name = factory.Sequence(lambda n: f'bench-tenant-{n}')
+    code = factory.Sequence(lambda n: f'bench_tenant_{n}')
+    status = 'active'
+    contact_name = factory.Faker('name', locale='zh_CN')
+    contact_email = factory.Faker('email')
+
+    @factory.post_generation
+    def quota(obj, create, extracted, **kwargs):
+        # 默认配额只允许10个用户，基准测试需要更多
+        if create:
+            obj.ensure_quota()
+            TenantQuota.objects.filter(tenant=obj).update(max_users=100000, max_admins=1000)
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f'bench_user_{n}')
+    email = factory.LazyAttribute(lambda obj: f'{obj.username}@bench.local')
+    nick_name = factory.Faker('name', locale='zh_CN')
+    password = factory.LazyFunction(get_password_hash)
+    tenant = factory.SubFactory(TenantFactory)
+    is_admin = False
+    is_member = True
+    status = 'active'
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    name = factory.Faker('word', locale='zh_CN')
+    slug = factory.Sequence(lambda n: f'bench-category-{n}')
+    description = factory.Faker('sentence', locale='zh_CN')
+    sort_order = factory.Sequence(lambda n: n)
+    tenant = factory.SubFactory(TenantFactory)
+
+
+class ArticleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Article
+
+    title = factory.Faker('sentence', locale='zh_CN')
+    slug = factory.Sequence(lambda n: f'bench-article-{n}')
+    content = factory.Faker('text', max_nb_chars=2000, locale='zh_CN')
+    status = 'published'
+    visibility = 'public'
+    published_at = factory.Faker('date_time_between', start_date='-90d', tzinfo=datetime.timezone.utc)
+    author = factory.SubFactory(UserFactory)
+    tenant = factory.SelfAttribute('author.tenant')
+
+    @factory.post_generation
+    def statistics(obj, create, extracted, **kwargs):
+        # Article.save只在force_insert时创建统计记录
+        if create:
+            ArticleStatistics.objects.get_or_create(article=obj, defaults={'tenant': obj.tenant})
+
+    @factory.post_generation
+    def categories(obj, create, extracted, **kwargs):
+        if create and extracted:
+            ArticleCategory.objects.bulk_create([
+                ArticleCategory(article=obj, category=category, tenant=obj.tenant) for category in extracted
+            ])
+
+
+class CommentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Comment
+
+    article = factory.SubFactory(ArticleFactory)
+    user = factory.SubFactory(UserFactory)
+    content = factory.Faker('paragraph', locale='zh_CN')
+    status = 'approved'
+    ip_address = factory.Faker('ipv4')
+    tenant = factory.SelfAttribute('article.tenant')
+
+
+class TaskCategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = TaskCategory
+
+    name = factory.Sequence(lambda n: f'打卡类型{n}')
+    user = factory.SubFactory(UserFactory)
+    tenant = factory.SelfAttribute('user.tenant')
+
+
+class TaskFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Task
+
+    name = factory.Faker('sentence', nb_words=3, locale='zh_CN')
+    category = factory.SubFactory(TaskCategoryFactory, user=factory.SelfAttribute('..user'))
+    user = factory.SubFactory(UserFactory)
+    tenant = factory.SelfAttribute('user.tenant')
+    start_date = factory.LazyFunction(lambda: timezone.localdate() - datetime.timedelta(days=365))
+
+
+class CheckRecordFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CheckRecord
+
+    task = factory.SubFactory(TaskFactory)
+    user = factory.SelfAttribute('task.user')
+    check_date = factory.Sequence(lambda n: timezone.localdate() - datetime.timedelta(days=n % 365))
+    check_time = factory.Faker('time_object')
+    remarks = factory.Faker('sentence', locale='zh_CN')
+
+
+class MenuFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Menu
+
+    name = factory.Faker('word', locale='zh_CN')
+    code = factory.Sequence(lambda n: f'bench_menu_{n}')
+    path = factory.LazyAttribute(lambda obj: f'/{obj.code}')
+    component = factory.LazyAttribute(lambda obj: f'views/{obj.code}/index')
+    order = factory.Sequence(lambda n: n)
+    parent = None
+    is_active = True
+
+
+class UserMenuFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = UserMenu
+
+    user = factory.SubFactory(UserFactory)
+    menu = factory.SubFactory(MenuFactory)
+
+
+class APILogFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = APILog
+
+    user = factory.SubFactory(UserFactory)
+    tenant = factory.SelfAttribute('user.tenant')
+    ip_address = factory.Faker('ipv4')
+    request_method = factory.Iterator(['GET', 'GET', 'GET', 'POST', 'PUT', 'DELETE'])
+    request_path = factory.Iterator(['/api/v1/cms/articles/', '/api/v1/menus/user/', '/api/v1/check-system/check-records/'])
+    status_code = factory.Iterator([200, 200, 200, 201, 400, 500])
+    status_type = factory.LazyAttribute(lambda obj: 'success' if obj.status_code < 400 else 'error')
+    response_time = factory.Faker('pyint', min_value=5, max_value=800)
+    user_agent = factory.Faker('user_agent')
+    created_at = factory.Faker('date_time_between', start_date='-30d', tzinfo=datetime.timezone.utc)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+热路径日志开销基准测试
+
+在生产环境的日志级别(WARNING/INFO)下，对比每个请求的日志开销(微秒):
+- 租户请求: 租户中间件、set_current_tenant、3次TenantManager查询、视图集过滤
+- 租户API权限检查: 旧实现每次以WARNING级别输出请求头等7条日志
+- 打卡记录保存: 旧实现每次print
+
+旧实现使用f-string立即格式化，新实现使用HotPathLogger先判断级别再延迟格式化，
+输出写入内存，不包含磁盘IO
+
+用法:
+    python benchmarks/hot_path_logging.py [--repeat 20000]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.test import RequestFactory
+
+from common.utils.hot_path_logging import get_hot_logger
+
+TENANT = SimpleNamespace(id=3, pk=3, name='示例租户')
+USER = SimpleNamespace(id=42, username='member', is_super_admin=True, is_authenticated=True)
+
+middleware_logger = logging.getLogger('common.middleware.tenant_middleware')
+context_logger = logging.getLogger('common.utils.tenant_context')
+manager_logger = logging.getLogger('common.utils.tenant_manager')
+viewset_logger = logging.getLogger('common.viewsets')
+permission_logger = logging.getLogger('common.permissions')
+
+hot_middleware = get_hot_logger('common.middleware.tenant_middleware')
+hot_context = get_hot_logger('common.utils.tenant_context')
+hot_manager = get_hot_logger('common.utils.tenant_manager')
+hot_viewset = get_hot_logger('common.viewsets')
+hot_permission = get_hot_logger('common.permissions')
+hot_check_record = get_hot_logger('check_system.models')
+
+
+def legacy_tenant_request(request):
+    middleware_logger.debug(f"用户 {USER.username} 属于租户 {TENANT.name}")
+    context_logger.debug(f"设置当前租户: {TENANT.name} (ID: {TENANT.id})")
+    for _index in range(3):
+        manager_logger.debug(f"TenantManager: 过滤租户 {TENANT.name} (ID: {TENANT.id}) 的数据")
+    viewset_logger.debug(f"按租户ID过滤查询集: {TENANT.id}")
+    context_logger.debug("清除当前租户上下文")
+
+
+def hot_tenant_request(request):
+    hot_middleware.debug("用户 %s 属于租户 %s", USER.username, TENANT.id)
+    if hot_context.isEnabledFor(logging.DEBUG):
+        hot_context.debug("设置当前租户: %s (ID: %s)", TENANT.name, TENANT.id)
+    for _index in range(3):
+        hot_manager.debug("TenantManager: 过滤租户 %s 的数据", TENANT.pk)
+    hot_viewset.debug("按租户ID过滤查询集: %s", TENANT.id)
+    hot_context.debug("清除当前租户上下文")
+
+
+def legacy_tenant_permission(request):
+    permission_logger.warning(f"TenantApiPermission.has_permission被调用: 用户={USER.username}, 已认证={USER.is_authenticated}, 路径={request.path}")
+    permission_logger.warning(f"认证信息: {request.META.get('HTTP_AUTHORIZATION')}")
+    permission_logger.warning(f"请求头: {request.headers}")
+    permission_logger.warning(f"Authorization头: {request.META.get('HTTP_AUTHORIZATION', '')}")
+    permission_logger.warning(f"用户超级管理员状态: {USER.is_super_admin}")
+    permission_logger.warning(f"权限检查结果: {USER.is_super_admin}")
+
+
+def hot_tenant_permission(request):
+    hot_permission.debug("TenantApiPermission检查: 路径=%s", request.path)
+    request.META.get('HTTP_AUTHORIZATION', '')
+
+
+def legacy_check_record_save(request):
+    print(f"[CheckRecord] 用户 {USER.username} 为任务 {TENANT.name} 创建打卡记录")
+
+
+def hot_check_record_save(request):
+    hot_check_record.debug(
+        "[CheckRecord] 用户 %s %s任务 %s 的打卡记录 #%s", USER.id, '创建了', TENANT.id, 1,
+        extra={'user_id': USER.id, 'task_id': TENANT.id, 'check_record_id': 1},
+    )
+
+
+def run_case(label, func, request, repeat):
+    start = time.perf_counter()
+    for _index in range(repeat):
+        func(request)
+    elapsed = (time.perf_counter() - start) / repeat * 1_000_000
+    print(f"{label:<40}{elapsed:>12.3f}", file=sys.__stdout__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='热路径日志开销基准测试')
+    parser.add_argument('--repeat', type=int, default=20000, help='每个用例的调用次数')
+    args = parser.parse_args()
+
+    request = RequestFactory().get(
+        '/api/v1/tenants/', HTTP_AUTHORIZATION='Bearer ' + 'x' * 200, HTTP_X_TENANT_ID='3',
+        HTTP_USER_AGENT='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
+    )
+
+    # 与生产环境相同使用带格式的处理器，输出写入内存
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('{levelname} {asctime} {module} {message}', style='{'))
+    root = logging.getLogger()
+    root.addHandler(handler)
+
+    cases = [
+        ('租户请求', legacy_tenant_request, hot_tenant_request),
+        ('租户API权限检查', legacy_tenant_permission, hot_tenant_permission),
+        ('打卡记录保存', legacy_check_record_save, hot_check_record_save),
+    ]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for level in (logging.WARNING, logging.INFO):
+                root.setLevel(level)
+                print(f"\n日志级别 {logging.getLevelName(level)}", file=sys.__stdout__)
+                print(f"{'用例':<36}{'每次耗时(us)':>12}", file=sys.__stdout__)
+                for label, legacy, hot in cases:
+                    run_case(f"{label}: 旧实现", legacy, request, args.repeat)
+                    run_case(f"{label}: HotPathLogger", hot, request, args.repeat)
+    finally:
+        root.removeHandler(handler)
+
+
+if __name__ == '__main__':
+    main()
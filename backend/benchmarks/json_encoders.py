@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+JSON序列化后端基准测试
+
+在cms/common的典型响应数据上对比:
+- DRF JSONRenderer (标准库json)
+- StandardJSONRenderer + 标准库json
+- StandardJSONRenderer + orjson (已安装时)
+
+数据在内存中构造，不访问数据库，包含datetime、Decimal、惰性翻译字符串以及
+ReturnDict/ReturnList
+
+用法:
+    python benchmarks/json_encoders.py [--items 1000] [--repeat 20]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from decimal import Decimal
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.test import override_settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from common.renderers import StandardJSONRenderer, orjson
+
+
+def build_article_list(count):
+    """
+    文章列表分页响应
+    """
+    created_at = datetime.datetime(2024, 1, 1, 8, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+    results = ReturnList([
+        {
+            'id': index,
+            'title': f'多租户系统性能优化实践 {index}',
+            'slug': f'multi-tenant-performance-{index}',
+            'excerpt': '本文介绍了在多租户系统中减少数据库查询与序列化开销的方法。',
+            'status': 'published',
+            'author_info': {'id': 1, 'username': 'author', 'tenant_name': '测试租户'},
+            'categories': [{'id': 1, 'name': '技术'}, {'id': 2, 'name': '架构'}],
+            'tags': [{'id': 1, 'name': 'Django'}, {'id': 2, 'name': '性能'}],
+            'views_count': 1024 + index,
+            'created_at': created_at + datetime.timedelta(minutes=index),
+            'updated_at': created_at + datetime.timedelta(minutes=index, seconds=30),
+        }
+        for index in range(count)
+    ], serializer=None)
+    return {
+        'pagination': {'count': count, 'next': None, 'previous': None, 'page_size': count},
+        'results': results,
+    }
+
+
+def build_api_log_list(count):
+    """
+    API日志列表分页响应
+    """
+    created_at = datetime.datetime(2024, 1, 1, 8, 0, 0, tzinfo=datetime.timezone.utc)
+    results = ReturnList([
+        {
+            'id': index,
+            'user': 1,
+            'tenant': 1,
+            'ip_address': '127.0.0.1',
+            'request_method': 'GET',
+            'request_path': '/api/v1/cms/articles/',
+            'query_params': {'page': '1', 'status': 'published'},
+            'status_code': 200,
+            'response_time': 35.5 + index % 10,
+            'request_body': None,
+            'response_body': {'success': True, 'code': 2000, 'message': '操作成功'},
+            'created_at': created_at + datetime.timedelta(seconds=index),
+        }
+        for index in range(count)
+    ], serializer=None)
+    return {
+        'pagination': {'count': count, 'next': None, 'previous': None, 'page_size': count},
+        'results': results,
+    }
+
+
+def build_article_statistics(count):
+    """
+    文章统计响应，包含Decimal跳出率和惰性翻译字符串
+    """
+    start = datetime.date(2024, 1, 1)
+    return ReturnDict({
+        'article_id': 1,
+        'title': _('文章统计'),
+        'views_count': 10240,
+        'unique_views_count': 8192,
+        'avg_reading_time': 95,
+        'bounce_rate': Decimal('35.27'),
+        'daily': [
+            {
+                'date': start + datetime.timedelta(days=index),
+                'views': 100 + index,
+                'bounce_rate': Decimal('35.27') + Decimal(index % 100) / 100,
+                'label': _('浏览量'),
+            }
+            for index in range(count)
+        ],
+    }, serializer=None)
+
+
+def run_case(label, func, repeat):
+    start = time.perf_counter()
+    for _index in range(repeat):
+        size = len(func())
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<40}{elapsed:>12.2f}{size / 1024:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON序列化后端基准测试')
+    parser.add_argument('--items', type=int, default=1000, help='列表条数')
+    parser.add_argument('--repeat', type=int, default=20, help='每个用例的重复次数')
+    args = parser.parse_args()
+
+    payloads = [
+        ('文章列表', build_article_list(args.items)),
+        ('API日志列表', build_api_log_list(args.items)),
+        ('文章统计', build_article_statistics(args.items)),
+    ]
+    drf_renderer = JSONRenderer()
+    standard_renderer = StandardJSONRenderer()
+
+    if orjson is None:
+        print('未安装orjson，只测试标准库json')
+
+    for name, payload in payloads:
+        print(f"\n{name} ({args.items}条)")
+        print(f"{'用例':<36}{'耗时(ms)':>12}{'大小(KB)':>12}")
+        run_case('DRF JSONRenderer', lambda: drf_renderer.render(payload), args.repeat)
+        with override_settings(JSON_RENDERER_BACKEND='stdlib'):
+            run_case('StandardJSONRenderer (stdlib)', lambda: standard_renderer.render(payload), args.repeat)
+        if orjson is not None:
+            with override_settings(JSON_RENDERER_BACKEND='orjson'):
+                run_case('StandardJSONRenderer (orjson)', lambda: standard_renderer.render(payload), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
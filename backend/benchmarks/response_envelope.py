@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+响应标准格式包装基准测试
+
+在约5MB的列表响应上对比:
+- 旧流程: 渲染器包装后，中间件再对JsonResponse执行json.loads + json.dumps
+- 新流程: DRF响应只由渲染器包装一次，JsonResponse由中间件直接拼接标准格式
+
+用法:
+    python benchmarks/response_envelope.py [--size-mb 5] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.http import JsonResponse
+from django.test import RequestFactory
+from rest_framework.response import Response
+
+from common.middleware.response_standardization_middleware import ResponseStandardizationMiddleware
+from common.renderers import StandardJSONRenderer, build_standard_response
+
+
+class JSONCallCounter:
+    """
+    统计json.dumps/json.loads的调用次数
+    """
+    def __init__(self):
+        self.dumps = 0
+        self.loads = 0
+
+    def __enter__(self):
+        self._dumps, self._loads = json.dumps, json.loads
+
+        def dumps(*args, **kwargs):
+            self.dumps += 1
+            return self._dumps(*args, **kwargs)
+
+        def loads(*args, **kwargs):
+            self.loads += 1
+            return self._loads(*args, **kwargs)
+
+        json.dumps, json.loads = dumps, loads
+        return self
+
+    def __exit__(self, *exc_info):
+        json.dumps, json.loads = self._dumps, self._loads
+
+
+def build_payload(size_mb):
+    """
+    构造接近文章列表的数据，直到序列化后约size_mb MB
+    """
+    item = {
+        'id': 0,
+        'title': '多租户系统性能优化实践',
+        'slug': 'multi-tenant-performance',
+        'excerpt': '本文介绍了在多租户系统中减少数据库查询与序列化开销的方法。' * 3,
+        'status': 'published',
+        'author_info': {'id': 1, 'username': 'author', 'tenant_name': '测试租户'},
+        'categories': [{'id': 1, 'name': '技术'}, {'id': 2, 'name': '架构'}],
+        'tags': [{'id': 1, 'name': 'Django'}, {'id': 2, 'name': '性能'}],
+        'views_count': 1024,
+        'created_at': '2024-01-01T08:00:00+08:00',
+    }
+    item_size = len(json.dumps(item, ensure_ascii=False).encode('utf-8'))
+    count = int(size_mb * 1024 * 1024 / item_size)
+    return [dict(item, id=index) for index in range(count)]
+
+
+def legacy_middleware(content, status_code):
+    """
+    旧中间件对JsonResponse的处理: 解析内容后重新包装并序列化
+    """
+    original_data = json.loads(content.decode('utf-8'))
+    standard_data = build_standard_response(original_data, status_code)
+    return json.dumps(standard_data, ensure_ascii=False).encode('utf-8')
+
+
+def run_case(label, func, repeat):
+    with JSONCallCounter() as counter:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            size = func()
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<36}{elapsed:>12.1f}{counter.dumps // repeat:>10}{counter.loads // repeat:>10}{size / 1024 / 1024:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='响应标准格式包装基准测试')
+    parser.add_argument('--size-mb', type=float, default=5, help='响应大小(MB)')
+    parser.add_argument('--repeat', type=int, default=5, help='每个用例的重复次数')
+    args = parser.parse_args()
+
+    payload = build_payload(args.size_mb)
+    request = RequestFactory().get('/api/v1/benchmark/')
+    middleware = ResponseStandardizationMiddleware(lambda request: None)
+    renderer = StandardJSONRenderer()
+
+    def drf_response():
+        response = Response(payload)
+        content = renderer.render(payload, renderer_context={'response': response})
+        response.content = content
+        return len(middleware.process_response(request, response).content)
+
+    def json_response_legacy():
+        response = JsonResponse(payload, safe=False, json_dumps_params={'ensure_ascii': False})
+        return len(legacy_middleware(response.content, response.status_code))
+
+    def json_response():
+        response = JsonResponse(payload, safe=False, json_dumps_params={'ensure_ascii': False})
+        return len(middleware.process_response(request, response).content)
+
+    print(f"列表条数: {len(payload)}")
+    print(f"{'用例':<32}{'耗时(ms)':>12}{'dumps':>10}{'loads':>10}{'大小(MB)':>10}")
+    run_case('DRF响应 (渲染器包装一次)', drf_response, args.repeat)
+    run_case('JsonResponse 旧流程 (解析+重新序列化)', json_response_legacy, args.repeat)
+    run_case('JsonResponse 新流程 (直接拼接)', json_response, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
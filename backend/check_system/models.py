@@ -6,10 +6,12 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
+from common.utils.hot_path_logging import get_hot_logger
 from users.models import User
 from tenants.models import Tenant
 
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
 
 
 class TaskCategory(models.Model):
@@ -240,12 +242,14 @@ class CheckRecord(models.Model):
         """
         重写保存方法，添加日志
         """
+        # 只记录ID，避免为输出日志加载用户和任务
         is_new = self.pk is None
-        if is_new:
-            print(f"[CheckRecord] 用户 {self.user.username} 为任务 {self.task.name} 创建打卡记录")
-        else:
-            print(f"[CheckRecord] 用户 {self.user.username} 更新了任务 {self.task.name} 的打卡记录")
         super().save(*args, **kwargs)
+        hot_logger.debug(
+            "[CheckRecord] 用户 %s %s任务 %s 的打卡记录 #%s",
+            self.user_id, '创建了' if is_new else '更新了', self.task_id, self.pk,
+            extra={'user_id': self.user_id, 'task_id': self.task_id, 'check_record_id': self.pk},
+        )
 
 
 class TaskTemplate(models.Model):
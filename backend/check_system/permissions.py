@@ -33,7 +33,7 @@ class CheckSystemBasePermission(permissions.BasePermission):
             return False
         
         # 检查用户是否关联租户
-        if not hasattr(user, 'tenant') or not user.tenant:
+        if not getattr(user, 'tenant_id', None):
             logger.warning(f"用户 {user.username} 未关联租户，拒绝访问 {request.path}")
             raise PermissionDenied("用户未关联租户，无法访问打卡系统")
         
@@ -104,7 +104,7 @@ class CheckSystemBasePermission(permissions.BasePermission):
         user = request.user
         
         # 检查用户是否关联租户
-        if not hasattr(user, 'tenant') or not user.tenant:
+        if not getattr(user, 'tenant_id', None):
             logger.warning(f"用户 {user.username} 未关联租户，拒绝访问对象 {obj.__class__.__name__} #{getattr(obj, 'id', 'unknown')}")
             raise PermissionDenied("用户未关联租户，无法访问打卡系统")
         
@@ -114,12 +114,12 @@ class CheckSystemBasePermission(permissions.BasePermission):
             raise PermissionDenied("超级管理员不允许操作打卡系统业务")
         
         # 验证对象所属租户与用户租户一致
-        if hasattr(obj, 'tenant') and obj.tenant != user.tenant:
+        if hasattr(obj, 'tenant_id') and obj.tenant_id != user.tenant_id:
             logger.warning(f"用户 {user.username} 尝试操作不属于其租户的对象 {obj.__class__.__name__} #{getattr(obj, 'id', 'unknown')}")
             raise PermissionDenied("不能操作其他租户的资源")
         
         # 租户管理员可以操作其租户内的所有资源
-        if user.is_admin and hasattr(obj, 'tenant') and obj.tenant == user.tenant:
+        if user.is_admin and hasattr(obj, 'tenant_id') and obj.tenant_id == user.tenant_id:
             return True
         
         # 获取对象的所有者
@@ -1,11 +1,15 @@
 """
 打卡系统序列化器
 """
+import logging
+
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
 from .models import TaskCategory, Task, CheckRecord, TaskTemplate
 
+logger = logging.getLogger(__name__)
+
 
 class TaskCategorySerializer(serializers.ModelSerializer):
     """打卡类型序列化器"""
@@ -91,7 +95,10 @@ class CheckRecordSerializer(serializers.ModelSerializer):
             if CheckRecord.objects.filter(
                 user=user, task=task, check_date=check_date
             ).exists():
-                print('[CheckRecordSerializer] 用户重复打卡校验未通过')
+                logger.info(
+                    "[CheckRecordSerializer] 用户重复打卡校验未通过: user=%s, task=%s, date=%s",
+                    getattr(user, 'pk', None), getattr(task, 'pk', None), check_date
+                )
                 raise serializers.ValidationError(
                     _("您今天已经为该任务打过卡了")
                 )
@@ -0,0 +1,531 @@
+"""
+文章访问日志缓冲写入
+阅读事件先追加到本地spool文件，由后台线程按批bulk_create写入cms_access_log，
+并按文章聚合后原子累加阅读统计，请求路径上不再有数据库写入
+
+spool文件按段轮转:
+- <前缀>.open    当前进程正在追加的段
+- <前缀>.ready   已轮转、等待写入的段
+- <前缀>.claimed 从已退出进程接管的段
+段整批写入失败时，数据库连接类错误保留到下次刷新重试；其他错误(例如某条事件超长或引用的用户已删除)
+或连续失败达到MAX_SEGMENT_ATTEMPTS次时改为逐条写入，无法写入的事件移到failed/目录，不再阻塞该段
+段文件名包含所属进程的PID。进程异常退出后遗留的段在所属进程已不存在、且超过STALE_SEGMENT_AGE未被修改时，
+由任一进程通过重命名接管并写入；仍在运行的进程(例如数据库故障期间一直在重试)的段不会被接管，
+因此spool目录只能由同一台机器上的进程共享
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.CMS_ACCESS_LOG_BUFFER 覆盖
+DEFAULT_BUFFER_CONFIG = {
+    # 是否启用缓冲写入，关闭后在请求中同步写入
+    'ENABLED': True,
+    # spool文件目录
+    'SPOOL_DIR': os.path.join(settings.LOGS_DIR, 'access_log_spool'),
+    # 每批写入的最大记录数
+    'BATCH_SIZE': 500,
+    # 两次刷新之间的间隔(秒)
+    'FLUSH_INTERVAL': 2.0,
+    # 遗留段的判定时间(秒)，需远大于FLUSH_INTERVAL
+    'STALE_SEGMENT_AGE': 60,
+    # 段连续写入失败的次数达到该值后逐条写入，跳过无法写入的事件
+    'MAX_SEGMENT_ATTEMPTS': 5,
+}
+
+SEGMENT_PREFIX = 'access-'
+OPEN_SUFFIX = '.open'
+READY_SUFFIX = '.ready'
+CLAIMED_SUFFIX = '.claimed'
+
+# 无法写入的事件的存放目录(spool目录下)
+FAILED_DIR = 'failed'
+
+# 数据库不可用类错误，段保留到下次刷新重试
+RETRYABLE_ERRORS = (OperationalError, InterfaceError)
+
+# 访问事件包含的字段，与AccessLog的字段一一对应
+EVENT_FIELDS = (
+    'article_id', 'user_id', 'tenant_id', 'session_id', 'ip_address',
+    'user_agent', 'referer', 'reading_time', 'created_at',
+)
+
+
+def get_buffer_config():
+    """
+    获取合并了默认值的缓冲配置
+
+    Returns:
+        dict: 缓冲配置
+    """
+    config = dict(DEFAULT_BUFFER_CONFIG)
+    config.update(getattr(settings, 'CMS_ACCESS_LOG_BUFFER', {}) or {})
+    return config
+
+
+def build_access_event(article, user, request, reading_time=None, referer=None, session_id=None):
+    """
+    根据请求构建访问事件
+
+    Args:
+        article: 文章对象
+        user: 访问用户，匿名访问为None
+        request: HTTP请求对象
+        reading_time: 阅读时长(秒)
+        referer: 来源URL
+        session_id: 会话ID
+
+    Returns:
+        dict: 访问事件
+    """
+    return {
+        'article_id': article.id,
+        'user_id': user.id if user else None,
+        'tenant_id': article.tenant_id,
+        'session_id': session_id,
+        'ip_address': request.META.get('REMOTE_ADDR'),
+        'user_agent': request.META.get('HTTP_USER_AGENT'),
+        'referer': referer,
+        'reading_time': reading_time,
+        'created_at': timezone.now(),
+    }
+
+
+def persist_access_events(events, batch_size=500):
+    """
+    在一个事务中写入访问事件并累加阅读统计
+
+    Args:
+        events: 访问事件列表
+        batch_size: bulk_create的批大小
+
+    Returns:
+        int: 写入的记录数
+    """
+    from .models import AccessLog, Article
+    from .statistics import increment_article_views
+
+    # 忽略写入前已被删除的文章的事件
+    article_ids = {event['article_id'] for event in events}
+    existing_ids = set(Article.objects.filter(id__in=article_ids).values_list('id', flat=True))
+    events = [event for event in events if event['article_id'] in existing_ids]
+    if not events:
+        return 0
+
+    logs = []
+    totals = defaultdict(lambda: {'views': 0, 'reading_time_total': 0, 'reading_time_count': 0})
+    for event in events:
+        created_at = event.get('created_at')
+        if isinstance(created_at, str):
+            created_at = parse_datetime(created_at)
+        logs.append(AccessLog(
+            **{field: event.get(field) for field in EVENT_FIELDS if field != 'created_at'},
+            created_at=created_at or timezone.now()
+        ))
+
+        total = totals[(event['article_id'], event['tenant_id'])]
+        total['views'] += 1
+        if event.get('reading_time'):
+            total['reading_time_total'] += event['reading_time']
+            total['reading_time_count'] += 1
+
+    with transaction.atomic():
+        AccessLog.objects.bulk_create(logs, batch_size=batch_size)
+        for (article_id, tenant_id), total in totals.items():
+            increment_article_views(article_id, tenant_id, **total)
+    return len(logs)
+
+
+class AccessLogBuffer:
+    """
+    访问日志缓冲写入器
+
+    - 请求线程将事件以JSON行追加到当前段，不访问数据库
+    - 后台线程每FLUSH_INTERVAL轮转当前段，并批量写入已轮转的段
+    - 段写入成功后删除，失败则保留到下次刷新重试
+    - 进程退出时写入剩余事件，异常退出遗留的段由其他进程接管
+    """
+
+    def __init__(self, spool_dir, batch_size=500, flush_interval=2.0, stale_segment_age=60,
+                 max_segment_attempts=5):
+        self.spool_dir = spool_dir
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.stale_segment_age = stale_segment_age
+        self.max_segment_attempts = max(1, max_segment_attempts)
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+        self._segment = None
+        self._segment_path = None
+        self._pending_segments = []
+        self._segment_attempts = {}
+        self._segment_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker = None
+        self._stats = {
+            'queued': 0,
+            'flushed': 0,
+            'failed': 0,
+            'batches': 0,
+            'recovered_segments': 0,
+            'quarantined': 0,
+        }
+
+    @classmethod
+    def from_settings(cls):
+        """
+        根据settings.CMS_ACCESS_LOG_BUFFER创建缓冲写入器
+        """
+        config = get_buffer_config()
+        return cls(
+            spool_dir=config['SPOOL_DIR'],
+            batch_size=config['BATCH_SIZE'],
+            flush_interval=config['FLUSH_INTERVAL'],
+            stale_segment_age=config['STALE_SEGMENT_AGE'],
+            max_segment_attempts=config['MAX_SEGMENT_ATTEMPTS'],
+        )
+
+    def _incr(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def get_stats(self):
+        """
+        获取缓冲写入器计数器
+
+        Returns:
+            dict: queued/flushed/failed等计数以及待写入的段数
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending_segments'] = len(self._pending_segments)
+        stats['running'] = self.is_running
+        return stats
+
+    @property
+    def is_running(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def _new_segment_path(self, suffix):
+        name = f"{SEGMENT_PREFIX}{os.getpid()}-{time.time_ns()}{suffix}"
+        return os.path.join(self.spool_dir, name)
+
+    def enqueue(self, event):
+        """
+        将访问事件追加到spool文件
+
+        Args:
+            event: 访问事件，见build_access_event
+
+        Returns:
+            布尔值，指示事件是否写入spool；为False时调用方应同步写入
+        """
+        line = json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)
+        try:
+            with self._segment_lock:
+                if self._segment is None:
+                    self._segment_path = self._new_segment_path(OPEN_SUFFIX)
+                    self._segment = open(self._segment_path, 'a', encoding='utf-8')
+                self._segment.write(line + '\n')
+                # 写入操作系统缓冲，进程崩溃后事件仍保留在文件中
+                self._segment.flush()
+        except OSError as e:
+            logger.error(f"写入访问日志spool文件失败: {str(e)}")
+            return False
+
+        self._incr('queued')
+        return True
+
+    def _rotate(self):
+        """
+        关闭当前段并加入待写入列表
+        """
+        with self._segment_lock:
+            if self._segment is None:
+                return
+            self._segment.close()
+            ready_path = self._segment_path[:-len(OPEN_SUFFIX)] + READY_SUFFIX
+            os.replace(self._segment_path, ready_path)
+            self._pending_segments.append(ready_path)
+            self._segment = None
+            self._segment_path = None
+
+    @staticmethod
+    def _segment_owner_alive(name):
+        """
+        判断段文件所属的进程是否仍在运行
+
+        当前进程自己的段都在owned中；文件名是当前PID但不属于当前进程的段，
+        来自之前使用相同PID的已退出进程(例如容器重启后)，视为已退出
+
+        Args:
+            name: 段文件名，格式为 <前缀><PID>-<时间戳><后缀>
+
+        Returns:
+            bool: 无法解析PID或无法判断时视为仍在运行，不接管
+        """
+        try:
+            pid = int(name[len(SEGMENT_PREFIX):].split('-', 1)[0])
+        except ValueError:
+            return True
+        if pid == os.getpid():
+            return False
+        if os.name == 'nt':
+            # Windows上os.kill(pid, 0)会发送CTRL_C_EVENT，只按修改时间判断
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # 进程存在但属于其他用户等情况
+            return True
+        return True
+
+    def recover_segments(self):
+        """
+        接管已退出进程遗留的段
+
+        只接管所属进程已不存在的段，避免与仍在重试写入的进程重复写入
+
+        Returns:
+            int: 接管的段数
+        """
+        with self._flush_lock:
+            owned = set(self._pending_segments)
+            if self._segment_path:
+                owned.add(self._segment_path)
+            deadline = time.time() - self.stale_segment_age
+
+            recovered = 0
+            for name in os.listdir(self.spool_dir):
+                path = os.path.join(self.spool_dir, name)
+                if not name.startswith(SEGMENT_PREFIX) or path in owned or self._segment_owner_alive(name):
+                    continue
+                try:
+                    if os.path.getmtime(path) > deadline:
+                        continue
+                    # 重命名是原子操作，多个进程同时接管时只有一个成功
+                    claimed_path = self._new_segment_path(CLAIMED_SUFFIX)
+                    os.rename(path, claimed_path)
+                except OSError:
+                    continue
+                self._pending_segments.append(claimed_path)
+                recovered += 1
+
+        if recovered:
+            self._incr('recovered_segments', recovered)
+            logger.info(f"接管了 {recovered} 个遗留的访问日志段")
+        return recovered
+
+    def _read_segment(self, path):
+        events = []
+        with open(path, encoding='utf-8') as segment:
+            for line in segment:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # 进程崩溃时最后一行可能不完整
+                    logger.warning(f"跳过无法解析的访问事件: {path}")
+        return events
+
+    def _write_segment(self, path):
+        """
+        写入一个段，成功后删除文件
+
+        Returns:
+            布尔值，指示段是否写入成功；段文件已不存在时返回None，不再重试
+        """
+        try:
+            events = self._read_segment(path)
+        except FileNotFoundError:
+            logger.warning(f"访问日志段已不存在，跳过: {path}")
+            self._segment_attempts.pop(path, None)
+            return None
+        try:
+            written = persist_access_events(events, batch_size=self.batch_size)
+        except Exception as e:
+            self._incr('failed')
+            attempts = self._segment_attempts.get(path, 0) + 1
+            if isinstance(e, RETRYABLE_ERRORS) and attempts < self.max_segment_attempts:
+                self._segment_attempts[path] = attempts
+                logger.error(f"写入访问日志段失败，稍后重试: {path}: {str(e)}")
+                return False
+            logger.error(f"写入访问日志段失败，改为逐条写入: {path}: {str(e)}")
+            written = self._write_events_one_by_one(path, events)
+            if written is None:
+                self._segment_attempts[path] = attempts
+                return False
+
+        self._segment_attempts.pop(path, None)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._incr('flushed', written)
+        self._incr('batches')
+        return True
+
+    def _write_events_one_by_one(self, path, events):
+        """
+        逐条写入段中的事件，无法写入的事件追加到failed/目录下的同名文件
+
+        Returns:
+            int: 写入的记录数；数据库不可用时将剩余事件写回段文件并返回None，下次刷新重试
+        """
+        written = 0
+        failed_path = os.path.join(self.spool_dir, FAILED_DIR, os.path.basename(path))
+        for index, event in enumerate(events):
+            try:
+                written += persist_access_events([event])
+            except RETRYABLE_ERRORS as e:
+                logger.error(f"逐条写入访问日志段时数据库不可用，稍后重试: {path}: {str(e)}")
+                self._rewrite_segment(path, events[index:])
+                return None
+            except Exception as e:
+                os.makedirs(os.path.dirname(failed_path), exist_ok=True)
+                with open(failed_path, 'a', encoding='utf-8') as failed:
+                    failed.write(json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+                self._incr('quarantined')
+                logger.error(f"访问事件无法写入，已移到 {failed_path}: {str(e)}")
+        return written
+
+    @staticmethod
+    def _rewrite_segment(path, events):
+        """
+        用剩余事件替换段文件，已逐条写入的事件不会重复写入
+        """
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as segment:
+            for event in events:
+                segment.write(json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        os.replace(temp_path, path)
+
+    def flush(self):
+        """
+        轮转当前段并写入全部待写入的段
+
+        Returns:
+            int: 写入成功的段数
+        """
+        with self._flush_lock:
+            self._rotate()
+            segments, self._pending_segments = self._pending_segments, []
+            written = 0
+            for path in segments:
+                result = self._write_segment(path)
+                if result:
+                    written += 1
+                elif result is False:
+                    self._pending_segments.append(path)
+            return written
+
+    def start(self):
+        """
+        接管遗留的段并启动后台工作线程
+        """
+        if self.is_running:
+            return
+        self.recover_segments()
+        self._stop_event.clear()
+        self._worker = threading.Thread(
+            target=self._run,
+            name='access-log-buffer',
+            daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            f"访问日志缓冲写入器已启动: spool_dir={self.spool_dir}, "
+            f"flush_interval={self.flush_interval}s"
+        )
+
+    def _run(self):
+        """
+        工作线程主循环
+        """
+        last_recover = time.monotonic()
+        while not self._stop_event.wait(self.flush_interval):
+            close_old_connections()
+            try:
+                if time.monotonic() - last_recover >= self.stale_segment_age:
+                    self.recover_segments()
+                    last_recover = time.monotonic()
+                self.flush()
+            except Exception:
+                # 保持工作线程存活，下一轮继续刷新
+                logger.exception("访问日志缓冲写入器刷新失败")
+            finally:
+                close_old_connections()
+
+    def shutdown(self, timeout=5.0):
+        """
+        停止工作线程并写入剩余事件
+
+        Args:
+            timeout: 等待工作线程结束的最长时间(秒)
+        """
+        if self.is_running:
+            self._stop_event.set()
+            self._worker.join(timeout)
+            self._worker = None
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+        logger.info(f"访问日志缓冲写入器已停止: {self.get_stats()}")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_access_log_buffer():
+    """
+    获取进程级共享的访问日志缓冲写入器，首次调用时创建并启动
+
+    Returns:
+        AccessLogBuffer对象，未启用缓冲写入时返回None
+    """
+    global _buffer
+    if _buffer is not None:
+        return _buffer
+
+    if not get_buffer_config()['ENABLED']:
+        return None
+
+    with _buffer_lock:
+        if _buffer is None:
+            access_log_buffer = AccessLogBuffer.from_settings()
+            access_log_buffer.start()
+            atexit.register(access_log_buffer.shutdown)
+            _buffer = access_log_buffer
+    return _buffer
+
+
+def shutdown_access_log_buffer():
+    """
+    停止进程级共享的缓冲写入器（例如在worker退出钩子中调用）
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.shutdown()
+            _buffer = None
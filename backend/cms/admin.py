@@ -177,7 +177,8 @@ class ArticleVersionAdmin(admin.ModelAdmin):
     search_fields = ['article__title', 'change_description']
     raw_id_fields = ['article', 'editor']
     autocomplete_fields = ['tenant']
-    readonly_fields = ['created_at']
+    # 差异版本依赖前一版本的内容，修改存储字段会破坏整条版本链
+    readonly_fields = ['version_number', 'content', 'diff_data', 'base_version', 'created_at']
     list_per_page = 20
     
     def get_queryset(self, request):
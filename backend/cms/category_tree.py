@@ -0,0 +1,101 @@
+"""
+分类树构建与缓存
+一次查询取出租户的全部分类，在内存中按parent_id组装成树，并按租户缓存结果
+"""
+import logging
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category
+
+logger = logging.getLogger(__name__)
+
+# 分类树缓存过期时间(秒)，分类变更时会主动失效
+CATEGORY_TREE_CACHE_TIMEOUT = getattr(settings, 'CMS_CATEGORY_TREE_CACHE_TIMEOUT', 3600)
+
+# 分类树节点包含的字段
+TREE_FIELDS = ('id', 'parent_id', 'name', 'slug', 'description', 'is_active', 'sort_order')
+
+
+def _cache_key(tenant_id, active_only):
+    """
+    生成分类树缓存键
+
+    Args:
+        tenant_id: 租户ID，None表示所有租户
+        active_only: 是否只包含激活的分类
+    """
+    scope = tenant_id if tenant_id is not None else 'all'
+    return f"cms:category_tree:{scope}:{'active' if active_only else 'all'}"
+
+
+def build_category_tree(tenant_id=None, active_only=False):
+    """
+    用一次查询构建分类树
+
+    Args:
+        tenant_id: 租户ID，None表示所有租户
+        active_only: 是否只包含激活的分类，未激活分类的子树同样被排除
+
+    Returns:
+        list: 顶级分类节点列表，每个节点的children为子节点列表
+    """
+    queryset = Category.objects.all()
+    if tenant_id is not None:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+
+    # 查询结果已按sort_order、name排序，子节点按相同顺序追加
+    rows = list(queryset.order_by('sort_order', 'name').values(*TREE_FIELDS))
+
+    nodes = {}
+    for row in rows:
+        node = {key: row[key] for key in TREE_FIELDS if key != 'parent_id'}
+        node['children'] = []
+        nodes[row['id']] = node
+
+    tree = []
+    for row in rows:
+        node = nodes[row['id']]
+        parent_id = row['parent_id']
+        if parent_id is None:
+            tree.append(node)
+        elif parent_id in nodes:
+            nodes[parent_id]['children'].append(node)
+        # 父分类被过滤掉(未激活或不在范围内)时，该子树不展示
+
+    return tree
+
+
+def get_category_tree(tenant_id=None, active_only=False):
+    """
+    获取分类树，优先读取缓存
+
+    Args:
+        tenant_id: 租户ID，None表示所有租户
+        active_only: 是否只包含激活的分类
+
+    Returns:
+        list: 分类树
+    """
+    key = _cache_key(tenant_id, active_only)
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_category_tree(tenant_id=tenant_id, active_only=active_only)
+        cache.set(key, tree, CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate_category_tree(tenant_id=None):
+    """
+    使租户的分类树缓存失效，同时清除跨租户(超级管理员/匿名)的缓存
+
+    Args:
+        tenant_id: 发生变更的分类所属租户ID
+    """
+    keys = [_cache_key(None, active_only) for active_only in (True, False)]
+    if tenant_id is not None:
+        keys += [_cache_key(tenant_id, active_only) for active_only in (True, False)]
+    cache.delete_many(keys)
+    logger.debug(f"分类树缓存已失效: tenant_id={tenant_id}")
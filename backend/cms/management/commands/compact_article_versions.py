@@ -0,0 +1,51 @@
+"""
+管理命令：将文章已有版本重新编排为快照+差异存储
+"""
+import logging
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from cms.models import ArticleVersion
+from cms.versioning import compact_article_versions
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '按当前的版本存储配置重新编排文章历史版本，将完整副本转为快照和差异'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--article',
+            type=int,
+            action='append',
+            help='只处理指定文章ID，可重复指定',
+        )
+        parser.add_argument(
+            '--min-versions',
+            type=int,
+            default=2,
+            help='只处理版本数不少于该值的文章(默认2)',
+        )
+
+    def handle(self, *args, **options):
+        article_ids = options.get('article')
+        if not article_ids:
+            article_ids = list(
+                ArticleVersion.objects.values('article_id')
+                .annotate(total=Count('id'))
+                .filter(total__gte=options['min_versions'])
+                .order_by('article_id')
+                .values_list('article_id', flat=True)
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"=== 开始编排 {len(article_ids)} 篇文章的版本存储 ==="))
+
+        total_before = total_after = 0
+        for article_id in article_ids:
+            before, after = compact_article_versions(article_id)
+            total_before += before
+            total_after += after
+            self.stdout.write(f"文章 {article_id}: {before} -> {after} 字符")
+
+        self.stdout.write(self.style.SUCCESS(f"=== 编排完成，版本内容共 {total_before} -> {total_after} 字符 ==="))
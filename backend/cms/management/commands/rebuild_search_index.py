@@ -0,0 +1,39 @@
+"""
+管理命令：重建文章全文检索索引
+"""
+import logging
+from django.core.management.base import BaseCommand
+
+from cms.search import rebuild_index
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '重建文章全文检索的倒排索引，用于首次部署、批量导入文章或修改检索配置之后'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=int,
+            help='只重建指定租户ID的文章索引',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='每批处理的文章数(默认200)',
+        )
+
+    def handle(self, *args, **options):
+        tenant_id = options.get('tenant')
+        scope = f"租户 {tenant_id}" if tenant_id else "全部租户"
+        self.stdout.write(self.style.SUCCESS(f"=== 开始重建{scope}的文章检索索引 ==="))
+
+        total_articles = total_tokens = 0
+        for articles, tokens in rebuild_index(tenant_id, options['batch_size']):
+            total_articles += articles
+            total_tokens += tokens
+            self.stdout.write(f"已处理 {total_articles} 篇文章")
+
+        self.stdout.write(self.style.SUCCESS(f"=== 重建完成，共 {total_articles} 篇文章，{total_tokens} 个词元 ==="))
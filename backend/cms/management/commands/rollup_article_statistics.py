@@ -0,0 +1,71 @@
+"""
+管理命令：汇总文章每日统计
+"""
+import datetime
+import logging
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from cms.statistics import get_first_access_date, get_rollup_watermark, rollup_day
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '将访问日志汇总到文章每日统计表，默认从上次汇总的日期继续到昨天'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='只汇总指定日期(YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--since',
+            help='从指定日期(YYYY-MM-DD)开始重新汇总',
+        )
+        parser.add_argument(
+            '--lookback',
+            type=int,
+            default=1,
+            help='重新汇总最近几个已完成的日期，用于纳入延迟写入的访问日志(默认1)',
+        )
+
+    def _parse_date(self, value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"无效的日期: {value}，格式应为YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+
+        if options.get('date'):
+            start = end = self._parse_date(options['date'])
+        else:
+            end = yesterday
+            if options.get('since'):
+                start = self._parse_date(options['since'])
+            else:
+                watermark = get_rollup_watermark()
+                start = watermark + datetime.timedelta(days=1) if watermark else get_first_access_date()
+                if start is None:
+                    self.stdout.write("没有需要汇总的访问日志")
+                    return
+                lookback_start = yesterday - datetime.timedelta(days=max(options['lookback'], 0) - 1)
+                start = min(start, lookback_start)
+
+        if start > end:
+            self.stdout.write("没有需要汇总的日期")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"=== 开始汇总文章统计: {start} ~ {end} ==="))
+
+        day = start
+        total_rows = 0
+        while day <= end:
+            rows = rollup_day(day)
+            total_rows += rows
+            self.stdout.write(f"{day}: {rows} 条汇总记录")
+            day += datetime.timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"=== 汇总完成，共写入 {total_rows} 条汇总记录 ==="))
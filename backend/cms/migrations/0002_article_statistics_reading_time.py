@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articlestatistics',
+            name='reading_time_count',
+            field=models.IntegerField(default=0, verbose_name='阅读时长记录数'),
+        ),
+        migrations.AddField(
+            model_name='articlestatistics',
+            name='reading_time_total',
+            field=models.BigIntegerField(default=0, verbose_name='阅读时长合计(秒)'),
+        ),
+    ]
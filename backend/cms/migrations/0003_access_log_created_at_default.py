@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 07:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0002_article_statistics_reading_time'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accesslog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='访问时间'),
+        ),
+    ]
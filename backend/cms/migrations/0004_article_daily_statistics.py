@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0003_access_log_created_at_default'),
+        ('tenants', '0002_tenant_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleDailyStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('dimension', models.CharField(choices=[('views', '阅读量'), ('country', '国家'), ('device', '设备类型'), ('browser', '浏览器'), ('referer', '来源')], max_length=20, verbose_name='维度')),
+                ('value', models.CharField(blank=True, default='', max_length=255, verbose_name='维度取值')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='访问次数')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_statistics', to='cms.article', verbose_name='文章')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_daily_statistics', to='tenants.tenant', verbose_name='所属租户')),
+            ],
+            options={
+                'verbose_name': '文章每日统计',
+                'verbose_name_plural': '文章每日统计',
+                'db_table': 'cms_article_daily_statistics',
+                'indexes': [models.Index(fields=['article', 'dimension', 'date'], name='cms_article_article_06644e_idx'), models.Index(fields=['date'], name='cms_article_date_8ec6fe_idx')],
+                'unique_together': {('article', 'date', 'dimension', 'value')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0004_article_daily_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articleversion',
+            name='base_version',
+            field=models.IntegerField(blank=True, null=True, verbose_name='基准快照版本号'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 08:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0005_article_version_base_version'),
+        ('tenants', '0002_tenant_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=32, verbose_name='词元')),
+                ('weight', models.PositiveIntegerField(default=0, verbose_name='权重')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='cms.article', verbose_name='文章')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_search_tokens', to='tenants.tenant', verbose_name='所属租户')),
+            ],
+            options={
+                'verbose_name': '文章检索词元',
+                'verbose_name_plural': '文章检索词元',
+                'db_table': 'cms_article_search_token',
+                'indexes': [models.Index(fields=['tenant', 'token', 'article', 'weight'], name='cms_article_tenant__9c1564_idx')],
+                'unique_together': {('article', 'token')},
+            },
+        ),
+    ]
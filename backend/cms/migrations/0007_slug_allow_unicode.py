@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0006_article_search_token'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, max_length=255, unique=True, verbose_name='URL别名'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, max_length=100, unique=True, verbose_name='URL别名'),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, unique=True, verbose_name='URL别名'),
+        ),
+        migrations.AlterField(
+            model_name='taggroup',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, unique=True, verbose_name='URL别名'),
+        ),
+    ]
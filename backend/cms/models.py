@@ -4,9 +4,11 @@ CMS系统模型定义
 import logging
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.utils.text import slugify
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .slugs import allocate_slug, save_with_unique_slug
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -33,7 +35,7 @@ class Article(models.Model):
     )
     
     title = models.CharField(_("文章标题"), max_length=255)
-    slug = models.SlugField(_("URL别名"), max_length=255, unique=True, db_index=True)
+    slug = models.SlugField(_("URL别名"), max_length=255, unique=True, db_index=True, allow_unicode=True)
     content = models.TextField(_("文章内容"))
     content_type = models.CharField(_("内容类型"), max_length=20, choices=CONTENT_TYPE_CHOICES, default='markdown')
     excerpt = models.TextField(_("文章摘要"), blank=True, null=True)
@@ -78,16 +80,20 @@ class Article(models.Model):
         return self.title
     
     def save(self, *args, **kwargs):
-        # 如果没有设置slug，根据标题自动生成
-        if not self.slug:
-            self.slug = slugify(self.title)
+        # 如果没有设置slug，根据标题自动分配唯一的slug
+        allocated = not self.slug
+        if allocated:
+            self.slug = allocate_slug(Article, self.title)
         
         # 如果没有设置摘要，从内容中提取
         if not self.excerpt and self.content:
             # 提取前200个字符作为摘要
             self.excerpt = self.content[:200].replace('#', '').strip()
         
-        super().save(*args, **kwargs)
+        if allocated:
+            save_with_unique_slug(self, lambda: super(Article, self).save(*args, **kwargs), self.title)
+        else:
+            super().save(*args, **kwargs)
         
         # 如果是首次创建文章，自动创建文章统计记录
         if kwargs.get('force_insert', False):
@@ -102,7 +108,7 @@ class Category(models.Model):
     分类模型
     """
     name = models.CharField(_("分类名称"), max_length=100)
-    slug = models.SlugField(_("URL别名"), max_length=100, unique=True)
+    slug = models.SlugField(_("URL别名"), max_length=100, unique=True, allow_unicode=True)
     description = models.TextField(_("分类描述"), blank=True, null=True)
     parent = models.ForeignKey(
         'self',
@@ -144,10 +150,12 @@ class Category(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        # 如果没有设置slug，根据名称自动生成
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        # 如果没有设置slug，根据名称自动分配唯一的slug
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        self.slug = allocate_slug(Category, self.name)
+        save_with_unique_slug(self, lambda: super(Category, self).save(*args, **kwargs), self.name)
 
 
 class TagGroup(models.Model):
@@ -155,7 +163,7 @@ class TagGroup(models.Model):
     标签组模型
     """
     name = models.CharField(_("标签组名称"), max_length=50)
-    slug = models.SlugField(_("URL别名"), max_length=50, unique=True)
+    slug = models.SlugField(_("URL别名"), max_length=50, unique=True, allow_unicode=True)
     description = models.TextField(_("标签组描述"), blank=True, null=True)
     created_at = models.DateTimeField(_("创建时间"), auto_now_add=True)
     updated_at = models.DateTimeField(_("更新时间"), auto_now=True)
@@ -181,10 +189,12 @@ class TagGroup(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        # 如果没有设置slug，根据名称自动生成
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        # 如果没有设置slug，根据名称自动分配唯一的slug
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        self.slug = allocate_slug(TagGroup, self.name)
+        save_with_unique_slug(self, lambda: super(TagGroup, self).save(*args, **kwargs), self.name)
 
 
 class Tag(models.Model):
@@ -192,7 +202,7 @@ class Tag(models.Model):
     标签模型
     """
     name = models.CharField(_("标签名称"), max_length=50)
-    slug = models.SlugField(_("URL别名"), max_length=50, unique=True)
+    slug = models.SlugField(_("URL别名"), max_length=50, unique=True, allow_unicode=True)
     description = models.TextField(_("标签描述"), blank=True, null=True)
     group = models.ForeignKey(
         TagGroup,
@@ -230,10 +240,12 @@ class Tag(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        # 如果没有设置slug，根据名称自动生成
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        # 如果没有设置slug，根据名称自动分配唯一的slug
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        self.slug = allocate_slug(Tag, self.name)
+        save_with_unique_slug(self, lambda: super(Tag, self).save(*args, **kwargs), self.name)
 
 
 class Comment(models.Model):
@@ -443,6 +455,8 @@ class ArticleStatistics(models.Model):
     shares_count = models.IntegerField(_("分享数"), default=0)
     bookmarks_count = models.IntegerField(_("收藏数"), default=0)
     avg_reading_time = models.IntegerField(_("平均阅读时长(秒)"), default=0)
+    reading_time_total = models.BigIntegerField(_("阅读时长合计(秒)"), default=0)
+    reading_time_count = models.IntegerField(_("阅读时长记录数"), default=0)
     bounce_rate = models.DecimalField(_("跳出率(%)"), max_digits=5, decimal_places=2, default=0)
     last_updated_at = models.DateTimeField(_("最后更新时间"), auto_now=True)
     tenant = models.ForeignKey(
@@ -491,6 +505,8 @@ class ArticleVersion(models.Model):
     change_description = models.TextField(_("变更说明"), blank=True, null=True)
     created_at = models.DateTimeField(_("创建时间"), auto_now_add=True)
     diff_data = models.TextField(_("差异数据"), blank=True, null=True)
+    # 为空表示content是完整快照；否则content为空，diff_data是相对上一版本的差异，值为所属快照的版本号
+    base_version = models.IntegerField(_("基准快照版本号"), blank=True, null=True)
     tenant = models.ForeignKey(
         'tenants.Tenant',
         on_delete=models.CASCADE,
@@ -514,6 +530,41 @@ class ArticleVersion(models.Model):
         return f"{self.article.title} - 版本 {self.version_number}"
 
 
+class ArticleSearchToken(models.Model):
+    """
+    文章全文检索的倒排索引
+    
+    每篇文章的每个词元一行，weight为该词元在标题、摘要、内容中出现次数的加权和
+    """
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name="article_search_tokens",
+        verbose_name=_("所属租户")
+    )
+    token = models.CharField(_("词元"), max_length=32)
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="search_tokens",
+        verbose_name=_("文章")
+    )
+    weight = models.PositiveIntegerField(_("权重"), default=0)
+    
+    class Meta:
+        verbose_name = _('文章检索词元')
+        verbose_name_plural = _('文章检索词元')
+        db_table = 'cms_article_search_token'
+        unique_together = ('article', 'token')
+        indexes = [
+            # 检索时按(租户, 词元)定位，索引包含文章和权重，分组计分不需要回表
+            models.Index(fields=['tenant', 'token', 'article', 'weight']),
+        ]
+    
+    def __str__(self):
+        return f"{self.article_id}: {self.token}"
+
+
 class Interaction(models.Model):
     """
     用户互动
@@ -664,7 +715,8 @@ class AccessLog(models.Model):
     ip_address = models.GenericIPAddressField(_("IP地址"))
     user_agent = models.CharField(_("用户代理"), max_length=255, blank=True, null=True)
     referer = models.URLField(_("来源URL"), blank=True, null=True)
-    created_at = models.DateTimeField(_("访问时间"), auto_now_add=True)
+    # 缓冲写入时保留事件发生的时间，不使用auto_now_add
+    created_at = models.DateTimeField(_("访问时间"), default=timezone.now)
     reading_time = models.IntegerField(_("阅读时长(秒)"), blank=True, null=True)
     country = models.CharField(_("国家"), max_length=50, blank=True, null=True)
     region = models.CharField(_("区域/省份"), max_length=100, blank=True, null=True)
@@ -698,6 +750,53 @@ class AccessLog(models.Model):
         return f"{user_info} 访问 {self.article.title} 于 {self.created_at}"
 
 
+class ArticleDailyStatistics(models.Model):
+    """
+    文章每日统计汇总
+
+    按文章、日期和维度预聚合访问日志，统计接口读取汇总数据，
+    查询成本与文章的历史访问量无关
+    """
+    DIMENSION_CHOICES = (
+        ('views', _('阅读量')),
+        ('country', _('国家')),
+        ('device', _('设备类型')),
+        ('browser', _('浏览器')),
+        ('referer', _('来源')),
+    )
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="daily_statistics",
+        verbose_name=_("文章")
+    )
+    date = models.DateField(_("日期"))
+    dimension = models.CharField(_("维度"), max_length=20, choices=DIMENSION_CHOICES)
+    # 维度取值，views维度及未知取值为空字符串
+    value = models.CharField(_("维度取值"), max_length=255, blank=True, default='')
+    count = models.PositiveIntegerField(_("访问次数"), default=0)
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name="article_daily_statistics",
+        verbose_name=_("所属租户")
+    )
+
+    class Meta:
+        verbose_name = _('文章每日统计')
+        verbose_name_plural = _('文章每日统计')
+        db_table = 'cms_article_daily_statistics'
+        unique_together = [['article', 'date', 'dimension', 'value']]
+        indexes = [
+            models.Index(fields=['article', 'dimension', 'date']),
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} {self.date} {self.dimension}={self.value}: {self.count}"
+
+
 class OperationLog(models.Model):
     """
     操作日志模型
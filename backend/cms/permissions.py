@@ -37,7 +37,7 @@ class CMSBasePermission(permissions.BasePermission):
             return False
         
         # 检查用户是否关联租户
-        if not hasattr(user, 'tenant') or not user.tenant:
+        if not getattr(user, 'tenant_id', None):
             logger.warning(f"用户 {user.username} 未关联租户，拒绝访问 {request.path}")
             raise PermissionDenied("用户未关联租户，无法访问CMS系统")
         
@@ -70,12 +70,12 @@ class CMSBasePermission(permissions.BasePermission):
         user = request.user
         
         # 检查用户是否关联租户
-        if not hasattr(user, 'tenant') or not user.tenant:
+        if not getattr(user, 'tenant_id', None):
             logger.warning(f"用户 {user.username} 未关联租户，拒绝访问对象 {obj.__class__.__name__} #{getattr(obj, 'id', 'unknown')}")
             raise PermissionDenied("用户未关联租户，无法访问CMS系统")
         
         # 验证对象所属租户与用户租户一致
-        if hasattr(obj, 'tenant') and obj.tenant != user.tenant:
+        if hasattr(obj, 'tenant_id') and obj.tenant_id != user.tenant_id:
             logger.warning(f"用户 {user.username} 尝试操作不属于其租户的对象 {obj.__class__.__name__} #{getattr(obj, 'id', 'unknown')}")
             raise PermissionDenied("不能操作其他租户的资源")
         
@@ -84,7 +84,7 @@ class CMSBasePermission(permissions.BasePermission):
             return True
         
         # 租户管理员可以操作其租户内的所有资源
-        if user.is_admin and hasattr(obj, 'tenant') and obj.tenant == user.tenant:
+        if user.is_admin and hasattr(obj, 'tenant_id') and obj.tenant_id == user.tenant_id:
             return True
         
         # 获取对象的所有者
@@ -159,7 +159,7 @@ class CommentPermission(CMSBasePermission):
             if article_id:
                 from .models import Article
                 try:
-                    article = Article.objects.get(id=article_id, tenant=request.user.tenant)
+                    article = Article.objects.get(id=article_id, tenant_id=request.user.tenant_id)
                     if not article.allow_comment:
                         return False
                 except Article.DoesNotExist:
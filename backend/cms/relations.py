@@ -0,0 +1,85 @@
+"""
+文章分类、标签关联的批量读写
+- 每种关联只用一次 id__in 查询校验全部ID
+- 更新时对比现有关联和目标关联，只删除被移除的、批量插入新增的，未变化的关联不动
+- 批量插入不触发模型信号，写入后在事务提交时统一更新一次响应缓存版本戳
+"""
+import logging
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from common.utils.tenant_cache import bump_model_version
+from .models import ArticleCategory, ArticleTag, Category, Tag
+
+logger = logging.getLogger(__name__)
+
+# 关联名称 -> (目标模型, 关联模型, 关联模型中的目标ID字段, 错误提示中的名称)
+ARTICLE_RELATIONS = {
+    'categories': (Category, ArticleCategory, 'category_id', '分类'),
+    'tags': (Tag, ArticleTag, 'tag_id', '标签'),
+}
+
+
+def validate_relation_ids(relation, ids, tenant_id):
+    """
+    校验关联ID都存在且属于租户，一次查询
+
+    Args:
+        relation: 关联名称，categories或tags
+        ids: ID列表
+        tenant_id: 租户ID
+
+    Returns:
+        list: 去重后的ID列表，保持原有顺序
+
+    Raises:
+        serializers.ValidationError: 存在不属于租户或不存在的ID
+    """
+    model, _link_model, _field, label = ARTICLE_RELATIONS[relation]
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return ids
+
+    found = set(model.objects.filter(id__in=ids, tenant_id=tenant_id).values_list('id', flat=True))
+    missing = [str(object_id) for object_id in ids if object_id not in found]
+    if missing:
+        raise serializers.ValidationError(_(f"{label}ID {', '.join(missing)} 不存在或无权限访问"))
+    return ids
+
+
+def sync_article_relation(article, relation, ids, created=False):
+    """
+    将文章的关联同步为指定的ID列表
+
+    新建文章不查询现有关联；更新时最多一次查询现有关联、一次删除、一次批量插入
+
+    Args:
+        article: 文章对象
+        relation: 关联名称，categories或tags
+        ids: 目标ID列表(已校验)
+        created: 文章是否刚创建
+    """
+    _model, link_model, field, _label = ARTICLE_RELATIONS[relation]
+    desired = list(dict.fromkeys(ids))
+
+    if created:
+        existing = set()
+    else:
+        existing = set(link_model.objects.filter(article=article).values_list(field, flat=True))
+
+    removed = existing.difference(desired)
+    added = [object_id for object_id in desired if object_id not in existing]
+    if not removed and not added:
+        return
+
+    if removed:
+        link_model.objects.filter(article=article, **{f'{field}__in': removed}).delete()
+    if added:
+        link_model.objects.bulk_create([
+            link_model(article=article, tenant_id=article.tenant_id, **{field: object_id}) for object_id in added
+        ])
+
+    tenant_id = article.tenant_id
+    transaction.on_commit(lambda: bump_model_version(link_model, tenant_id))
+    logger.debug(f"文章 {article.id} 的{relation}关联已同步: 新增 {len(added)} 个，移除 {len(removed)} 个")
@@ -0,0 +1,351 @@
+"""
+文章全文检索
+- 倒排索引存于cms_article_search_token，每篇文章每个词元一行，文章保存后在事务提交时重建该文章的词元
+- 英文、数字按单词切分并转为小写；中日韩文字按单字和相邻两字(二元组)切分，
+  多字检索词按二元组匹配，单字检索词按单字匹配
+- 检索要求命中全部查询词元，按权重和排序，只读取 (租户, 词元) 索引，不扫描文章内容
+- HTML/Markdown内容去除标签和链接地址后再切分和生成摘录，标签名、属性名不会成为词元
+- 不依赖数据库的全文索引功能，MySQL和测试用的SQLite行为一致
+"""
+import html
+import logging
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Sum, Value, When
+from django.utils.html import strip_tags
+from rest_framework import filters
+
+from .models import Article, ArticleSearchToken
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.CMS_SEARCH 覆盖
+DEFAULT_SEARCH_CONFIG = {
+    # 各字段中每次出现的权重
+    'FIELD_WEIGHTS': {'title': 10, 'excerpt': 3, 'content': 1},
+    # 参与排序的最多候选文章数
+    'MAX_CANDIDATES': 1000,
+    # 一次检索最多使用的查询词元数
+    'MAX_QUERY_TOKENS': 16,
+    # 摘录片段的长度(字符)
+    'SNIPPET_LENGTH': 120,
+}
+
+# 索引相关的文章字段，只更新其他字段时不重建索引
+INDEXED_FIELDS = ('title', 'excerpt', 'content', 'content_type')
+
+TOKEN_MAX_LENGTH = 32
+
+CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af'
+TOKEN_PATTERN = re.compile(rf'([{CJK_CHARS}]+)|([^\W_{CJK_CHARS}]+)')
+
+# 可能包含HTML/Markdown标记的字段
+MARKUP_FIELDS = ('content', 'excerpt')
+
+# Markdown链接和图片的地址部分: [文字](地址)
+MARKDOWN_LINK_TARGET_PATTERN = re.compile(r'\]\([^)]*\)')
+
+
+def get_search_config():
+    """
+    获取合并了默认值的检索配置
+
+    Returns:
+        dict: 检索配置
+    """
+    config = dict(DEFAULT_SEARCH_CONFIG)
+    config.update(getattr(settings, 'CMS_SEARCH', {}) or {})
+    return config
+
+
+def tokenize(text):
+    """
+    将文本切分为词元
+
+    Args:
+        text: 文本
+
+    Returns:
+        list: 词元列表(包含重复)
+    """
+    tokens = []
+    for cjk, word in TOKEN_PATTERN.findall((text or '').lower()):
+        if word:
+            tokens.append(word[:TOKEN_MAX_LENGTH])
+        else:
+            tokens.extend(cjk)
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def article_text(article, field):
+    """
+    获取文章字段用于检索和摘录的纯文本
+
+    内容和摘要(默认从内容截取)去除HTML标签(Markdown中也可能包含)和Markdown链接地址，并还原HTML实体
+
+    Args:
+        article: 文章对象
+        field: 字段名
+
+    Returns:
+        str: 纯文本
+    """
+    text = getattr(article, field, '') or ''
+    if field not in MARKUP_FIELDS or not text:
+        return text
+    if getattr(article, 'content_type', None) == 'markdown':
+        text = MARKDOWN_LINK_TARGET_PATTERN.sub(']', text)
+    return html.unescape(strip_tags(text))
+
+
+def parse_query(query, limit=None):
+    """
+    将检索词切分为查询词元
+
+    Args:
+        query: 检索词
+        limit: 最多返回的词元数
+
+    Returns:
+        list: 去重后的词元列表
+    """
+    terms = []
+    for cjk, word in TOKEN_PATTERN.findall((query or '').lower()):
+        if word:
+            terms.append(word[:TOKEN_MAX_LENGTH])
+        elif len(cjk) == 1:
+            terms.append(cjk)
+        else:
+            terms.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    terms = list(dict.fromkeys(terms))
+    return terms[:limit] if limit else terms
+
+
+def build_article_tokens(article, config=None):
+    """
+    计算文章的词元及权重
+
+    Args:
+        article: 文章对象
+        config: 检索配置
+
+    Returns:
+        dict: {词元: 权重}
+    """
+    config = config or get_search_config()
+    weights = {}
+    for field, field_weight in config['FIELD_WEIGHTS'].items():
+        for token in tokenize(article_text(article, field)):
+            weights[token] = weights.get(token, 0) + field_weight
+    return weights
+
+
+def index_articles(articles, config=None):
+    """
+    重建一批文章的索引，一次删除旧词元、批量插入新词元
+
+    Args:
+        articles: 文章对象列表
+        config: 检索配置
+
+    Returns:
+        int: 写入的词元数
+    """
+    config = config or get_search_config()
+    rows = [
+        ArticleSearchToken(tenant_id=article.tenant_id, article_id=article.pk, token=token, weight=weight)
+        for article in articles
+        for token, weight in build_article_tokens(article, config).items()
+    ]
+    with transaction.atomic():
+        # 词元表没有被其他表引用，也没有注册删除信号，delete()直接执行一条DELETE
+        ArticleSearchToken.objects.filter(article_id__in=[article.pk for article in articles]).delete()
+        ArticleSearchToken.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def index_article(article, config=None):
+    """
+    重建单篇文章的索引
+
+    Args:
+        article: 文章对象
+        config: 检索配置
+
+    Returns:
+        int: 写入的词元数
+    """
+    return index_articles([article], config)
+
+
+def index_article_by_id(article_id):
+    """
+    按ID重建文章索引，文章已删除时忽略(词元随文章级联删除)
+
+    Args:
+        article_id: 文章ID
+    """
+    article = Article.objects.filter(pk=article_id).only('tenant_id', *INDEXED_FIELDS).first()
+    if article is not None:
+        index_article(article)
+
+
+def rebuild_index(tenant_id=None, batch_size=200):
+    """
+    重建全部或指定租户文章的索引
+
+    Args:
+        tenant_id: 租户ID，None表示全部租户
+        batch_size: 每批读取的文章数
+
+    Yields:
+        tuple: (本批文章数, 本批词元数)
+    """
+    config = get_search_config()
+    queryset = Article.objects.only('tenant_id', *INDEXED_FIELDS).order_by('pk')
+    if tenant_id is not None:
+        queryset = queryset.filter(tenant_id=tenant_id)
+
+    last_pk = 0
+    while True:
+        articles = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not articles:
+            break
+        tokens = index_articles(articles, config)
+        last_pk = articles[-1].pk
+        yield len(articles), tokens
+
+
+def matching_articles(query, tenant_id=None, articles=None):
+    """
+    构建命中全部查询词元的文章查询集，按文章分组并计算得分
+
+    Args:
+        query: 检索词
+        tenant_id: 租户ID，None表示不按租户过滤
+        articles: 文章查询集，只检索其中的文章，None表示不限制
+
+    Returns:
+        QuerySet: 包含article_id和score的分组查询集，检索词没有词元时返回None
+    """
+    terms = parse_query(query, get_search_config()['MAX_QUERY_TOKENS'])
+    if not terms:
+        return None
+
+    queryset = ArticleSearchToken.objects.filter(token__in=terms)
+    if tenant_id is not None:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    if articles is not None:
+        # 在分组、排序和截取候选之前限定范围，不可见的文章不会挤占候选名额
+        queryset = queryset.filter(article_id__in=articles.values('id'))
+
+    # 每个查询词元一个命中标记，要求全部命中
+    hits = {
+        f'hit_{index}': Max(Case(When(token=term, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        for index, term in enumerate(terms)
+    }
+    return (
+        queryset.values('article_id')
+        .annotate(score=Sum('weight'), **hits)
+        .filter(**{name: 1 for name in hits})
+    )
+
+
+def search_article_ids(query, tenant_id=None, limit=None, articles=None):
+    """
+    检索命中全部查询词元的文章，按得分降序
+
+    Args:
+        query: 检索词
+        tenant_id: 租户ID，None表示不按租户过滤
+        limit: 最多返回的文章数，默认MAX_CANDIDATES
+        articles: 文章查询集，只检索其中的文章，None表示不限制
+
+    Returns:
+        list: [(文章ID, 得分)]
+    """
+    queryset = matching_articles(query, tenant_id, articles)
+    if queryset is None:
+        return []
+    rows = queryset.order_by('-score', '-article_id').values_list('article_id', 'score')
+    return list(rows[:limit or get_search_config()['MAX_CANDIDATES']])
+
+
+class ArticleSearchFilter(filters.SearchFilter):
+    """
+    使用倒排索引的文章搜索过滤器，参数与SearchFilter相同(search)，不再对内容做LIKE扫描
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        matched = matching_articles(query, getattr(request, 'tenant_id', None)) if query else None
+        if matched is None:
+            return queryset
+        return queryset.filter(id__in=matched.values('article_id'))
+
+
+def _highlight_pattern(query):
+    parts = [cjk or word for cjk, word in TOKEN_PATTERN.findall((query or '').lower())]
+    if not parts:
+        return None
+    parts.sort(key=len, reverse=True)
+    return re.compile('|'.join(re.escape(part) for part in parts), re.IGNORECASE)
+
+
+def highlight(text, query, length=None):
+    """
+    截取包含检索词的片段并用<mark>标记，其余内容做HTML转义
+
+    Args:
+        text: 原文
+        query: 检索词
+        length: 片段长度，None表示不截取
+
+    Returns:
+        str: 高亮后的片段
+    """
+    text = text or ''
+    pattern = _highlight_pattern(query)
+    match = pattern.search(text) if pattern else None
+
+    prefix = suffix = ''
+    if length and len(text) > length:
+        start = max(match.start() - length // 4, 0) if match else 0
+        end = min(start + length, len(text))
+        start = max(end - length, 0)
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if end < len(text) else ''
+        text = text[start:end]
+
+    if not pattern:
+        return prefix + html.escape(text) + suffix
+    parts = []
+    position = 0
+    for found in pattern.finditer(text):
+        parts.append(html.escape(text[position:found.start()]))
+        parts.append(f'<mark>{html.escape(found.group())}</mark>')
+        position = found.end()
+    parts.append(html.escape(text[position:]))
+    return prefix + ''.join(parts) + suffix
+
+
+def build_highlights(article, query, config=None):
+    """
+    生成文章的标题高亮和内容摘录
+
+    Args:
+        article: 文章对象
+        query: 检索词
+        config: 检索配置
+
+    Returns:
+        dict: {'title': 高亮标题, 'snippet': 内容摘录}
+    """
+    config = config or get_search_config()
+    return {
+        'title': highlight(article.title, query),
+        'snippet': highlight(article_text(article, 'content') or article_text(article, 'excerpt'), query, config['SNIPPET_LENGTH']),
+    }
@@ -2,8 +2,9 @@
 CMS系统序列化器
 """
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
-from django.utils.text import slugify
 from django.utils import timezone
 from users.serializers import UserSerializer
 from tenants.serializers import TenantSerializer
@@ -14,6 +15,9 @@ from .models import (
     ArticleStatistics, ArticleVersion, Interaction,
     UserLevel, UserLevelRelation, AccessLog, OperationLog
 )
+from .relations import sync_article_relation, validate_relation_ids
+from .slugs import slug_base, slug_matches
+from .versioning import create_version
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -96,11 +100,25 @@ class ArticleVersionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'article', 'title', 'content', 'content_type',
             'excerpt', 'editor', 'editor_info', 'version_number',
-            'change_description', 'created_at', 'diff_data', 'tenant'
+            'change_description', 'created_at', 'tenant'
         ]
         read_only_fields = ['id', 'created_at', 'tenant', 'version_number']
 
 
+class ArticleVersionListSerializer(serializers.ModelSerializer):
+    """文章版本列表序列化器，不包含内容"""
+    
+    editor_info = UserSerializer(source='editor', read_only=True)
+    
+    class Meta:
+        model = ArticleVersion
+        fields = [
+            'id', 'article', 'title', 'content_type', 'excerpt', 'editor',
+            'editor_info', 'version_number', 'change_description', 'created_at', 'tenant'
+        ]
+        read_only_fields = fields
+
+
 class CommentSerializer(serializers.ModelSerializer):
     """评论序列化器"""
     
@@ -148,7 +166,12 @@ class SimpleTagSerializer(serializers.ModelSerializer):
 
 
 class ArticleListSerializer(serializers.ModelSerializer):
-    """文章列表序列化器，用于返回文章列表，包含基本信息"""
+    """
+    文章列表序列化器，用于返回文章列表，包含基本信息
+    
+    分类、标签、统计和作者租户只从预加载缓存中读取，
+    查询集需先经过setup_eager_loading处理，否则每篇文章会额外产生查询
+    """
     
     author_info = UserSerializer(source='author', read_only=True)
     categories = serializers.SerializerMethodField()
@@ -166,40 +189,88 @@ class ArticleListSerializer(serializers.ModelSerializer):
             'likes_count', 'views_count'
         ]
     
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        为列表查询集预加载关联数据
+        
+        - 作者及作者租户、文章统计通过JOIN一次取回
+        - 分类和标签关系各用一条IN查询预加载
+        
+        Args:
+            queryset: 文章查询集
+            
+        Returns:
+            预加载后的查询集
+        """
+        return queryset.select_related(
+            'author__tenant', 'statistics'
+        ).prefetch_related(
+            Prefetch(
+                'article_categories',
+                queryset=ArticleCategory.objects.select_related('category'),
+                to_attr='prefetched_categories'
+            ),
+            Prefetch(
+                'article_tags',
+                queryset=ArticleTag.objects.select_related('tag'),
+                to_attr='prefetched_tags'
+            ),
+        )
+    
     def get_categories(self, obj) -> list:
         """获取文章关联的分类"""
-        categories = Category.objects.filter(
-            article_categories__article=obj
-        )
+        relations = getattr(obj, 'prefetched_categories', None)
+        if relations is None:
+            categories = Category.objects.filter(article_categories__article=obj)
+        else:
+            categories = [relation.category for relation in relations]
         return SimpleCategorySerializer(categories, many=True).data
     
     def get_tags(self, obj) -> list:
         """获取文章关联的标签"""
-        tags = Tag.objects.filter(
-            article_tags__article=obj
-        )
+        relations = getattr(obj, 'prefetched_tags', None)
+        if relations is None:
+            tags = Tag.objects.filter(article_tags__article=obj)
+        else:
+            tags = [relation.tag for relation in relations]
         return SimpleTagSerializer(tags, many=True).data
     
+    def _get_statistics(self, obj):
+        """获取文章统计记录，不存在时返回None"""
+        try:
+            return obj.statistics
+        except ArticleStatistics.DoesNotExist:
+            return None
+    
     def get_comments_count(self, obj) -> int:
         """获取文章评论数"""
-        try:
-            return obj.statistics.comments_count
-        except:
-            return 0
+        stats = self._get_statistics(obj)
+        return stats.comments_count if stats else 0
     
     def get_likes_count(self, obj) -> int:
         """获取文章点赞数"""
-        try:
-            return obj.statistics.likes_count
-        except:
-            return 0
+        stats = self._get_statistics(obj)
+        return stats.likes_count if stats else 0
     
     def get_views_count(self, obj) -> int:
         """获取文章浏览数"""
-        try:
-            return obj.statistics.views_count
-        except:
-            return 0
+        stats = self._get_statistics(obj)
+        return stats.views_count if stats else 0
+
+
+class ArticleSearchResultSerializer(ArticleListSerializer):
+    """
+    文章检索结果序列化器，在列表字段基础上增加得分和高亮片段
+    
+    score和highlight由检索视图写入文章对象
+    """
+    
+    score = serializers.IntegerField(read_only=True)
+    highlight = serializers.DictField(child=serializers.CharField(), read_only=True)
+    
+    class Meta(ArticleListSerializer.Meta):
+        fields = ArticleListSerializer.Meta.fields + ['score', 'highlight']
 
 
 class ArticleDetailSerializer(serializers.ModelSerializer):
@@ -242,7 +313,7 @@ class ArticleDetailSerializer(serializers.ModelSerializer):
     def get_version_info(self, obj) -> dict:
         """获取文章版本信息"""
         try:
-            latest_version = obj.versions.order_by('-version_number').first()
+            latest_version = obj.versions.select_related('editor').defer('content', 'diff_data').order_by('-version_number').first()
             if latest_version:
                 return {
                     'current_version': latest_version.version_number,
@@ -287,42 +358,23 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
     
     def validate(self, data):
         """验证文章数据"""
-        # 验证分类和标签的存在性和权限
-        category_ids = data.pop('category_ids', [])
-        tag_ids = data.pop('tag_ids', [])
-        tenant = self.context['request'].user.tenant
+        # 验证分类和标签的存在性和权限，每种关联一次查询
+        # 未提供时为None，更新时保留原有关联
+        category_ids = data.pop('category_ids', None)
+        tag_ids = data.pop('tag_ids', None)
+        tenant_id = self.context['request'].user.tenant_id
         
-        if category_ids:
-            for category_id in category_ids:
-                try:
-                    Category.objects.get(id=category_id, tenant=tenant)
-                except Category.DoesNotExist:
-                    raise serializers.ValidationError(_(f"分类ID {category_id} 不存在或无权限访问"))
+        if category_ids is not None:
+            category_ids = validate_relation_ids('categories', category_ids, tenant_id)
         
-        if tag_ids:
-            for tag_id in tag_ids:
-                try:
-                    Tag.objects.get(id=tag_id, tenant=tenant)
-                except Tag.DoesNotExist:
-                    raise serializers.ValidationError(_(f"标签ID {tag_id} 不存在或无权限访问"))
+        if tag_ids is not None:
+            tag_ids = validate_relation_ids('tags', tag_ids, tenant_id)
         
-        # 处理slug
+        # 处理slug: 创建时由Article.save分配；更新时标题变化导致前缀不同才清空，保存时重新分配
         title = data.get('title')
         instance = getattr(self, 'instance', None)
-        
-        # 如果是更新且未提供标题，不需要重新生成slug
-        if instance and not title:
-            pass
-        # 如果是创建或更新且提供了标题，生成新的slug
-        elif title:
-            slug = slugify(title)
-            # 确保slug唯一
-            i = 1
-            original_slug = slug
-            while Article.objects.filter(slug=slug).exclude(id=getattr(instance, 'id', None)).exists():
-                slug = f"{original_slug}-{i}"
-                i += 1
-            data['slug'] = slug
+        if instance and title and not slug_matches(instance.slug, slug_base(Article, title)):
+            data['slug'] = ''
         
         # 处理发布逻辑
         publish_now = data.pop('publish_now', False)
@@ -349,6 +401,7 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
         
         return data
     
+    @transaction.atomic
     def create(self, validated_data):
         """创建文章，并关联分类、标签和元数据"""
         meta_data = validated_data.pop('meta', None)
@@ -366,43 +419,18 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
         if meta_data:
             ArticleMeta.objects.create(article=article, tenant=tenant, **meta_data)
         
-        # 创建分类关联
-        for category_id in self._category_ids:
-            ArticleCategory.objects.create(
-                article=article,
-                category_id=category_id,
-                tenant=tenant
-            )
-        
-        # 创建标签关联
-        for tag_id in self._tag_ids:
-            ArticleTag.objects.create(
-                article=article,
-                tag_id=tag_id,
-                tenant=tenant
-            )
+        # 批量创建分类和标签关联
+        sync_article_relation(article, 'categories', self._category_ids or [], created=True)
+        sync_article_relation(article, 'tags', self._tag_ids or [], created=True)
         
         # 创建初始版本
-        ArticleVersion.objects.create(
-            article=article,
-            title=article.title,
-            content=article.content,
-            content_type=article.content_type,
-            excerpt=article.excerpt,
-            editor=validated_data['author'],
-            version_number=1,
-            change_description="初始版本",
-            tenant=tenant
-        )
+        create_version(article, validated_data['author'], "初始版本", tenant)
         
-        # 创建统计记录
-        ArticleStatistics.objects.create(
-            article=article,
-            tenant=tenant
-        )
+        # 统计记录由Article.save在首次插入时创建
         
         return article
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         """更新文章，并更新关联的分类、标签和元数据"""
         meta_data = validated_data.pop('meta', None)
@@ -429,29 +457,12 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
                     setattr(meta, key, value)
                 meta.save()
         
-        # 更新分类关联
-        if hasattr(self, '_category_ids'):
-            # 删除旧关联
-            ArticleCategory.objects.filter(article=article).delete()
-            # 创建新关联
-            for category_id in self._category_ids:
-                ArticleCategory.objects.create(
-                    article=article,
-                    category_id=category_id,
-                    tenant=tenant
-                )
+        # 更新分类和标签关联：只删除被移除的、批量插入新增的
+        if getattr(self, '_category_ids', None) is not None:
+            sync_article_relation(article, 'categories', self._category_ids)
         
-        # 更新标签关联
-        if hasattr(self, '_tag_ids'):
-            # 删除旧关联
-            ArticleTag.objects.filter(article=article).delete()
-            # 创建新关联
-            for tag_id in self._tag_ids:
-                ArticleTag.objects.create(
-                    article=article,
-                    tag_id=tag_id,
-                    tenant=tenant
-                )
+        if getattr(self, '_tag_ids', None) is not None:
+            sync_article_relation(article, 'tags', self._tag_ids)
         
         # 创建新版本
         if hasattr(self, '_create_new_version') and self._create_new_version:
@@ -461,21 +472,12 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
                 old_content_type != article.content_type or 
                 old_excerpt != article.excerpt):
                 
-                # 获取最新版本号
-                latest_version = ArticleVersion.objects.filter(article=article).order_by('-version_number').first()
-                new_version_number = latest_version.version_number + 1 if latest_version else 1
-                
-                # 创建新版本
-                ArticleVersion.objects.create(
-                    article=article,
-                    title=article.title,
-                    content=article.content,
-                    content_type=article.content_type,
-                    excerpt=article.excerpt,
-                    editor=self.context['request'].user,
-                    version_number=new_version_number,
-                    change_description=getattr(self, '_change_description', None) or "更新文章",
-                    tenant=tenant
+                # 创建新版本，按配置保存为快照或相对上一版本的差异
+                create_version(
+                    article,
+                    self.context['request'].user,
+                    getattr(self, '_change_description', None) or "更新文章",
+                    tenant
                 )
         
         return article
@@ -0,0 +1,39 @@
+"""
+CMS系统信号处理器
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from common.utils.tenant_cache import register_cached_models
+from .models import Article, ArticleCategory, ArticleTag, Category, Tag
+from .category_tree import invalidate_category_tree
+from .search import INDEXED_FIELDS, index_article_by_id
+
+# 文章列表、标签统计等响应缓存依赖的模型，变更时更新缓存版本戳
+register_cached_models(Article, ArticleCategory, ArticleTag, Category, Tag)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """
+    分类保存或删除后使分类树缓存失效
+
+    在事务提交后执行，避免其他请求在提交前用旧数据重新填充缓存
+    """
+    tenant_id = instance.tenant_id
+    transaction.on_commit(lambda: invalidate_category_tree(tenant_id))
+
+
+@receiver(post_save, sender=Article)
+def article_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    文章保存后重建其检索索引
+
+    只更新了与检索无关的字段(例如状态)时跳过；在事务提交后执行，读取提交后的内容
+    """
+    if update_fields is not None and not set(update_fields).intersection(INDEXED_FIELDS):
+        return
+    article_id = instance.pk
+    transaction.on_commit(lambda: index_article_by_id(article_id))
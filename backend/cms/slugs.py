@@ -0,0 +1,118 @@
+"""
+CMS模型的slug分配
+- 一次查询找出 base 和 base-数字 中最大的后缀，返回下一个可用的slug，不再逐个尝试 base-1、base-2...
+- 并发创建拿到相同slug时，唯一约束报错后重新分配并重试保存
+- 文章、分类、标签组、标签共用
+"""
+import logging
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+# 为"-数字"后缀预留的长度
+SUFFIX_RESERVED_LENGTH = 8
+
+# 唯一约束冲突后重新分配slug的最多次数
+MAX_SAVE_ATTEMPTS = 5
+
+
+def slug_base(model, text, field='slug'):
+    """
+    根据文本生成slug前缀
+
+    保留中文等Unicode字符，不同标题的中文文章不再共用同一个前缀；
+    文本只包含标点等无法生成slug的字符时使用模型名作为前缀
+
+    Args:
+        model: 模型类
+        text: 标题或名称
+        field: slug字段名
+
+    Returns:
+        str: slug前缀
+    """
+    max_length = model._meta.get_field(field).max_length
+    base = slugify(text or '', allow_unicode=True)[:max_length - SUFFIX_RESERVED_LENGTH].strip('-')
+    return base or model._meta.model_name
+
+
+def slug_matches(slug, base):
+    """
+    判断slug是否由指定前缀分配(base 或 base-数字)
+
+    Args:
+        slug: 已有slug
+        base: slug前缀
+
+    Returns:
+        bool
+    """
+    return bool(slug) and (slug == base or re.fullmatch(rf'{re.escape(base)}-[0-9]+', slug) is not None)
+
+
+def allocate_slug(model, text, instance=None, field='slug'):
+    """
+    为模型分配唯一slug，一次查询
+
+    Args:
+        model: 模型类
+        text: 标题或名称
+        instance: 正在更新的对象，查询时排除自身；其现有slug与新前缀匹配时直接保留
+        field: slug字段名
+
+    Returns:
+        str: 可用的slug
+    """
+    base = slug_base(model, text, field)
+    current = getattr(instance, field, None) if instance is not None else None
+    if instance is not None and instance.pk and slug_matches(current, base):
+        return current
+
+    # base本身记为后缀0，base-数字截取数字部分，取最大值
+    # 先用前缀条件走slug索引的范围扫描，正则只检查前缀命中的行
+    queryset = model._default_manager.filter(
+        Q(**{field: base})
+        | Q(**{f'{field}__startswith': f'{base}-', f'{field}__regex': rf'^{re.escape(base)}-[0-9]+$'})
+    )
+    if instance is not None and instance.pk:
+        queryset = queryset.exclude(pk=instance.pk)
+    result = queryset.aggregate(
+        count=Count('pk'),
+        max_suffix=Max(Case(
+            When(**{field: base}, then=Value(0)),
+            default=Cast(Substr(field, len(base) + 2), IntegerField()),
+            output_field=IntegerField(),
+        )),
+    )
+    if not result['count']:
+        return base
+    return f"{base}-{(result['max_suffix'] or 0) + 1}"
+
+
+def save_with_unique_slug(instance, save, text, field='slug'):
+    """
+    保存对象，slug与并发写入的记录冲突时重新分配后重试
+
+    Args:
+        instance: 要保存的对象，slug已经分配
+        save: 实际执行保存的函数(通常是父类的save)
+        text: 生成slug的标题或名称
+        field: slug字段名
+    """
+    model = type(instance)
+    for attempt in range(1, MAX_SAVE_ATTEMPTS + 1):
+        try:
+            with transaction.atomic(using=model._default_manager.db):
+                return save()
+        except IntegrityError:
+            slug = getattr(instance, field)
+            conflict = model._default_manager.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if attempt == MAX_SAVE_ATTEMPTS or not conflict:
+                raise
+            setattr(instance, field, allocate_slug(model, text, field=field))
+            logger.info(f"{model.__name__} slug {slug} 已被占用，重新分配为 {getattr(instance, field)}")
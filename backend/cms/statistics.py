@@ -0,0 +1,206 @@
+"""
+文章统计
+- 通过单条原子UPDATE累加计数，避免读-改-写丢失并发更新
+- 将访问日志按文章、日期和维度汇总到ArticleDailyStatistics，统计接口读取汇总数据
+"""
+import datetime
+import logging
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import F, Count, IntegerField, Sum, Min, Max
+from django.db.models.functions import Cast, Floor, TruncDate
+from django.utils import timezone
+
+from .models import AccessLog, ArticleDailyStatistics, ArticleStatistics
+
+logger = logging.getLogger(__name__)
+
+
+def parse_reading_time(value):
+    """
+    解析阅读时长(秒)
+
+    Args:
+        value: 请求中提交的阅读时长
+
+    Returns:
+        int: 阅读时长，无效或非正数时返回None
+    """
+    if value in (None, ''):
+        return None
+    try:
+        reading_time = int(value)
+    except (ValueError, TypeError):
+        logger.warning(f"无效的阅读时间格式: {value}")
+        return None
+    return reading_time if reading_time > 0 else None
+
+
+def increment_article_views(article_id, tenant_id, views=1, reading_time_total=0, reading_time_count=0):
+    """
+    原子累加文章阅读数和阅读时长
+
+    Args:
+        article_id: 文章ID
+        tenant_id: 租户ID
+        views: 新增阅读次数
+        reading_time_total: 新增阅读时长之和(秒)
+        reading_time_count: 新增的带阅读时长的记录数
+    """
+    updates = {}
+    if reading_time_count:
+        # 平均值必须放在第一个赋值：MySQL按顺序求值，之后的赋值会改变同一行的F()取值
+        # MySQL的整数除法结果为小数，写入整数字段时四舍五入，显式向下取整与SQLite及新建记录一致
+        updates['avg_reading_time'] = Cast(Floor(
+            (F('reading_time_total') + reading_time_total)
+            / (F('reading_time_count') + reading_time_count)
+        ), IntegerField())
+        updates['reading_time_total'] = F('reading_time_total') + reading_time_total
+        updates['reading_time_count'] = F('reading_time_count') + reading_time_count
+    updates['views_count'] = F('views_count') + views
+    updates['last_updated_at'] = timezone.now()
+
+    if ArticleStatistics.objects.filter(article_id=article_id).update(**updates):
+        return
+
+    # 统计记录不存在时创建，并发创建冲突则退回原子更新
+    try:
+        with transaction.atomic():
+            ArticleStatistics.objects.create(
+                article_id=article_id,
+                tenant_id=tenant_id,
+                views_count=views,
+                reading_time_total=reading_time_total,
+                reading_time_count=reading_time_count,
+                avg_reading_time=reading_time_total // reading_time_count if reading_time_count else 0,
+            )
+    except IntegrityError:
+        ArticleStatistics.objects.filter(article_id=article_id).update(**updates)
+
+
+# 汇总的维度及对应的AccessLog字段
+ROLLUP_DIMENSIONS = ('country', 'device', 'browser', 'referer')
+
+# 各维度在统计接口中返回的条目数
+DIMENSION_LIMITS = {'country': 10, 'device': 5, 'browser': 5, 'referer': 10}
+
+
+def _day_range(day):
+    """
+    获取某一天在当前时区下的起止时间
+    """
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+def get_rollup_watermark():
+    """
+    获取已汇总的最后一天
+
+    Returns:
+        date: 最后汇总的日期，尚未汇总时返回None
+    """
+    return ArticleDailyStatistics.objects.aggregate(last=Max('date'))['last']
+
+
+def get_first_access_date():
+    """
+    获取最早一条访问日志的日期
+    """
+    first = AccessLog.objects.aggregate(first=Min('created_at'))['first']
+    return timezone.localtime(first).date() if first else None
+
+
+def rollup_day(day):
+    """
+    重新汇总某一天的访问日志，可重复执行
+
+    Args:
+        day: 日期
+
+    Returns:
+        int: 写入的汇总记录数
+    """
+    start, end = _day_range(day)
+    logs = AccessLog.objects.filter(created_at__gte=start, created_at__lt=end).order_by()
+
+    rows = [
+        ArticleDailyStatistics(
+            article_id=item['article_id'], tenant_id=item['tenant_id'],
+            date=day, dimension='views', value='', count=item['count']
+        )
+        for item in logs.values('article_id', 'tenant_id').annotate(count=Count('id'))
+    ]
+    for dimension in ROLLUP_DIMENSIONS:
+        # 空值与NULL合并为同一个取值
+        counts = Counter()
+        for item in logs.values('article_id', 'tenant_id', dimension).annotate(count=Count('id')):
+            counts[(item['article_id'], item['tenant_id'], item[dimension] or '')] += item['count']
+        rows.extend(
+            ArticleDailyStatistics(
+                article_id=article_id, tenant_id=tenant_id,
+                date=day, dimension=dimension, value=value[:255], count=count
+            )
+            for (article_id, tenant_id, value), count in counts.items()
+        )
+
+    with transaction.atomic():
+        ArticleDailyStatistics.objects.filter(date=day).delete()
+        ArticleDailyStatistics.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def get_article_statistics(article, start_date=None, end_date=None):
+    """
+    获取文章在日期范围内的访问分析
+
+    已汇总的日期读取汇总数据，汇总水位之后的日期(包括当天和尚未执行汇总的日期)从访问日志实时计算
+
+    Args:
+        article: 文章对象
+        start_date: 起始日期(含)，None表示不限
+        end_date: 结束日期(含)，None表示到今天
+
+    Returns:
+        dict: views为按日期的阅读量列表，其余键为各维度的{取值: 次数}
+    """
+    today = timezone.localdate()
+    end_date = min(end_date or today, today)
+    watermark = get_rollup_watermark()
+    # 从该日期起读取访问日志，None表示尚未汇总过，全部读取访问日志
+    raw_from = min(watermark + datetime.timedelta(days=1), today) if watermark else None
+
+    views = {}
+    dimensions = {dimension: Counter() for dimension in ROLLUP_DIMENSIONS}
+    if raw_from is not None:
+        rollups = ArticleDailyStatistics.objects.filter(article=article, date__lte=end_date, date__lt=raw_from)
+        if start_date:
+            rollups = rollups.filter(date__gte=start_date)
+        views.update(
+            (item['date'], item['count'])
+            for item in rollups.filter(dimension='views').values('date', 'count').order_by('date')
+        )
+        for item in rollups.exclude(dimension='views').values('dimension', 'value') \
+                .annotate(total=Sum('count')).order_by():
+            dimensions[item['dimension']][item['value']] += item['total']
+
+    # 汇总水位之后的日期尚未汇总，从访问日志计算
+    log_start = max(filter(None, (start_date, raw_from)), default=None)
+    if log_start is None or log_start <= end_date:
+        logs = AccessLog.objects.filter(article=article, created_at__lt=_day_range(end_date)[1]).order_by()
+        if log_start is not None:
+            logs = logs.filter(created_at__gte=_day_range(log_start)[0])
+        log_views = {
+            item['day']: item['count']
+            for item in logs.annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id'))
+        }
+        if log_views:
+            views.update(log_views)
+            for dimension in ROLLUP_DIMENSIONS:
+                for item in logs.values(dimension).annotate(count=Count('id')):
+                    dimensions[dimension][item[dimension] or ''] += item['count']
+
+    result = {'views': [{'date': day, 'count': count} for day, count in sorted(views.items())]}
+    for dimension, counts in dimensions.items():
+        result[dimension] = counts.most_common(DIMENSION_LIMITS[dimension])
+    return result
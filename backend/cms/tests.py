@@ -1,3 +1,855 @@
-from django.test import TestCase
+from io import StringIO
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from users.models import User
+from tenants.models import Tenant
+from cms.models import (
+    Article, Category, Tag, ArticleCategory, ArticleTag, ArticleStatistics, AccessLog,
+    ArticleDailyStatistics, ArticleVersion, ArticleSearchToken
+)
+from cms.category_tree import build_category_tree, get_category_tree
+from cms.access_log_buffer import AccessLogBuffer, shutdown_access_log_buffer
+from cms.statistics import get_article_statistics, rollup_day
+from cms.slugs import allocate_slug, save_with_unique_slug
+from cms.search import search_article_ids
+from cms.versioning import create_version, load_version, load_versions_with_content
 
-# Create your tests here.
+
+class ArticleListQueryCountTestCase(TestCase):
+    """
+    文章列表查询数回归测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(
+            name='测试租户',
+            code='test',
+            status='active'
+        )
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            is_admin=True,
+            tenant=self.tenant
+        )
+
+        categories = [
+            Category.objects.create(name=f'分类{i}', slug=f'category-{i}', tenant=self.tenant)
+            for i in range(3)
+        ]
+        tags = [
+            Tag.objects.create(name=f'标签{i}', slug=f'tag-{i}', tenant=self.tenant)
+            for i in range(3)
+        ]
+
+        for i in range(30):
+            article = Article.objects.create(
+                title=f'文章{i}',
+                slug=f'article-{i}',
+                content='内容',
+                author=self.author,
+                status='published',
+                tenant=self.tenant
+            )
+            for category in categories:
+                ArticleCategory.objects.create(article=article, category=category, tenant=self.tenant)
+            for tag in tags:
+                ArticleTag.objects.create(article=article, tag=tag, tenant=self.tenant)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+        self.url = reverse('cms:article-list')
+
+    def _count_list_queries(self, page_size):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {'page_size': page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # API日志中间件的写入不属于列表查询
+        queries = [
+            query for query in context.captured_queries
+            if 'common_api_log' not in query['sql']
+        ]
+        return len(queries), response
+
+    def test_list_query_count_is_constant(self):
+        """
+        测试文章列表的查询数不随分页大小增长
+        """
+        small_count, _ = self._count_list_queries(page_size=2)
+        large_count, response = self._count_list_queries(page_size=30)
+
+        self.assertEqual(small_count, large_count)
+        # 分页COUNT + 文章(含作者、租户、统计) + 分类关系 + 标签关系
+        self.assertLessEqual(large_count, 4)
+
+        article = response.json()['data']['results'][0]
+        self.assertEqual(len(article['categories']), 3)
+        self.assertEqual(len(article['tags']), 3)
+        self.assertEqual(article['views_count'], 0)
+        self.assertEqual(article['author_info']['tenant_name'], self.tenant.name)
+
+
+class CategoryTreeTestCase(TestCase):
+    """
+    分类树构建与缓存测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.other_tenant = Tenant.objects.create(name='其他租户', code='other', status='active')
+
+        self.root = Category.objects.create(name='根分类', slug='root', tenant=self.tenant)
+        self.child = Category.objects.create(
+            name='子分类', slug='child', parent=self.root, tenant=self.tenant
+        )
+        self.inactive = Category.objects.create(
+            name='停用分类', slug='inactive', parent=self.root, tenant=self.tenant, is_active=False
+        )
+        Category.objects.create(
+            name='孙分类', slug='grandchild', parent=self.inactive, tenant=self.tenant
+        )
+        Category.objects.create(name='其他根分类', slug='other-root', tenant=self.other_tenant)
+
+    def test_build_tree_in_one_query(self):
+        """
+        测试分类树只需一次查询
+        """
+        with self.assertNumQueries(1):
+            tree = build_category_tree(tenant_id=self.tenant.id)
+
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(tree[0]['id'], self.root.id)
+        children = {node['slug']: node for node in tree[0]['children']}
+        self.assertEqual(set(children), {'child', 'inactive'})
+        self.assertEqual(len(children['inactive']['children']), 1)
+
+    def test_active_only_prunes_inactive_subtrees(self):
+        """
+        测试只包含激活分类时，停用分类的子树被排除
+        """
+        tree = build_category_tree(tenant_id=self.tenant.id, active_only=True)
+        self.assertEqual([node['slug'] for node in tree[0]['children']], ['child'])
+
+    def test_tree_is_cached_and_invalidated(self):
+        """
+        测试分类树缓存与失效
+        """
+        with self.assertNumQueries(1):
+            get_category_tree(tenant_id=self.tenant.id)
+        with self.assertNumQueries(0):
+            get_category_tree(tenant_id=self.tenant.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='新分类', slug='new', tenant=self.tenant)
+
+        with self.assertNumQueries(1):
+            tree = get_category_tree(tenant_id=self.tenant.id)
+        self.assertEqual({node['slug'] for node in tree}, {'root', 'new'})
+
+
+@override_settings(CMS_ACCESS_LOG_BUFFER=dict(settings.CMS_ACCESS_LOG_BUFFER, ENABLED=False))
+class ArticleViewCounterTestCase(TestCase):
+    """
+    文章阅读计数测试
+
+    关闭缓冲写入，阅读记录在请求中同步写入，便于断言
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        # 其他测试可能已启动进程级缓冲写入器
+        shutdown_access_log_buffer()
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            is_admin=True,
+            tenant=self.tenant
+        )
+        self.article = Article.objects.create(
+            title='文章', slug='article', content='内容', author=self.author,
+            status='published', tenant=self.tenant
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+        self.url = reverse('cms:article-record-view', args=[self.article.id])
+
+    def test_record_view_increments_atomically(self):
+        """
+        测试阅读次数和平均阅读时长由原子累加维护
+        """
+        for reading_time in (10, 21, None, 'invalid'):
+            data = {'reading_time': reading_time} if reading_time is not None else {}
+            response = self.client.post(self.url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        stats = ArticleStatistics.objects.get(article=self.article)
+        self.assertEqual(stats.views_count, 4)
+        self.assertEqual(stats.reading_time_total, 31)
+        self.assertEqual(stats.reading_time_count, 2)
+        # 平均值向下取整
+        self.assertEqual(stats.avg_reading_time, 15)
+        self.assertEqual(AccessLog.objects.filter(article=self.article).count(), 4)
+
+
+class AccessLogBufferTestCase(TestCase):
+    """
+    访问日志缓冲写入测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            tenant=self.tenant
+        )
+        self.article = Article.objects.create(
+            title='文章', slug='article', content='内容', author=self.author,
+            status='published', tenant=self.tenant
+        )
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        self.buffer = AccessLogBuffer(spool_dir=self.spool_dir, batch_size=2)
+
+    def _event(self, reading_time=None):
+        return {
+            'article_id': self.article.id,
+            'user_id': None,
+            'tenant_id': self.tenant.id,
+            'ip_address': '127.0.0.1',
+            'reading_time': reading_time,
+            'created_at': '2024-01-01T08:00:00+00:00',
+        }
+
+    def test_flush_writes_spooled_events(self):
+        """
+        测试事件只写入spool，刷新时批量写入访问日志并累加统计
+        """
+        with self.assertNumQueries(0):
+            for reading_time in (10, 20, None):
+                self.assertTrue(self.buffer.enqueue(self._event(reading_time)))
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(AccessLog.objects.filter(article=self.article).count(), 3)
+        self.assertEqual(AccessLog.objects.first().created_at.year, 2024)
+
+        stats = ArticleStatistics.objects.get(article=self.article)
+        self.assertEqual(stats.views_count, 3)
+        self.assertEqual(stats.avg_reading_time, 15)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_recover_stale_segments(self):
+        """
+        测试接管已退出进程遗留的段
+        """
+        # 使用已退出进程的PID
+        owner = subprocess.Popen([sys.executable, '-c', 'pass'])
+        owner.wait()
+        path = os.path.join(self.spool_dir, f'access-{owner.pid}-1.open')
+        with open(path, 'w', encoding='utf-8') as segment:
+            segment.write('{"article_id": %d, "tenant_id": %d, "ip_address": "127.0.0.1"}\n'
+                          % (self.article.id, self.tenant.id))
+            segment.write('{"article_id": ')
+        stale = time.time() - 3600
+        os.utime(path, (stale, stale))
+
+        self.assertEqual(self.buffer.recover_segments(), 1)
+        self.buffer.flush()
+
+        self.assertEqual(AccessLog.objects.filter(article=self.article).count(), 1)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_live_owner_segments_are_not_claimed(self):
+        """
+        测试仍在运行的进程的段即使长时间未修改也不被接管，已消失的段不再重试
+        """
+        owner = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.addCleanup(owner.wait)
+        self.addCleanup(owner.kill)
+        path = os.path.join(self.spool_dir, f'access-{owner.pid}-1.ready')
+        with open(path, 'w', encoding='utf-8') as segment:
+            segment.write('{"article_id": %d, "tenant_id": %d}\n' % (self.article.id, self.tenant.id))
+        stale = time.time() - 3600
+        os.utime(path, (stale, stale))
+
+        self.assertEqual(self.buffer.recover_segments(), 0)
+        owner.kill()
+        owner.wait()
+        self.assertEqual(self.buffer.recover_segments(), 1)
+
+        claimed_path = self.buffer._pending_segments[0]
+        os.remove(claimed_path)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.get_stats()['pending_segments'], 0)
+
+
+    def test_poison_event_is_quarantined(self):
+        """
+        测试无法写入的事件移到failed/目录，同段其他事件正常写入，数据库不可用时整段保留重试
+        """
+        self.buffer.enqueue(self._event(10))
+        self.buffer.enqueue(dict(self._event(), reading_time='invalid'))
+        self.buffer.enqueue(self._event(20))
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(AccessLog.objects.filter(article=self.article).count(), 2)
+        self.assertEqual(self.buffer.get_stats()['quarantined'], 1)
+        self.assertEqual(os.listdir(self.spool_dir), ['failed'])
+        failed_dir = os.path.join(self.spool_dir, 'failed')
+        with open(os.path.join(failed_dir, os.listdir(failed_dir)[0]), encoding='utf-8') as failed:
+            self.assertEqual(json.loads(failed.read())['reading_time'], 'invalid')
+
+        self.buffer.enqueue(self._event())
+        with patch('cms.access_log_buffer.persist_access_events', side_effect=OperationalError('gone away')):
+            for _attempt in range(self.buffer.max_segment_attempts + 1):
+                self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.get_stats()['pending_segments'], 1)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(AccessLog.objects.filter(article=self.article).count(), 3)
+
+
+class ArticleDailyStatisticsTestCase(TestCase):
+    """
+    文章每日统计汇总测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            is_admin=True,
+            tenant=self.tenant
+        )
+        self.article = Article.objects.create(
+            title='文章', slug='article', content='内容', author=self.author,
+            status='published', tenant=self.tenant
+        )
+        now = timezone.now()
+        for days_ago, country in ((2, 'CN'), (1, 'CN'), (1, 'US'), (0, 'US')):
+            AccessLog.objects.create(
+                article=self.article, tenant=self.tenant, ip_address='127.0.0.1',
+                country=country, created_at=now - timedelta(days=days_ago)
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+        self.url = reverse('cms:article-statistics', args=[self.article.id])
+
+    def test_statistics_read_rollups_and_today(self):
+        """
+        测试统计接口读取已完成日期的汇总数据，当天从访问日志计算
+        """
+        call_command('rollup_article_statistics', stdout=StringIO())
+        self.assertEqual(
+            ArticleDailyStatistics.objects.filter(article=self.article, dimension='views').count(), 2
+        )
+
+        # 汇总后删除历史访问日志，接口结果不受影响
+        AccessLog.objects.filter(created_at__lt=timezone.now() - timedelta(hours=36)).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.json()['data']
+        self.assertEqual(sum(item['count'] for item in data['time_series']['views']), 4)
+        countries = {item['name']: item['count'] for item in data['demographics']['countries']}
+        self.assertEqual(countries, {'CN': 2, 'US': 2})
+
+        # 重复汇总结果不变
+        call_command('rollup_article_statistics', stdout=StringIO())
+        response = self.client.get(self.url, {'period': 'week'})
+        self.assertEqual(len(response.json()['data']['time_series']['views']), 3)
+
+    def test_statistics_read_logs_after_watermark(self):
+        """
+        测试汇总水位之后、当天之前的日期从访问日志计算，尚未汇总时全部读取访问日志
+        """
+        self.assertEqual(sum(item['count'] for item in get_article_statistics(self.article)['views']), 4)
+
+        # 只汇总了最早一天，之后的日期仍从访问日志计算
+        rollup_day(timezone.localdate() - timedelta(days=2))
+        stats = get_article_statistics(self.article)
+        self.assertEqual(len(stats['views']), 3)
+        self.assertEqual(sum(item['count'] for item in stats['views']), 4)
+        self.assertEqual(dict(stats['country']), {'CN': 2, 'US': 2})
+
+
+class TenantResponseCacheTestCase(TestCase):
+    """
+    租户响应缓存测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.other_tenant = Tenant.objects.create(name='其他租户', code='other', status='active')
+        self.user = User.objects.create_user(
+            username='member', email='member@example.com', password='password123',
+            tenant=self.tenant
+        )
+        self.other_user = User.objects.create_user(
+            username='other', email='other@example.com', password='password123',
+            tenant=self.other_tenant
+        )
+        Tag.objects.create(name='标签', slug='tag', tenant=self.tenant)
+        Tag.objects.create(name='其他标签', slug='other-tag', tenant=self.other_tenant)
+        self.client = APIClient()
+        self.url = reverse('cms:tag-get-usage-stats')
+
+    def _get_slugs(self, user):
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries = [query for query in context.captured_queries if 'common_api_log' not in query['sql']]
+        return {item['slug'] for item in response.json()['data']}, len(queries)
+
+    def test_response_cached_per_tenant_and_invalidated(self):
+        """
+        测试响应按租户缓存，模型变更后失效
+        """
+        slugs, _ = self._get_slugs(self.user)
+        self.assertEqual(slugs, {'tag'})
+
+        slugs, query_count = self._get_slugs(self.user)
+        self.assertEqual(slugs, {'tag'})
+        self.assertEqual(query_count, 0)
+
+        slugs, _ = self._get_slugs(self.other_user)
+        self.assertEqual(slugs, {'other-tag'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='新标签', slug='new-tag', tenant=self.tenant)
+
+        slugs, _ = self._get_slugs(self.user)
+        self.assertEqual(slugs, {'tag', 'new-tag'})
+
+    def test_bulk_archive_invalidates_article_list(self):
+        """
+        测试批量删除(update归档，不发送post_save信号)后已发布文章列表缓存失效
+        """
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password123',
+            is_admin=True, tenant=self.tenant
+        )
+        article = Article.objects.create(
+            title='文章', slug='article', content='内容', author=admin, status='published', tenant=self.tenant
+        )
+        self.client.force_authenticate(user=admin)
+        url = reverse('cms:article-list')
+
+        def published_ids():
+            response = self.client.get(url, {'status': 'published'}, HTTP_X_TENANT_ID=str(self.tenant.id))
+            return [item['id'] for item in response.data['results']]
+
+        self.assertEqual(published_ids(), [article.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                reverse('cms:article-batch-delete'), {'article_ids': [article.id]},
+                format='json', HTTP_X_TENANT_ID=str(self.tenant.id)
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(published_ids(), [])
+
+
+class ArticleRelationWriteTestCase(TestCase):
+    """
+    文章分类、标签关联批量写入测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            is_admin=True,
+            tenant=self.tenant
+        )
+        self.categories = [
+            Category.objects.create(name=f'分类{i}', slug=f'category-{i}', tenant=self.tenant)
+            for i in range(3)
+        ]
+        self.tags = [
+            Tag.objects.create(name=f'标签{i}', slug=f'tag-{i}', tenant=self.tenant)
+            for i in range(60)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+        self.url = reverse('cms:article-list')
+
+    def _create(self, title, tag_count):
+        payload = {
+            'title': title,
+            'content': 'content',
+            'category_ids': [category.id for category in self.categories],
+            'tag_ids': [tag.id for tag in self.tags[:tag_count]],
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        queries = [query for query in context.captured_queries if 'common_api_log' not in query['sql']]
+        return Article.objects.get(title=title), len(queries)
+
+    def test_create_query_count_is_constant(self):
+        """
+        测试创建文章的查询数不随标签数量增长
+        """
+        _, small_count = self._create('small article', 5)
+        article, large_count = self._create('large article', 50)
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(ArticleTag.objects.filter(article=article).count(), 50)
+        self.assertEqual(ArticleCategory.objects.filter(article=article).count(), 3)
+        self.assertTrue(ArticleStatistics.objects.filter(article=article).exists())
+
+    def test_update_only_changes_diff(self):
+        """
+        测试更新时只删除被移除的关联、插入新增的关联，未提供时保留原有关联
+        """
+        article, _ = self._create('article', 50)
+        kept_links = dict(
+            ArticleTag.objects.filter(article=article, tag__in=self.tags[:25]).values_list('tag_id', 'id')
+        )
+        detail_url = reverse('cms:article-detail', args=[article.id])
+
+        tag_ids = [tag.id for tag in self.tags[:25] + self.tags[50:55]]
+        response = self.client.patch(detail_url, {'tag_ids': tag_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        links = dict(ArticleTag.objects.filter(article=article).values_list('tag_id', 'id'))
+        self.assertEqual(set(links), set(tag_ids))
+        self.assertEqual({tag_id: links[tag_id] for tag_id in kept_links}, kept_links)
+        self.assertEqual(ArticleCategory.objects.filter(article=article).count(), 3)
+
+    def test_invalid_ids_are_rejected(self):
+        """
+        测试其他租户或不存在的ID被拒绝
+        """
+        other_tenant = Tenant.objects.create(name='其他租户', code='other', status='active')
+        other_tag = Tag.objects.create(name='其他标签', slug='other-tag', tenant=other_tenant)
+
+        response = self.client.post(self.url, {
+            'title': 'article', 'content': 'content', 'tag_ids': [self.tags[0].id, other_tag.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Article.objects.filter(title='article').exists())
+
+
+class SlugAllocationTestCase(TestCase):
+    """
+    slug分配测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            tenant=self.tenant
+        )
+
+    def test_allocation_uses_one_query(self):
+        """
+        已有大量同名slug时一次查询分配下一个后缀
+        """
+        Article.objects.bulk_create([
+            Article(title='News', slug='news' if i == 0 else f'news-{i}', content='content',
+                    author=self.author, tenant=self.tenant)
+            for i in range(30)
+        ])
+        Article.objects.create(title='Newsletter', slug='newsletter', content='content',
+                               author=self.author, tenant=self.tenant)
+
+        with CaptureQueriesContext(connection) as context:
+            slug = allocate_slug(Article, 'News')
+        self.assertEqual(slug, 'news-30')
+        self.assertEqual(len(context.captured_queries), 1)
+
+        article = Article.objects.create(title='News', content='content', author=self.author, tenant=self.tenant)
+        self.assertEqual(article.slug, 'news-30')
+        self.assertEqual(allocate_slug(Article, 'News', instance=article), 'news-30')
+
+    def test_cjk_title_keeps_its_own_prefix(self):
+        """
+        中文标题保留中文作为slug前缀，同名时追加后缀，不同标题互不影响
+        """
+        first = Article.objects.create(title='新闻', content='content', author=self.author, tenant=self.tenant)
+        second = Article.objects.create(title='新闻', content='content', author=self.author, tenant=self.tenant)
+        other = Article.objects.create(title='体育', content='content', author=self.author, tenant=self.tenant)
+        self.assertEqual((first.slug, second.slug, other.slug), ('新闻', '新闻-1', '体育'))
+        self.assertEqual(allocate_slug(Article, '新闻'), '新闻-2')
+
+        # 无法生成slug的名称使用模型名作为前缀
+        self.assertEqual(Tag.objects.create(name='！', tenant=self.tenant).slug, 'tag')
+
+    def test_conflicting_slug_is_reallocated_on_save(self):
+        """
+        分配后slug被并发写入占用时重新分配并保存成功
+        """
+        Tag.objects.create(name='Hot', tenant=self.tenant)
+        tag = Tag(name='Hot', tenant=self.tenant)
+        tag.slug = allocate_slug(Tag, tag.name)
+        Tag.objects.create(name='Hot', slug=tag.slug, tenant=self.tenant)
+        save_with_unique_slug(tag, lambda: super(Tag, tag).save(), tag.name)
+        self.assertEqual(tag.slug, 'hot-2')
+
+
+class ArticleVersionStorageTestCase(TestCase):
+    """
+    文章版本增量存储测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            is_admin=True,
+            tenant=self.tenant
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+        self.paragraphs = [f'第{i}段内容，' * 20 + '\n' for i in range(100)]
+
+    def _edit(self, article, edits):
+        contents = []
+        for index in range(edits):
+            self.paragraphs[index % len(self.paragraphs)] = f'第{index}次修改的段落\n'
+            article.content = ''.join(self.paragraphs)
+            article.save()
+            create_version(article, self.author, '更新文章', self.tenant)
+            contents.append(article.content)
+        return contents
+
+    def test_versions_are_stored_as_snapshots_and_deltas(self):
+        """
+        中间版本只保存差异，任意版本都能还原
+        """
+        article = Article.objects.create(
+            title='Versioned', content=''.join(self.paragraphs), author=self.author, tenant=self.tenant
+        )
+        create_version(article, self.author, '初始版本', self.tenant)
+        contents = [article.content]
+        contents += self._edit(article, 45)
+
+        versions = ArticleVersion.objects.filter(article=article)
+        snapshots = versions.filter(base_version__isnull=True).values_list('version_number', flat=True)
+        self.assertEqual(sorted(snapshots), [1, 21, 41])
+        stored = sum(len(v.content) + len(v.diff_data or '') for v in versions)
+        self.assertLess(stored * 5, sum(len(content) for content in contents))
+
+        with CaptureQueriesContext(connection) as context:
+            version = load_version(article, 40)
+        self.assertEqual(version.content, contents[39])
+        self.assertLessEqual(len(context.captured_queries), 2)
+
+        for version in load_versions_with_content(article):
+            self.assertEqual(version.content, contents[version.version_number - 1])
+
+    def test_single_line_html_is_stored_as_delta(self):
+        """
+        没有换行的HTML按标签切分比较，修改一段时只保存差异
+        """
+        blocks = [f'<p>{"第%d段内容，" % i * 20}</p>' for i in range(50)]
+        article = Article.objects.create(
+            title='Versioned', content=''.join(blocks), author=self.author, tenant=self.tenant
+        )
+        create_version(article, self.author, '初始版本', self.tenant)
+        blocks[10] = '<p>修改后的段落</p>'
+        article.content = ''.join(blocks)
+        version = create_version(article, self.author, '更新文章', self.tenant)
+
+        self.assertEqual(version.base_version, 1)
+        self.assertEqual(load_version(article, 2).content, article.content)
+
+    def test_versions_list_omits_content(self):
+        """
+        版本列表默认不返回内容
+        """
+        response = self.client.post(reverse('cms:article-list'), {
+            'title': 'Versioned', 'content': ''.join(self.paragraphs)
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        article = Article.objects.get(title='Versioned')
+        self._edit(article, 3)
+
+        url = reverse('cms:article-versions', args=[article.id])
+        response = self.client.get(url)
+        self.assertEqual([item['version_number'] for item in response.data], [4, 3, 2, 1])
+        self.assertNotIn('content', response.data[0])
+
+        response = self.client.get(url, {'include_content': 'true'})
+        self.assertEqual(response.data[0]['content'], article.content)
+
+        response = self.client.get(reverse('cms:article-get-version', args=[article.id, 3]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content'], load_version(article, 3).content)
+
+    def test_compact_command_converts_full_copies(self):
+        """
+        管理命令将历史上的完整副本转为快照和差异
+        """
+        article = Article.objects.create(
+            title='Legacy', content=''.join(self.paragraphs), author=self.author, tenant=self.tenant
+        )
+        contents = []
+        for number in range(1, 11):
+            self.paragraphs[number] = f'旧版本{number}\n'
+            contents.append(''.join(self.paragraphs))
+            ArticleVersion.objects.create(
+                article=article, title=article.title, content=contents[-1], content_type='markdown',
+                editor=self.author, version_number=number, tenant=self.tenant
+            )
+
+        call_command('compact_article_versions', stdout=StringIO())
+
+        self.assertEqual(ArticleVersion.objects.filter(article=article, base_version__isnull=True).count(), 1)
+        for number, content in enumerate(contents, start=1):
+            self.assertEqual(load_version(article, number).content, content)
+
+
+class ArticleSearchTestCase(TestCase):
+    """
+    文章全文检索测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.other_tenant = Tenant.objects.create(name='其他租户', code='other', status='active')
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password123',
+            is_admin=True,
+            tenant=self.tenant
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+        self.url = reverse('cms:article-search')
+
+    def _article(self, title, content, tenant=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Article.objects.create(
+                title=title, content=content, author=self.author, tenant=tenant or self.tenant
+            )
+
+    def test_search_ranks_and_highlights(self):
+        """
+        按相关度排序，支持中文并返回高亮片段
+        """
+        body = self._article('每日简报', '今天的新闻发布会上宣布了"新"政策&措施。')
+        title = self._article('新闻发布会实录', '发布会全文。')
+        self._article('体育', '比赛结果')
+        self._article('新闻发布会', '其他租户的文章', tenant=self.other_tenant)
+
+        response = self.client.get(self.url, {'q': '新闻发布'}, HTTP_X_TENANT_ID=str(self.tenant.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([item['id'] for item in results], [title.id, body.id])
+        self.assertEqual(results[0]['highlight']['title'], '<mark>新闻发布</mark>会实录')
+        self.assertIn('<mark>新闻发布</mark>会上宣布了&quot;新&quot;政策&amp;措施', results[1]['highlight']['snippet'])
+
+        response = self.client.get(self.url, {'q': '新闻 比赛'}, HTTP_X_TENANT_ID=str(self.tenant.id))
+        self.assertEqual(response.data['results'], [])
+
+        response = self.client.get(reverse('cms:article-list'), {'search': '策'}, HTTP_X_TENANT_ID=str(self.tenant.id))
+        self.assertEqual([item['id'] for item in response.data['results']], [body.id])
+
+    def test_search_filters_before_limiting_candidates(self):
+        """
+        过滤条件在截取候选之前生效，得分更高的不可见文章不挤占候选名额
+        """
+        self._article('新闻 新闻 新闻', '草稿')
+        published = self._article('每日简报', '新闻')
+        published.status = 'published'
+        published.save(update_fields=['status'])
+
+        with self.settings(CMS_SEARCH={'MAX_CANDIDATES': 1}):
+            response = self.client.get(
+                self.url, {'q': '新闻', 'status': 'published'}, HTTP_X_TENANT_ID=str(self.tenant.id)
+            )
+        self.assertEqual([item['id'] for item in response.data['results']], [published.id])
+
+    def test_markup_is_not_indexed(self):
+        """
+        HTML/Markdown的标签、属性和链接地址不进入索引，摘录中不包含标记
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(
+                title='简报', content='<div class="intro"><p>新闻 &amp; 发布</p></div>', content_type='html',
+                author=self.author, tenant=self.tenant
+            )
+            Article.objects.create(
+                title='链接', content='参见[官网](https://example.com/news)', content_type='markdown',
+                author=self.author, tenant=self.tenant
+            )
+        self.assertEqual(search_article_ids('div', self.tenant.id), [])
+        self.assertEqual(search_article_ids('intro', self.tenant.id), [])
+        self.assertEqual(search_article_ids('example', self.tenant.id), [])
+        self.assertEqual(len(search_article_ids('官网', self.tenant.id)), 1)
+
+        response = self.client.get(self.url, {'q': '新闻'}, HTTP_X_TENANT_ID=str(self.tenant.id))
+        self.assertEqual(response.data['results'][0]['id'], article.id)
+        self.assertEqual(response.data['results'][0]['highlight']['snippet'], '<mark>新闻</mark> &amp; 发布')
+
+    def test_index_follows_article_changes(self):
+        """
+        文章修改后索引随之更新，重建命令恢复批量写入的文章
+        """
+        article = self._article('Django Tips', 'Use select_related.')
+        self.assertEqual(search_article_ids('django', self.tenant.id)[0][0], article.id)
+
+        article.title = 'Python Tips'
+        with self.captureOnCommitCallbacks(execute=True):
+            article.save()
+        self.assertEqual(search_article_ids('django', self.tenant.id), [])
+        self.assertEqual(len(search_article_ids('python tips', self.tenant.id)), 1)
+
+        ArticleSearchToken.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search_article_ids('select_related', self.tenant.id)), 1)
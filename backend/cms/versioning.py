@@ -0,0 +1,294 @@
+"""
+文章版本的增量存储
+- 每隔SNAPSHOT_INTERVAL个版本保存一次完整内容(快照)，中间的版本只保存相对上一个版本的按段差异
+- 内容在换行、HTML标签结尾(>)和中文句末标点处切分为段，富文本编辑器保存的单行HTML也能按标签比较
+- 读取任意版本最多应用SNAPSHOT_INTERVAL-1个差异，两次查询
+- 差异不比完整内容小很多时(超过MAX_DELTA_RATIO)直接保存快照
+- 版本列表只读取元数据，不读取也不还原内容
+
+差异格式(存于diff_data，JSON数组):
+    [起始段, 结束段]  复制上一版本的 split_segments(内容)[起始段:结束段]
+    "文本"            插入文本
+base_version为空的版本是快照，content为完整内容；否则content为空，base_version为其所属快照的版本号
+"""
+import difflib
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import ArticleVersion
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.CMS_ARTICLE_VERSIONING 覆盖
+DEFAULT_VERSIONING_CONFIG = {
+    # 两个快照之间最多间隔的版本数，决定还原一个版本最多需要应用的差异数
+    'SNAPSHOT_INTERVAL': 20,
+    # 差异长度超过完整内容长度的该比例时保存快照
+    'MAX_DELTA_RATIO': 0.5,
+}
+
+
+def get_versioning_config():
+    """
+    获取合并了默认值的版本存储配置
+
+    Returns:
+        dict: 版本存储配置
+    """
+    config = dict(DEFAULT_VERSIONING_CONFIG)
+    config.update(getattr(settings, 'CMS_ARTICLE_VERSIONING', {}) or {})
+    return config
+
+
+# 段的结尾: 换行、HTML标签结尾、中文句末标点
+SEGMENT_END_PATTERN = re.compile(r'(?<=[\n>。！？])')
+
+
+def split_segments(text):
+    """
+    将文本切分为段，段保留结尾字符，拼接后与原文相同
+
+    Args:
+        text: 文本
+
+    Returns:
+        list: 段列表
+    """
+    return [segment for segment in SEGMENT_END_PATTERN.split(text) if segment]
+
+
+def compute_delta(old, new):
+    """
+    计算两个文本的按段差异
+
+    Args:
+        old: 上一版本内容
+        new: 新版本内容
+
+    Returns:
+        list: 差异操作列表
+    """
+    old_segments = split_segments(old)
+    new_segments = split_segments(new)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_segments, new_segments, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            text = ''.join(new_segments[j1:j2])
+            # 合并相邻的插入
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += text
+            else:
+                ops.append(text)
+    return ops
+
+
+def apply_delta(old, ops):
+    """
+    将差异应用到上一版本内容
+
+    Args:
+        old: 上一版本内容
+        ops: compute_delta返回的差异操作列表
+
+    Returns:
+        str: 新版本内容
+    """
+    old_segments = split_segments(old)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_segments[op[0]:op[1]])
+    return ''.join(parts)
+
+
+def encode_delta(ops):
+    """
+    将差异操作列表编码为紧凑的JSON
+    """
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def plan_storage(previous_content, content, version_number, base_version, config=None):
+    """
+    决定新版本以快照还是差异保存
+
+    Args:
+        previous_content: 上一版本内容，None表示没有上一版本
+        content: 新版本内容
+        version_number: 新版本号
+        base_version: 上一版本所属快照的版本号
+        config: 版本存储配置
+
+    Returns:
+        tuple: (content字段, diff_data字段, base_version字段)
+    """
+    config = config or get_versioning_config()
+    if previous_content is None or version_number - base_version >= config['SNAPSHOT_INTERVAL']:
+        return content, None, None
+
+    diff_data = encode_delta(compute_delta(previous_content, content))
+    if len(diff_data) > len(content) * config['MAX_DELTA_RATIO']:
+        return content, None, None
+    return '', diff_data, base_version
+
+
+def reconstruct_content(version):
+    """
+    还原版本的完整内容
+
+    快照直接返回；差异版本一次查询读取快照到上一版本的内容和差异，依次应用
+
+    Args:
+        version: ArticleVersion对象，需包含content、diff_data、base_version
+
+    Returns:
+        str: 完整内容
+    """
+    if version.base_version is None:
+        return version.content
+
+    chain = ArticleVersion.objects.filter(
+        article_id=version.article_id,
+        version_number__gte=version.base_version,
+        version_number__lt=version.version_number,
+    ).order_by('version_number').values_list('version_number', 'content', 'diff_data', 'base_version')
+
+    content = None
+    for number, stored_content, diff_data, base_version in chain:
+        if content is None:
+            if base_version is not None:
+                raise ArticleVersion.DoesNotExist(f"文章 {version.article_id} 的快照版本 {number} 缺失")
+            content = stored_content
+        else:
+            content = stored_content if base_version is None else apply_delta(content, json.loads(diff_data))
+    if content is None:
+        raise ArticleVersion.DoesNotExist(f"文章 {version.article_id} 的快照版本 {version.base_version} 缺失")
+    return apply_delta(content, json.loads(version.diff_data))
+
+
+def load_version(article, version_number):
+    """
+    读取文章的指定版本并还原内容
+
+    Args:
+        article: 文章对象
+        version_number: 版本号
+
+    Returns:
+        ArticleVersion: content为完整内容
+
+    Raises:
+        ArticleVersion.DoesNotExist: 版本不存在
+    """
+    version = ArticleVersion.objects.select_related('editor').get(article=article, version_number=version_number)
+    version.content = reconstruct_content(version)
+    return version
+
+
+def load_versions_with_content(article):
+    """
+    读取文章的全部版本并还原内容，按版本号升序一次遍历
+
+    Args:
+        article: 文章对象
+
+    Returns:
+        list: 按版本号降序排列的ArticleVersion列表，content为完整内容
+    """
+    versions = list(ArticleVersion.objects.filter(article=article).select_related('editor').order_by('version_number'))
+    content = None
+    for version in versions:
+        if version.base_version is None:
+            content = version.content
+        else:
+            content = apply_delta(content, json.loads(version.diff_data))
+            version.content = content
+    versions.reverse()
+    return versions
+
+
+def create_version(article, editor, change_description, tenant):
+    """
+    为文章当前内容创建新版本
+
+    Args:
+        article: 文章对象
+        editor: 编辑者
+        change_description: 变更说明
+        tenant: 租户
+
+    Returns:
+        ArticleVersion
+    """
+    latest = ArticleVersion.objects.filter(article=article).order_by('-version_number').first()
+    if latest is None:
+        version_number = 1
+        content, diff_data, base_version = plan_storage(None, article.content, version_number, None)
+    else:
+        version_number = latest.version_number + 1
+        content, diff_data, base_version = plan_storage(
+            reconstruct_content(latest), article.content, version_number,
+            latest.base_version if latest.base_version is not None else latest.version_number,
+        )
+
+    return ArticleVersion.objects.create(
+        article=article,
+        title=article.title,
+        content=content,
+        content_type=article.content_type,
+        excerpt=article.excerpt,
+        editor=editor,
+        version_number=version_number,
+        change_description=change_description,
+        diff_data=diff_data,
+        base_version=base_version,
+        tenant=tenant,
+    )
+
+
+@transaction.atomic
+def compact_article_versions(article_id, config=None):
+    """
+    按当前配置重新编排文章已有版本的存储(例如将历史上的完整副本转为快照+差异)
+
+    Args:
+        article_id: 文章ID
+        config: 版本存储配置
+
+    Returns:
+        tuple: (编排前存储的字符数, 编排后存储的字符数)
+    """
+    config = config or get_versioning_config()
+    versions = list(ArticleVersion.objects.filter(article_id=article_id).order_by('version_number'))
+    before = sum(len(version.content) + len(version.diff_data or '') for version in versions)
+
+    previous_content = None
+    base_version = None
+    changed = []
+    for version in versions:
+        if version.base_version is None:
+            content = version.content
+        else:
+            content = apply_delta(previous_content, json.loads(version.diff_data))
+
+        stored = plan_storage(previous_content, content, version.version_number, base_version, config)
+        if stored != (version.content, version.diff_data, version.base_version):
+            version.content, version.diff_data, version.base_version = stored
+            changed.append(version)
+        previous_content = content
+        base_version = stored[2] if stored[2] is not None else version.version_number
+
+    if changed:
+        ArticleVersion.objects.bulk_update(changed, ['content', 'diff_data', 'base_version'], batch_size=100)
+    after = sum(len(version.content) + len(version.diff_data or '') for version in versions)
+    logger.info(f"文章 {article_id} 的版本存储已重新编排: 更新 {len(changed)} 个版本，{before} -> {after} 字符")
+    return before, after
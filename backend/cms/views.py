@@ -1,7 +1,10 @@
 """
 CMS系统视图
 """
-from django.db.models import Q, Count, Avg
+import datetime
+import functools
+from django.db import transaction
+from django.db.models import Q, F, Count, Avg
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.http import Http404
@@ -18,19 +21,25 @@ from common.permissions import IsSuperAdmin, IsAdmin
 from common.pagination import StandardResultsSetPagination
 from common.authentication.jwt_auth import JWTAuthentication
 from common.viewsets import TenantModelViewSet
+from common.utils.tenant_cache import bump_model_version, cache_response
 from users.models import User
 from .models import (
     Article, Category, Tag, TagGroup, Comment, 
     ArticleCategory, ArticleTag, ArticleMeta,
     ArticleStatistics, ArticleVersion, Interaction,
-    UserLevel, UserLevelRelation, AccessLog, OperationLog
+    UserLevel, UserLevelRelation, OperationLog
 )
 from .serializers import (
     ArticleListSerializer, ArticleDetailSerializer, ArticleCreateUpdateSerializer,
     CategorySerializer, TagSerializer, TagGroupSerializer,
-    CommentSerializer, ArticleVersionSerializer, ArticleMetaSerializer,
-    ArticleStatisticsSerializer, InteractionSerializer
+    CommentSerializer, ArticleVersionSerializer, ArticleVersionListSerializer, ArticleMetaSerializer,
+    ArticleStatisticsSerializer, InteractionSerializer, ArticleSearchResultSerializer
 )
+from .category_tree import get_category_tree as get_cached_category_tree
+from .statistics import parse_reading_time, get_article_statistics
+from .access_log_buffer import build_access_event, get_access_log_buffer, persist_access_events
+from .versioning import load_version, load_versions_with_content
+from .search import ArticleSearchFilter, build_highlights, get_search_config, search_article_ids
 from .permissions import (
     ArticlePermission, CategoryPermission, TagPermission,
     CommentPermission, ArticleVersionPermission, ArticleMetaPermission,
@@ -217,10 +226,13 @@ class ArticleViewSet(TenantModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [ArticlePermission]
     pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # search参数通过倒排索引匹配标题、摘要和内容
+    filter_backends = [DjangoFilterBackend, ArticleSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'visibility', 'is_featured', 'is_pinned']
     search_fields = ['title', 'content', 'excerpt']
     ordering_fields = ['created_at', 'updated_at', 'published_at', 'title']
+    # 支持mode=cursor游标分页，按(created_at, id)定位，此时忽略sort排序参数
+    cursor_ordering = ('-created_at', '-id')
     ordering = ['-published_at', '-created_at']
     queryset = Article.objects.all().select_related('author', 'tenant')  # 添加select_related优化查询
     
@@ -283,7 +295,7 @@ class ArticleViewSet(TenantModelViewSet):
         if sort:
             if sort == 'views_count':
                 # 特殊处理浏览量排序，因为它在关联表中
-                queryset = queryset.annotate(views=models.F('statistics__views_count'))
+                queryset = queryset.annotate(views=F('statistics__views_count'))
                 order_field = 'views'
             else:
                 order_field = sort
@@ -293,8 +305,25 @@ class ArticleViewSet(TenantModelViewSet):
                 
             queryset = queryset.order_by(order_field)
         
+        # 列表页一次性预加载分类、标签、统计和作者租户，避免逐行查询
+        if self.action == 'list':
+            queryset = ArticleListSerializer.setup_eager_loading(queryset)
+        
         return queryset
     
+    @cache_response(
+        models=(Article, ArticleCategory, ArticleTag, Category, Tag),
+        condition=lambda request: request.query_params.get('status') == 'published'
+    )
+    def list(self, request, *args, **kwargs):
+        """
+        获取文章列表
+
+        已发布文章列表按租户缓存，文章及其分类、标签变更后失效；
+        阅读数等统计数据在缓存有效期内可能略有滞后
+        """
+        return super().list(request, *args, **kwargs)
+    
     def get_serializer_class(self):
         """
         根据请求方法返回不同的序列化器
@@ -310,30 +339,25 @@ class ArticleViewSet(TenantModelViewSet):
         """
         创建文章时设置作者为当前用户
         
-        租户ID已通过TenantModelViewSet自动处理
+        租户由序列化器按当前用户设置
         """
-        # 设置作者为当前用户
-        serializer.save(author=self.request.user)
-        
-        # 处理分类和标签关系
-        self._process_relations(serializer.instance, serializer.validated_data)
-        
-        # 创建统计记录
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if tenant_id:
-            try:
-                tenant_id = int(tenant_id)
-            except (ValueError, TypeError):
-                logger.error(f"无效的租户ID: {tenant_id}")
-                raise ValidationError({"detail": f"无效的租户ID: {tenant_id}"})
-        
-        ArticleStatistics.objects.create(
-            article=serializer.instance,
-            tenant_id=tenant_id
-        )
+        # 设置作者为当前用户，分类、标签、初始版本和统计记录在序列化器的事务中创建
+        article = serializer.save(author=self.request.user)
         
         # 记录操作日志
-        self._record_operation_log('create', serializer.instance)
+        try:
+            OperationLog.objects.create(
+                user=self.request.user,
+                action='create',
+                entity_type='article',
+                entity_id=article.id,
+                details=f"创建文章: {article.title}",
+                ip_address=self.request.META.get('REMOTE_ADDR'),
+                user_agent=self.request.META.get('HTTP_USER_AGENT'),
+                tenant_id=article.tenant_id
+            )
+        except Exception as e:
+            logger.error(f"记录文章创建操作日志失败: {str(e)}")
     
     def perform_update(self, serializer):
         """
@@ -408,16 +432,65 @@ class ArticleViewSet(TenantModelViewSet):
             instance.status = 'archived'
             instance.save(update_fields=['status'])
     
+    @extend_schema(
+        summary="全文检索文章",
+        description="通过倒排索引检索标题、摘要和内容，按相关度排序，返回标题高亮和内容摘录；支持中文",
+        tags=["CMS-文章管理"],
+        parameters=[
+            OpenApiParameter(name="q", description="检索词，多个词之间为并且关系", required=True, type=str),
+            OpenApiParameter(name="page", description="页码，默认1", required=False, type=int),
+            OpenApiParameter(name="per_page", description="每页数量，默认10，最大50", required=False, type=int),
+            OpenApiParameter(name="status", description="文章状态过滤", required=False, type=str, enum=["draft", "pending", "published", "archived"]),
+            OpenApiParameter(name="X-Tenant-ID", description="租户ID", required=False, type=str, location=OpenApiParameter.HEADER),
+        ],
+        responses={
+            200: ArticleSearchResultSerializer(many=True),
+            400: OpenApiResponse(description="缺少检索词"),
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """全文检索文章"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"detail": _("请提供检索词q")}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 在索引查询中用与列表相同的过滤条件限定可见范围，再按得分取候选
+        ranked = search_article_ids(
+            query, tenant_id=getattr(request, 'tenant_id', None),
+            articles=self.filter_queryset(self.get_queryset()),
+        )
+        scores = dict(ranked)
+        article_ids = [article_id for article_id, _score in ranked]
+        
+        # 候选ID列表按页码分页，不使用游标分页
+        page_ids = self.paginator.paginate_queryset(article_ids, request)
+        articles = ArticleListSerializer.setup_eager_loading(Article.objects.filter(id__in=page_ids)).in_bulk()
+        config = get_search_config()
+        results = []
+        for article_id in page_ids:
+            # 取得候选ID后被删除的文章直接跳过
+            article = articles.get(article_id)
+            if article is None:
+                continue
+            article.score = scores[article_id]
+            article.highlight = build_highlights(article, query, config)
+            results.append(article)
+        
+        serializer = ArticleSearchResultSerializer(results, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+    
     @extend_schema(
         summary="获取文章版本历史",
-        description="获取文章的所有历史版本",
+        description="获取文章的所有历史版本，默认不包含内容；include_content=true时返回每个版本的完整内容",
         tags=["CMS-文章管理"],
         parameters=[
             OpenApiParameter(name="id", description="文章ID", required=True, type=OpenApiTypes.INT, location=OpenApiParameter.PATH),
+            OpenApiParameter(name="include_content", description="是否返回每个版本的完整内容", required=False, type=bool),
             OpenApiParameter(name="X-Tenant-ID", description="租户ID", required=False, type=str, location=OpenApiParameter.HEADER),
         ],
         responses={
-            200: ArticleVersionSerializer(many=True),
+            200: ArticleVersionListSerializer(many=True),
             403: OpenApiResponse(description="权限不足"),
             404: OpenApiResponse(description="文章不存在"),
         }
@@ -426,8 +499,15 @@ class ArticleViewSet(TenantModelViewSet):
     def versions(self, request, pk=None):
         """获取文章的所有历史版本"""
         article = self.get_object()
-        versions = ArticleVersion.objects.filter(article=article).order_by('-version_number')
-        serializer = ArticleVersionSerializer(versions, many=True)
+        if request.query_params.get('include_content', '').lower() in ('1', 'true'):
+            serializer = ArticleVersionSerializer(load_versions_with_content(article), many=True)
+            return Response(serializer.data)
+        
+        # 列表只读取元数据，不读取内容和差异
+        versions = ArticleVersion.objects.filter(article=article).select_related('editor').defer(
+            'content', 'diff_data'
+        ).order_by('-version_number')
+        serializer = ArticleVersionListSerializer(versions, many=True)
         return Response(serializer.data)
     
     @extend_schema(
@@ -450,7 +530,7 @@ class ArticleViewSet(TenantModelViewSet):
         """获取文章的指定版本"""
         article = self.get_object()
         try:
-            version = ArticleVersion.objects.get(article=article, version_number=version_number)
+            version = load_version(article, version_number)
         except ArticleVersion.DoesNotExist:
             return Response(
                 {"detail": _("指定版本不存在")},
@@ -510,87 +590,40 @@ class ArticleViewSet(TenantModelViewSet):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         
-        # 根据周期过滤访问日志
-        logs_query = AccessLog.objects.filter(article=article)
-        
-        if period != 'all':
-            if period == 'day':
-                logs_query = logs_query.filter(created_at__gte=timezone.now() - timezone.timedelta(days=1))
-            elif period == 'week':
-                logs_query = logs_query.filter(created_at__gte=timezone.now() - timezone.timedelta(weeks=1))
-            elif period == 'month':
-                logs_query = logs_query.filter(created_at__gte=timezone.now() - timezone.timedelta(days=30))
-            elif period == 'year':
-                logs_query = logs_query.filter(created_at__gte=timezone.now() - timezone.timedelta(days=365))
-        
-        if start_date:
-            logs_query = logs_query.filter(created_at__gte=start_date)
-        
-        if end_date:
-            logs_query = logs_query.filter(created_at__lte=end_date)
-        
-        # 时间序列数据（按天统计）
-        time_series_data = {}
-        if logs_query.exists():
-            # 按天分组统计访问量
-            views_by_date = logs_query.values('check_date') \
-                            .annotate(count=Count('id')) \
-                            .order_by('check_date')
-            
-            time_series_data['views'] = [
-                {'date': item['check_date'], 'count': item['count']} 
-                for item in views_by_date
-            ]
-            
-            # 地域分析
-            countries = logs_query.values('country') \
-                        .annotate(count=Count('id')) \
-                        .order_by('-count')[:10]
-            
-            demographics = {
-                'countries': [
-                    {'name': item['country'] or _('未知'), 'count': item['count']} 
-                    for item in countries
-                ],
-                'devices': [],
-                'browsers': []
-            }
-            
-            # 设备类型分析
-            devices = logs_query.values('device') \
-                     .annotate(count=Count('id')) \
-                     .order_by('-count')[:5]
-            demographics['devices'] = [
-                {'name': item['device'] or _('未知'), 'count': item['count']} 
-                for item in devices
-            ]
-            
-            # 浏览器分析
-            browsers = logs_query.values('browser') \
-                      .annotate(count=Count('id')) \
-                      .order_by('-count')[:5]
-            demographics['browsers'] = [
-                {'name': item['browser'] or _('未知'), 'count': item['count']} 
-                for item in browsers
-            ]
-            
-            # 来源分析
-            referrers = logs_query.values('referer') \
-                       .annotate(count=Count('id')) \
-                       .order_by('-count')[:10]
-            referrers_data = [
-                {'source': item['referer'] or _('直接访问'), 'count': item['count']} 
-                for item in referrers
+        # 解析统计日期范围
+        try:
+            start_date = datetime.date.fromisoformat(start_date) if start_date else None
+            end_date = datetime.date.fromisoformat(end_date) if end_date else None
+        except ValueError:
+            raise ValidationError({"detail": _("日期格式无效，应为YYYY-MM-DD")})
+        
+        period_days = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+        if period in period_days:
+            period_start = timezone.localdate() - datetime.timedelta(days=period_days[period])
+            start_date = max(start_date, period_start) if start_date else period_start
+        
+        # 已完成的日期读取每日汇总，当天从访问日志计算
+        analytics = get_article_statistics(article, start_date=start_date, end_date=end_date)
+        
+        time_series_data = {'views': analytics['views']}
+        demographics = {
+            'countries': [
+                {'name': name or _('未知'), 'count': count}
+                for name, count in analytics['country']
+            ],
+            'devices': [
+                {'name': name or _('未知'), 'count': count}
+                for name, count in analytics['device']
+            ],
+            'browsers': [
+                {'name': name or _('未知'), 'count': count}
+                for name, count in analytics['browser']
             ]
-        else:
-            # 没有数据时返回空结果
-            time_series_data = {'views': []}
-            demographics = {
-                'countries': [],
-                'devices': [],
-                'browsers': []
-            }
-            referrers_data = []
+        }
+        referrers_data = [
+            {'source': source or _('直接访问'), 'count': count}
+            for source, count in analytics['referer']
+        ]
         
         # 返回完整统计数据
         response_data = {
@@ -635,45 +668,19 @@ class ArticleViewSet(TenantModelViewSet):
         reading_time = request.data.get('reading_time')
         referrer = request.data.get('referrer')
         
-        # 创建访问日志
-        access_log = AccessLog.objects.create(
-            article=article,
-            user=user,
-            tenant=article.tenant,
-            session_id=session_id,
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT'),
-            referer=referrer,
-            reading_time=reading_time,
-            check_date=timezone.now().date()
-        )
+        reading_time = parse_reading_time(reading_time)
         
-        # 更新文章统计
-        try:
-            stats, created = ArticleStatistics.objects.get_or_create(
-                article=article,
-                tenant=article.tenant
-            )
-            
-            # 更新阅读次数
-            stats.views_count += 1
-            
-            # 如果提供了阅读时间，更新平均阅读时间
-            if reading_time:
-                try:
-                    reading_time = int(reading_time)
-                    # 使用加权平均算法更新平均阅读时间
-                    if stats.avg_reading_time > 0:
-                        stats.avg_reading_time = (stats.avg_reading_time * (stats.views_count - 1) + reading_time) / stats.views_count
-                    else:
-                        stats.avg_reading_time = reading_time
-                except (ValueError, TypeError):
-                    logger.warning(f"无效的阅读时间格式: {reading_time}")
-            
-            stats.save()
-            
-        except Exception as e:
-            logger.error(f"更新文章统计数据失败: {str(e)}")
+        # 访问日志和阅读统计由缓冲写入器批量写入，未启用缓冲或spool不可写时同步写入
+        event = build_access_event(
+            article, user, request,
+            reading_time=reading_time, referer=referrer, session_id=session_id
+        )
+        access_log_buffer = get_access_log_buffer()
+        if access_log_buffer is None or not access_log_buffer.enqueue(event):
+            try:
+                persist_access_events([event])
+            except Exception as e:
+                logger.error(f"保存文章访问记录失败: {str(e)}")
         
         return Response({"message": _("阅读记录已保存")}, status=status.HTTP_200_OK)
 
@@ -935,7 +942,11 @@ class ArticleViewSet(TenantModelViewSet):
             # 软删除
             deleted_ids = list(articles.values_list('id', flat=True))
             deleted_titles = list(articles.values_list('title', flat=True))
+            changed_tenant_ids = set(articles.values_list('tenant_id', flat=True))
             articles.update(status='archived')
+            # update()不发送post_save信号，手动使文章缓存失效
+            for changed_tenant_id in changed_tenant_ids:
+                transaction.on_commit(functools.partial(bump_model_version, Article, changed_tenant_id))
         
         # 记录操作日志
         for i, article_id in enumerate(deleted_ids):
@@ -1221,38 +1232,21 @@ class CategoryViewSet(TenantModelViewSet):
     )
     @action(detail=False, methods=['get'], url_path='tree')
     def get_category_tree(self, request):
-        """获取分类树形结构"""
+        """
+        获取分类树形结构
+        
+        整棵树由一次查询在内存中组装，并按租户和激活过滤条件缓存，
+        分类保存或删除时缓存自动失效
+        """
         user = request.user
         
-        # 获取所有顶级分类
         if not user.is_authenticated:
             # 匿名用户只能看到激活的分类
-            root_categories = Category.objects.filter(parent=None, is_active=True)
+            tree = get_cached_category_tree(tenant_id=None, active_only=True)
         elif user.is_super_admin:
-            root_categories = Category.objects.filter(parent=None)
+            tree = get_cached_category_tree(tenant_id=None, active_only=False)
         else:
-            root_categories = Category.objects.filter(parent=None, tenant=user.tenant)
-        
-        def build_tree(category):
-            """递归构建分类树"""
-            if not user.is_authenticated:
-                # 匿名用户只能看到激活的子分类
-                children = Category.objects.filter(parent=category, is_active=True)
-            else:
-                children = Category.objects.filter(parent=category)
-                
-            return {
-                'id': category.id,
-                'name': category.name,
-                'slug': category.slug,
-                'description': category.description,
-                'is_active': category.is_active,
-                'sort_order': category.sort_order,
-                'children': [build_tree(child) for child in children]
-            }
-        
-        # 构建完整的分类树
-        tree = [build_tree(category) for category in root_categories]
+            tree = get_cached_category_tree(tenant_id=user.tenant_id, active_only=False)
         
         return Response(tree)
 
@@ -1751,6 +1745,7 @@ class TagViewSet(TenantModelViewSet):
         }
     )
     @action(detail=False, methods=['get'], url_path='usage-stats')
+    @cache_response(models=(Tag, ArticleTag))
     def get_usage_stats(self, request):
         """获取标签使用统计"""
         user = request.user
@@ -9,6 +9,8 @@ from django.contrib.auth import get_user_model
 from rest_framework import authentication
 from rest_framework import exceptions
 
+from .principal_cache import get_principal
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -56,10 +58,10 @@ class JWTAuthentication(authentication.BaseAuthentication):
             logger.warning("无效的令牌")
             raise exceptions.AuthenticationFailed('无效的令牌')
         
-        # 获取用户
+        # 获取用户(含租户)，优先读取认证主体缓存
         try:
             user_id = payload.get('user_id')
-            user = User.objects.get(pk=user_id, is_active=True, is_deleted=False)
+            user = get_principal(user_id)
         except User.DoesNotExist:
             logger.warning(f"用户不存在或已被禁用: {user_id}")
             raise exceptions.AuthenticationFailed('用户不存在或已被禁用')
@@ -70,12 +72,12 @@ class JWTAuthentication(authentication.BaseAuthentication):
             raise exceptions.AuthenticationFailed('用户状态异常')
             
         # 检查是否为子账号
-        if user.parent:
+        if user.parent_id:
             logger.warning(f"子账号尝试认证: {user.username}")
             raise exceptions.AuthenticationFailed('子账号不允许登录')
         
         # 检查用户的租户状态
-        if user.tenant and not user.is_super_admin:
+        if user.tenant_id and not user.is_super_admin:
             if user.tenant.status != 'active' or user.tenant.is_deleted:
                 logger.warning(f"用户 {user.username} 的租户 {user.tenant.name} 状态异常")
                 raise exceptions.AuthenticationFailed('您所属的租户已被禁用或删除')
@@ -0,0 +1,150 @@
+"""
+认证主体缓存
+缓存JWT认证使用的用户记录(含所属租户)，使热缓存下的认证无需查询数据库
+
+缓存键由用户ID和用户版本戳组成，用户或其租户发生变更时更新版本戳，
+旧的缓存条目随之失效
+
+缓存中只保存用户和租户的字段值(不含密码哈希)，读取时重建为模型对象，
+未缓存的字段为延迟加载字段，访问时才查询数据库
+"""
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db.models import DEFERRED
+
+from tenants.models import Tenant
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# 不写入缓存的用户字段
+PRINCIPAL_EXCLUDED_FIELDS = ('password',)
+
+
+def get_principal_cache_timeout():
+    """
+    获取认证主体缓存的过期时间(秒)，0表示不缓存
+    """
+    return settings.JWT_AUTH.get('PRINCIPAL_CACHE_TIMEOUT', 60)
+
+
+def _version_key(user_id):
+    return f"auth:principal_version:{user_id}"
+
+
+def _principal_key(user_id, version):
+    return f"auth:principal:{user_id}:{version}"
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _get_version(user_id):
+    """
+    获取用户当前版本戳，不存在时生成新的版本戳
+    """
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = _new_version()
+        # 版本戳不过期，被淘汰时重新生成即可，旧条目不会再被读取
+        cache.set(_version_key(user_id), version, None)
+    return version
+
+
+def get_principal(user_id):
+    """
+    获取认证主体(用户对象，已预加载所属租户)
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        User对象
+
+    Raises:
+        User.DoesNotExist: 用户不存在、已禁用或已删除
+    """
+    timeout = get_principal_cache_timeout()
+    if not timeout:
+        return _load_principal(user_id)
+
+    key = _principal_key(user_id, _get_version(user_id))
+    data = cache.get(key)
+    if data is not None:
+        return _build_principal(data)
+
+    user = _load_principal(user_id)
+    cache.set(key, _dump_principal(user), timeout)
+    return user
+
+
+def _load_principal(user_id):
+    """
+    从数据库加载用户及其租户，不读取密码哈希
+    """
+    return User.objects.select_related('tenant').defer(*PRINCIPAL_EXCLUDED_FIELDS).get(
+        pk=user_id, is_active=True, is_deleted=False
+    )
+
+
+def _dump_fields(instance):
+    deferred = instance.get_deferred_fields()
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in deferred and field.attname not in PRINCIPAL_EXCLUDED_FIELDS
+    }
+
+
+def _build_instance(model, fields):
+    values = [fields.get(field.attname, DEFERRED) for field in model._meta.concrete_fields]
+    return model.from_db(model._default_manager.db, None, values)
+
+
+def _dump_principal(user):
+    """
+    将认证主体转换为可缓存的字段值
+    """
+    return {
+        'user': _dump_fields(user),
+        'tenant': _dump_fields(user.tenant) if user.tenant_id else None,
+    }
+
+
+def _build_principal(data):
+    """
+    由缓存的字段值重建用户对象及其租户
+    """
+    user = _build_instance(User, data['user'])
+    if data['tenant'] is not None:
+        user.tenant = _build_instance(Tenant, data['tenant'])
+    return user
+
+
+def invalidate_principal(user_id):
+    """
+    使用户的认证主体缓存失效
+
+    Args:
+        user_id: 用户ID
+    """
+    cache.set(_version_key(user_id), _new_version(), None)
+    logger.debug(f"认证主体缓存已失效: user_id={user_id}")
+
+
+def invalidate_tenant_principals(tenant_id):
+    """
+    使租户下所有用户的认证主体缓存失效
+
+    Args:
+        tenant_id: 租户ID
+    """
+    user_ids = list(User.objects.filter(tenant_id=tenant_id).values_list('id', flat=True))
+    if user_ids:
+        cache.set_many({_version_key(user_id): _new_version() for user_id in user_ids}, None)
+    logger.debug(f"租户 {tenant_id} 的认证主体缓存已失效，共 {len(user_ids)} 个用户")
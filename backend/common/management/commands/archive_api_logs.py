@@ -0,0 +1,101 @@
+"""
+管理命令：归档并清理过期的API日志
+"""
+import datetime
+import logging
+import os
+from django.core.management.base import BaseCommand, CommandError
+
+from common.utils.api_log_archive import (
+    archive_day, get_archivable_days, get_retention_config, rehydrate_archive
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '将超过保留天数的API日志按天、按租户归档为JSONL.gz文件并从数据库删除，或将归档文件重新导入数据库'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='数据库中保留的天数(默认使用API_LOG_RETENTION配置)',
+        )
+        parser.add_argument(
+            '--date',
+            help='只归档指定日期(YYYY-MM-DD)，必须早于保留期',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='归档目录(默认使用API_LOG_RETENTION配置)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='每批读取和删除的行数(默认使用API_LOG_RETENTION配置)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='只统计需要归档的日志，不写文件也不删除',
+        )
+        parser.add_argument(
+            '--rehydrate',
+            nargs='+',
+            metavar='PATH',
+            help='将指定的归档文件重新导入数据库',
+        )
+
+    def handle(self, *args, **options):
+        config = get_retention_config()
+        batch_size = options.get('batch_size') or config['BATCH_SIZE']
+
+        if options.get('rehydrate'):
+            self._rehydrate(options['rehydrate'], batch_size)
+            return
+
+        days = options['days'] if options.get('days') is not None else config['DAYS']
+        if days < 1:
+            raise CommandError("保留天数必须大于0")
+
+        archivable_days = get_archivable_days(days)
+        if options.get('date'):
+            try:
+                day = datetime.date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"无效的日期: {options['date']}，格式应为YYYY-MM-DD")
+            archivable_days = [day] if day in archivable_days else []
+
+        if not archivable_days:
+            self.stdout.write("没有需要归档的API日志")
+            return
+
+        archive_dir = options.get('archive_dir') or config['ARCHIVE_DIR']
+        dry_run = options['dry_run']
+        self.stdout.write(self.style.SUCCESS(
+            f"=== 开始{'统计' if dry_run else '归档'}API日志: "
+            f"{archivable_days[0]} ~ {archivable_days[-1]}，保留{days}天 ==="
+        ))
+
+        total_archived = total_deleted = 0
+        for day in archivable_days:
+            for tenant_id, archived, deleted in archive_day(day, archive_dir, batch_size, dry_run):
+                total_archived += archived
+                total_deleted += deleted
+                self.stdout.write(f"{day} 租户{tenant_id}: 归档{archived}条, 删除{deleted}条")
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f"=== 共 {total_archived} 条日志需要归档 ==="))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"=== 归档完成，归档 {total_archived} 条，删除 {total_deleted} 条，目录: {archive_dir} ==="
+            ))
+
+    def _rehydrate(self, paths, batch_size):
+        for path in paths:
+            if not os.path.exists(path):
+                raise CommandError(f"归档文件不存在: {path}")
+        for path in paths:
+            count = rehydrate_archive(path, batch_size)
+            self.stdout.write(self.style.SUCCESS(f"已导入 {path}: {count} 条"))
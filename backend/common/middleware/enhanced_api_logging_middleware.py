@@ -2,58 +2,95 @@
 增强的API日志中间件
 提供更全面的API请求和响应日志记录功能
 """
+import functools
 import json
 import logging
+import re
 import time
 import traceback
 from datetime import datetime
 from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
+from django.urls import resolve, Resolver404
 from django.db.models import F
+from common.utils.api_log_capture import BodyCapturePolicy, get_capture_config
+from common.utils.api_log_writer import get_api_log_writer
 
 logger = logging.getLogger(__name__)
 
+
+def compile_path_matcher(include_paths, exclude_paths):
+    """
+    将记录/排除的路径前缀编译为一个正则表达式
+
+    Args:
+        include_paths: 需要记录的路径前缀
+        exclude_paths: 不记录的路径前缀，优先于include_paths
+
+    Returns:
+        函数: 接收路径，返回是否记录
+    """
+    if not include_paths:
+        # 没有需要记录的路径时不记录任何请求，空的正则会匹配所有路径
+        return lambda path: None
+    include = '|'.join(re.escape(path) for path in include_paths)
+    exclude = '|'.join(re.escape(path) for path in exclude_paths)
+    pattern = f"(?!(?:{exclude}))(?:{include})" if exclude else f"(?:{include})"
+    return re.compile(pattern).match
+
+
+def _build_view_info(resolver_match):
+    return {
+        'view_name': resolver_match.view_name,
+        'url_name': resolver_match.url_name,
+        'app_name': resolver_match.app_name,
+        'namespace': resolver_match.namespace,
+        'kwargs': resolver_match.kwargs
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_view_info(path_info):
+    """
+    按路径缓存的URL解析结果，只在请求没有resolver_match时使用
+    """
+    try:
+        return _build_view_info(resolve(path_info))
+    except Resolver404:
+        return None
+
 class EnhancedAPILoggingMiddleware(MiddlewareMixin):
     """
     增强型API日志中间件
     记录API请求和响应的详细信息，并提供性能监控功能
+    
+    请求体/响应体的采样、大小上限和脱敏规则由settings.API_LOGGING配置，
+    见common.utils.api_log_capture
     """
     
     def __init__(self, get_response=None):
         super().__init__(get_response)
         self.get_response = get_response
+        config = get_capture_config()
+        self.capture_policy = BodyCapturePolicy(config)
+        self.path_matcher = compile_path_matcher(config['INCLUDE_PATHS'], config['EXCLUDE_PATHS'])
     
     def _should_log(self, request):
         """
         判断是否应该记录该请求的日志
         
+        路径规则(settings.API_LOGGING的INCLUDE_PATHS/EXCLUDE_PATHS)在初始化时编译为一个正则表达式
+        
         Args:
             request: HTTP请求对象
         
         Returns:
             布尔值，指示是否应该记录日志
         """
-        # 只记录API请求的日志
-        if not request.path.startswith('/api/'):
-            return False
-        
-        # 不记录静态文件请求
-        if request.path.startswith(('/static/', '/media/')):
-            return False
-        
-        # 不记录API文档请求
-        if request.path.startswith(('/api/v1/schema/', '/api/v1/docs/', '/api/v1/redoc/')):
-            return False
-            
-        # 不记录健康检查请求
-        if request.path.startswith('/api/v1/health/'):
-            return False
-        
-        return True
+        return self.path_matcher(request.path) is not None
     
     def _get_request_body(self, request):
         """
-        安全地获取请求体内容
+        安全地获取请求体内容，按记录策略截断和脱敏
         
         Args:
             request: HTTP请求对象
@@ -61,14 +98,16 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
         Returns:
             字典或None: 请求体内容
         """
-        if not request.body:
+        if not self.capture_policy.log_request_body or not request.body:
             return None
             
         content_type = request.content_type.lower() if request.content_type else ''
         
         try:
             if 'application/json' in content_type:
-                return json.loads(request.body.decode('utf-8'))
+                if len(request.body) > self.capture_policy.max_bytes:
+                    return self.capture_policy.capture({}, request.body)
+                return self.capture_policy.capture(json.loads(request.body.decode('utf-8')), request.body)
             elif 'multipart/form-data' in content_type:
                 # 不记录文件内容，只记录文件名
                 files_info = {}
@@ -79,22 +118,24 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
                             'size': file_obj.size,
                             'content_type': file_obj.content_type
                         }
-                return {
+                return self.capture_policy.capture({
                     'form': dict(request.POST.items()),
                     'files': files_info
-                }
+                })
             elif 'application/x-www-form-urlencoded' in content_type:
-                return dict(request.POST.items())
+                return self.capture_policy.capture(dict(request.POST.items()))
             else:
-                # 其他内容类型，尝试记录为字符串
-                return {'raw': request.body.decode('utf-8', errors='replace')[:1000]}
+                # 其他内容类型记录为字符串，同样遵循字节上限和脱敏规则
+                return self.capture_policy.capture_raw(request.body)
         except Exception as e:
             logger.warning(f"无法解析请求体: {str(e)}")
             return {'error': f"无法解析请求体: {str(e)}"}
     
     def _get_response_body(self, response):
         """
-        安全地获取响应体内容
+        安全地获取响应体内容，按记录策略截断和脱敏
+        
+        超过大小上限的响应直接从已渲染的内容截取预览，不再解析或序列化
         
         Args:
             response: HTTP响应对象
@@ -103,22 +144,49 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
             字典或字符串: 响应体内容
         """
         try:
+            if response.streaming:
+                return {'content_type': response.get('Content-Type', ''), 'streaming': True}
+            
+            content = response.content if getattr(response, 'is_rendered', True) else None
             if hasattr(response, 'data'):
                 # DRF响应
-                return response.data
-            elif hasattr(response, 'content'):
-                # 标准Django响应
-                content_type = response.get('Content-Type', '')
-                if content_type and 'application/json' in content_type.lower():
-                    return json.loads(response.content.decode('utf-8'))
-                else:
-                    # 非JSON响应，返回内容类型
-                    return {'content_type': content_type}
-            return None
+                return self.capture_policy.capture(response.data, content)
+            
+            # 标准Django响应
+            content_type = response.get('Content-Type', '')
+            if content_type and 'application/json' in content_type.lower():
+                if len(content) > self.capture_policy.max_bytes:
+                    return self.capture_policy.capture({}, content)
+                return self.capture_policy.capture(json.loads(content.decode('utf-8')), content)
+            # 非JSON响应，返回内容类型
+            return {'content_type': content_type}
         except Exception as e:
             logger.warning(f"无法解析响应体: {str(e)}")
             return {'error': f"无法解析响应体: {str(e)}"}
     
+    def _get_error_message(self, response):
+        """
+        获取错误响应中的错误信息
+        
+        Args:
+            response: HTTP响应对象
+        
+        Returns:
+            字符串或None: 错误信息
+        """
+        data = getattr(response, 'data', None)
+        if data is None and not response.streaming \
+                and 'application/json' in response.get('Content-Type', '').lower() \
+                and len(response.content) <= self.capture_policy.max_bytes:
+            try:
+                data = json.loads(response.content.decode('utf-8'))
+            except ValueError:
+                data = None
+        if isinstance(data, dict):
+            message = data.get('message') or data.get('detail')
+            return str(message) if message is not None else None
+        return None
+    
     def _get_client_ip(self, request):
         """
         获取客户端IP地址
@@ -173,31 +241,34 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
         """
         获取视图信息
         
+        优先使用Django分发请求时已解析的request.resolver_match，
+        请求未经过URL分发(例如404)时使用按路径缓存的解析结果
+        
         Args:
             request: HTTP请求对象
             
         Returns:
             字典: 视图信息
         """
-        try:
-            resolver_match = resolve(request.path_info)
-            return {
-                'view_name': resolver_match.view_name,
-                'url_name': resolver_match.url_name,
-                'app_name': resolver_match.app_name,
-                'namespace': resolver_match.namespace,
-                'kwargs': resolver_match.kwargs
-            }
-        except Exception:
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is not None:
+            return _build_view_info(resolver_match)
+        
+        view_info = _resolve_view_info(request.path_info)
+        if view_info is None:
             return {
                 'view_name': 'unknown',
                 'error': 'Cannot resolve view'
             }
+        return view_info
     
     def _save_log(self, log_data):
         """
         保存日志记录
         
+        启用异步写入时，只将日志对象放入后台写入器队列，由写入器批量持久化，
+        请求延迟不再包含日志的INSERT耗时；未启用时同步保存
+        
         Args:
             log_data: 日志数据
             
@@ -215,6 +286,7 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
                 request_path=log_data.get('request_path'),
                 view_name=log_data.get('view_info', {}).get('view_name'),
                 status_code=log_data.get('status_code'),
+                status_type=log_data.get('status_type'),
                 response_time=log_data.get('response_time'),
                 ip_address=log_data.get('ip_address'),
                 user_agent=log_data.get('user_agent'),
@@ -223,7 +295,12 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
                 response_body=log_data.get('response_body'),
                 error_message=log_data.get('error_message')
             )
-            log_entry.save()
+            
+            writer = get_api_log_writer()
+            if writer is not None:
+                writer.enqueue(log_entry)
+            else:
+                log_entry.save()
             
         except Exception as e:
             # 记录失败不应该影响正常流程
@@ -248,11 +325,10 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
         request.api_log_data = {
             'request_method': request.method,
             'request_path': request.path,
-            'query_params': dict(request.GET.items()),
+            'query_params': self.capture_policy.redact(dict(request.GET.items())),
             'request_body': self._get_request_body(request),
             'ip_address': self._get_client_ip(request),
             'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-            'view_info': self._get_view_info(request),
             'timestamp': request.api_log_start_datetime.isoformat(),
         }
         
@@ -280,7 +356,8 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
         Returns:
             HTTP响应对象
         """
-        if not hasattr(request, 'api_log_start_time') or not self._should_log(request):
+        # 只有process_request中判断需要记录的请求才有开始时间
+        if not hasattr(request, 'api_log_start_time'):
             return response
         
         # 计算响应时间
@@ -289,12 +366,12 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
         # 获取状态类型和错误信息
         status_code = response.status_code
         status_type = 'success' if 200 <= status_code < 400 else 'error'
-        error_message = None
+        error_message = self._get_error_message(response) if status_type == 'error' else None
         
-        if status_type == 'error':
+        # 按记录策略决定是否记录响应体
+        response_body = None
+        if self.capture_policy.should_capture_response(request.path, status_code):
             response_body = self._get_response_body(response)
-            if isinstance(response_body, dict):
-                error_message = response_body.get('message') or response_body.get('detail')
         
         # 构造日志数据
         log_data = {
@@ -303,7 +380,9 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
             'status_type': status_type,
             'response_time': response_time,
             'error_message': error_message,
-            'response_body': self._get_response_body(response),
+            'response_body': response_body,
+            # 此时URL已由Django解析，直接复用request.resolver_match
+            'view_info': self._get_view_info(request),
         }
         
         # 异步记录日志到数据库
@@ -337,7 +416,7 @@ class EnhancedAPILoggingMiddleware(MiddlewareMixin):
         Returns:
             None (让其他中间件或异常处理器处理)
         """
-        if not hasattr(request, 'api_log_start_time') or not self._should_log(request):
+        if not hasattr(request, 'api_log_start_time'):
             return None
             
         # 记录异常信息
@@ -0,0 +1,69 @@
+"""
+请求性能分析中间件
+按采样比例记录请求的SQL次数与耗时、序列化、渲染、视图和中间件耗时，
+添加Server-Timing响应头，并按视图名称汇总到进程内的汇总器
+
+需要放在MIDDLEWARE的第一位，中间件耗时才包含其他所有中间件
+"""
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from common.utils.profiling import (
+    RequestProfile, get_current_profile, get_profile_aggregator, get_profiling_config,
+    install_serializer_timing
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfilingMiddleware:
+    """
+    请求性能分析中间件
+
+    settings.REQUEST_PROFILING['ENABLED']为False时不加载，未被采样的请求只多一次随机数比较
+    """
+
+    def __init__(self, get_response):
+        config = get_profiling_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = float(config['SAMPLE_RATE'])
+        self.server_timing = config['SERVER_TIMING']
+        self.aggregator = get_profile_aggregator()
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        with RequestProfile() as profile, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+
+        try:
+            metrics = profile.get_metrics()
+            resolver_match = getattr(request, 'resolver_match', None)
+            view_name = resolver_match.view_name if resolver_match else 'unresolved'
+            self.aggregator.record(view_name, metrics)
+            if self.server_timing:
+                response['Server-Timing'] = profile.server_timing(metrics)
+        except Exception as e:
+            # 性能分析失败不应该影响正常流程
+            logger.warning(f"记录请求性能数据失败: {str(e)}")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        记录视图阶段的开始时间
+        """
+        profile = get_current_profile()
+        if profile is not None:
+            profile.view_start = time.perf_counter()
+        return None
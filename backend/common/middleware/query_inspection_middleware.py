@@ -0,0 +1,57 @@
+"""
+SQL查询检查中间件
+按采样比例检查请求中的SQL，发现疑似N+1或慢查询时记录警告并更新该视图的报告文件
+"""
+import logging
+import random
+
+from django.core.exceptions import MiddlewareNotUsed
+
+from common.utils.query_inspector import QueryInspector, get_inspection_config, get_query_report_store
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInspectionMiddleware:
+    """
+    SQL查询检查中间件
+
+    settings.QUERY_INSPECTION['ENABLED']为False时不加载
+    """
+
+    def __init__(self, get_response):
+        config = get_inspection_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.config = config
+        self.sample_rate = float(config['SAMPLE_RATE'])
+        self.report_store = get_query_report_store()
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        inspector = QueryInspector(
+            n_plus_one_threshold=self.config['N_PLUS_ONE_THRESHOLD'],
+            slow_query_ms=self.config['SLOW_QUERY_MS'],
+            stack_depth=self.config['STACK_DEPTH'],
+        )
+        with inspector.capture():
+            response = self.get_response(request)
+
+        if inspector.has_issues():
+            try:
+                resolver_match = getattr(request, 'resolver_match', None)
+                view_name = resolver_match.view_name if resolver_match else 'unresolved'
+                for duplicate in inspector.get_duplicates():
+                    logger.warning(
+                        f"疑似N+1: {view_name} {request.method} {request.path} "
+                        f"同一SQL执行{duplicate['count']}次: {duplicate['sql'][:300]} "
+                        f"调用位置: {' <- '.join(duplicate['call_site'] or [])}"
+                    )
+                self.report_store.record(view_name, inspector)
+            except Exception as e:
+                # 检查失败不应该影响正常流程
+                logger.warning(f"记录SQL检查结果失败: {str(e)}")
+        return response
@@ -4,9 +4,12 @@
 import logging
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.exceptions import PermissionDenied, ValidationError
+from common.utils.hot_path_logging import get_hot_logger
 from common.utils.tenant_context import get_current_tenant, set_current_tenant, clear_current_tenant
+from common.utils.tenant_resolver import get_lazy_tenant
 
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
 
 class TenantMiddleware(MiddlewareMixin):
     """
@@ -15,6 +18,8 @@ class TenantMiddleware(MiddlewareMixin):
     处理以下租户信息来源:
     1. X-Tenant-ID 请求头
     2. 用户关联的租户
+    
+    request.tenant为惰性租户对象(通过进程内租户缓存解析)，只用到request.tenant_id的请求不查询租户表
     """
     
     def process_request(self, request):
@@ -43,19 +48,20 @@ class TenantMiddleware(MiddlewareMixin):
                 logger.warning(f"无效的租户ID格式: {header_tenant_id}")
                 raise ValidationError({"detail": f"无效的租户ID格式: {header_tenant_id}，租户ID必须是整数"})
         
-        # 将租户ID保存到请求对象，方便视图使用
+        # 将租户ID和惰性租户对象保存到请求对象，方便视图使用
         request.tenant_id = header_tenant_id
+        request.tenant = get_lazy_tenant(header_tenant_id) if header_tenant_id else None
         
         # 未登录用户只能使用请求头中的租户ID
         if not hasattr(request, 'user') or not request.user.is_authenticated:
             if header_tenant_id:
-                logger.debug(f"未认证用户使用请求头租户ID: {header_tenant_id}")
+                hot_logger.debug("未认证用户使用请求头租户ID: %s", header_tenant_id)
                 # 这里只保存ID，不设置租户上下文，因为未认证用户没有权限访问多数资源
             return None
         
-        # 获取用户关联的租户
-        user_tenant = getattr(request.user, 'tenant', None)
-        user_tenant_id = str(user_tenant.id) if user_tenant else None
+        # 获取用户关联的租户ID，只读取外键值，不加载租户对象
+        user_tenant_id = getattr(request.user, 'tenant_id', None)
+        user_tenant_id = str(user_tenant_id) if user_tenant_id else None
         
         # 如果请求头中有租户ID，验证与用户租户是否匹配
         if header_tenant_id and user_tenant_id and header_tenant_id != user_tenant_id:
@@ -72,17 +78,20 @@ class TenantMiddleware(MiddlewareMixin):
         if not effective_tenant_id:
             # 超级管理员可能没有关联租户
             if getattr(request.user, 'is_super_admin', False):
-                logger.debug(f"超级管理员 {request.user.username} 访问，无租户上下文")
+                hot_logger.debug("超级管理员 %s 访问，无租户上下文", request.user.username)
                 return None
             else:
                 logger.warning(f"用户 {request.user.username} 没有关联租户且未提供租户ID")
         
-        # 设置最终的租户ID到请求对象
+        # 设置最终的租户ID到请求对象，同一租户复用同一个惰性对象，每个请求最多解析一次
         request.tenant_id = effective_tenant_id
+        if effective_tenant_id != header_tenant_id:
+            request.tenant = get_lazy_tenant(effective_tenant_id) if effective_tenant_id else None
         
-        # 设置当前线程的租户上下文
-        if user_tenant:
-            logger.debug(f"用户 {request.user.username} 属于租户 {user_tenant.name}")
+        # 设置当前线程的租户上下文(用户关联的租户)
+        if user_tenant_id:
+            hot_logger.debug("用户 %s 属于租户 %s", request.user.username, user_tenant_id)
+            user_tenant = request.tenant if user_tenant_id == effective_tenant_id else get_lazy_tenant(user_tenant_id)
             set_current_tenant(user_tenant)
         
         return None
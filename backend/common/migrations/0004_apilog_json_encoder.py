@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 07:23
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_apilog_response_body_apilog_view_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apilog',
+            name='query_params',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='查询参数'),
+        ),
+        migrations.AlterField(
+            model_name='apilog',
+            name='request_body',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='请求体'),
+        ),
+        migrations.AlterField(
+            model_name='apilog',
+            name='response_body',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='响应体'),
+        ),
+    ]
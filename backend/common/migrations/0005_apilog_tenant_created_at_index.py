@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 07:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_apilog_json_encoder'),
+        ('tenants', '0002_tenant_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apilog',
+            index=models.Index(fields=['tenant', 'created_at'], name='common_api__tenant__2162a5_idx'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 """
 基础模型定义，用于提供租户隔离和软删除等共通功能
 """
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from common.utils.tenant_manager import TenantManager
 
@@ -81,19 +83,20 @@ class APILog(models.Model):
     request_method = models.CharField(_("请求方法"), max_length=10, choices=REQUEST_METHOD_CHOICES)
     request_path = models.CharField(_("请求路径"), max_length=255)
     view_name = models.CharField(_("视图名称"), max_length=255, null=True, blank=True)
-    query_params = models.JSONField(_("查询参数"), null=True, blank=True)
-    request_body = models.JSONField(_("请求体"), null=True, blank=True)
+    query_params = models.JSONField(_("查询参数"), null=True, blank=True, encoder=DjangoJSONEncoder)
+    request_body = models.JSONField(_("请求体"), null=True, blank=True, encoder=DjangoJSONEncoder)
     
     # 响应信息
     status_code = models.IntegerField(_("状态码"))
     response_time = models.IntegerField(_("响应时间(ms)"))
     status_type = models.CharField(_("状态类型"), max_length=10, choices=STATUS_TYPE_CHOICES)
-    response_body = models.JSONField(_("响应体"), null=True, blank=True)
+    response_body = models.JSONField(_("响应体"), null=True, blank=True, encoder=DjangoJSONEncoder)
     error_message = models.TextField(_("错误信息"), null=True, blank=True)
     
     # 其他信息
     user_agent = models.CharField(_("用户代理"), max_length=500, null=True, blank=True)
-    created_at = models.DateTimeField(_("创建时间"), auto_now_add=True)
+    # 使用default而不是auto_now_add，批量写入和归档恢复时保留原始时间
+    created_at = models.DateTimeField(_("创建时间"), default=timezone.now)
     
     class Meta:
         verbose_name = _('API日志')
@@ -106,6 +109,7 @@ class APILog(models.Model):
             models.Index(fields=['request_path']),
             models.Index(fields=['status_code']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['tenant', 'created_at']),
         ]
     
     def __str__(self):
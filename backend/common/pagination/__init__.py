@@ -1,40 +1,224 @@
 """
 分页相关模块
 """
+import base64
+import json
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
     标准分页类，自定义响应格式
+
+    默认按页码分页；视图定义了cursor_ordering时，请求可通过mode=cursor
+    (或携带cursor参数)切换为游标分页。游标分页按cursor_ordering中的有索引字段
+    定位下一页，不使用OFFSET，第N页与第1页的成本相同。
+
+    游标分页的总数由count参数控制:
+    - none(默认): 不统计总数
+    - estimate: 返回估算总数
+    - exact: 执行COUNT(*)
     """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
-    
+
+    mode_query_param = 'mode'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('none', 'estimate', 'exact')
+    # 数据库无法提供估算值时，最多统计的行数
+    estimate_count_limit = 10000
+    invalid_cursor_message = '无效的游标'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        根据请求选择页码分页或游标分页
+        """
+        self.cursor_mode = self._use_cursor_mode(request, view)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        return self._paginate_by_cursor(queryset, request, view)
+
     def get_paginated_response(self, data):
         """
         自定义分页响应格式
-        
+
         Args:
             data: 分页后的数据
-        
+
         Returns:
             自定义格式的Response对象
         """
-        pagination_info = {
-            'count': self.page.paginator.count,
-            'next': self.get_next_link(),
-            'previous': self.get_previous_link(),
-            'page_size': self.page_size,
-            'current_page': self.page.number,
-            'total_pages': self.page.paginator.num_pages,
-        }
-        
+        if self.cursor_mode:
+            pagination_info = {
+                'mode': 'cursor',
+                'count': self.count,
+                'count_is_estimate': self.count_is_estimate,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'page_size': self.page_size,
+            }
+        else:
+            pagination_info = {
+                'count': self.page.paginator.count,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'page_size': self.page_size,
+                'current_page': self.page.number,
+                'total_pages': self.page.paginator.num_pages,
+            }
+
         # 此处不需要包装为标准格式，因为StandardJSONRenderer会处理
         # 我们只需将分页信息与结果数据组合成合适的结构
         return Response({
             'pagination': pagination_info,
             'results': data
-        }) 
\ No newline at end of file
+        })
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self._encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self._encode_cursor(self.previous_position, reverse=True)
+
+    def _use_cursor_mode(self, request, view):
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def _paginate_by_cursor(self, queryset, request, view):
+        """
+        游标分页：按(排序字段..., 主键)定位，取page_size+1条判断是否还有下一页
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self._get_ordering(view)
+
+        position, reverse = self._decode_cursor(request)
+        self.count, self.count_is_estimate = self._get_count(queryset, request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self._invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position, queryset.model))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        first_position = self._get_position(results[0]) if results else None
+        last_position = self._get_position(results[-1]) if results else None
+        if reverse:
+            self.next_position = last_position if results else position
+            self.previous_position = first_position if has_more else None
+        else:
+            self.next_position = last_position if has_more else None
+            self.previous_position = first_position if position is not None and results else None
+        return results
+
+    def _get_ordering(self, view):
+        """
+        视图的cursor_ordering，末尾补充主键保证排序唯一
+        """
+        ordering = list(view.cursor_ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _seek_filter(self, ordering, position, model):
+        """
+        构造游标定位条件，例如(-created_at, -id)对应:
+        created_at < v0 OR (created_at = v0 AND id < v1)
+        """
+        values = [
+            self._to_python(model, field.lstrip('-'), value)
+            for field, value in zip(ordering, position)
+        ]
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[index]})
+            for previous, value in zip(ordering[:index], values[:index]):
+                clause &= Q(**{previous.lstrip('-'): value})
+            condition |= clause
+        return condition
+
+    @staticmethod
+    def _to_python(model, name, value):
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        return field.to_python(value)
+
+    def _get_position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def _encode_cursor(self, position, reverse):
+        # str()保留datetime的微秒，字段的to_python可以解析
+        payload = json.dumps({'p': position, 'r': reverse}, default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def _decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            position, reverse = payload['p'], bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _get_count(self, queryset, request):
+        """
+        按count参数返回(总数, 是否为估算值)
+        """
+        count_mode = request.query_params.get(self.count_query_param, 'none')
+        if count_mode not in self.count_modes or count_mode == 'none':
+            return None, False
+        if count_mode == 'exact':
+            return queryset.count(), False
+        return self._estimate_count(queryset), True
+
+    def _estimate_count(self, queryset):
+        """
+        估算总数：MySQL读取EXPLAIN的扫描行数，其他数据库统计至多estimate_count_limit行
+        """
+        connection = connections[queryset.db]
+        if connection.vendor == 'mysql':
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                columns = [column[0] for column in cursor.description]
+                row = cursor.fetchone()
+            if row and 'rows' in columns:
+                return int(row[columns.index('rows')] or 0)
+        return queryset.order_by()[:self.estimate_count_limit].count()
@@ -4,7 +4,10 @@
 import logging
 from rest_framework import permissions
 
+from common.utils.hot_path_logging import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
 
 class IsSuperAdminUser(permissions.BasePermission):
     """
@@ -139,8 +142,8 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if (
             request.user and 
             request.user.is_admin and 
-            hasattr(obj, 'tenant') and 
-            obj.tenant == request.user.tenant
+            hasattr(obj, 'tenant_id') and 
+            obj.tenant_id == request.user.tenant_id
         ):
             return True
         
@@ -182,14 +185,14 @@ class IsSameTenantUser(permissions.BasePermission):
             return True
         
         # 检查对象和用户是否属于同一租户
-        if not request.user.tenant:
+        if not request.user.tenant_id:
             return False
         
         same_tenant = False
-        if hasattr(obj, 'tenant'):
-            same_tenant = obj.tenant == request.user.tenant
-        elif hasattr(obj, 'user') and hasattr(obj.user, 'tenant'):
-            same_tenant = obj.user.tenant == request.user.tenant
+        if hasattr(obj, 'tenant_id'):
+            same_tenant = obj.tenant_id == request.user.tenant_id
+        elif hasattr(obj, 'user') and hasattr(obj.user, 'tenant_id'):
+            same_tenant = obj.user.tenant_id == request.user.tenant_id
         
         if not same_tenant:
             logger.warning(
@@ -233,17 +236,14 @@ class TenantApiPermission(permissions.BasePermission):
         Returns:
             布尔值，指示用户是否具有权限
         """
-        # 添加详细日志
-        logger.warning(f"TenantApiPermission.has_permission被调用: 用户={request.user}, 已认证={request.user.is_authenticated}, 路径={request.path}")
-        logger.warning(f"认证信息: {request.auth}")
-        logger.warning(f"请求头: {request.headers}")
+        # 不记录请求头和认证信息：每次调用都格式化开销大，且会把令牌写入日志
+        hot_logger.debug("TenantApiPermission检查: 路径=%s", request.path)
         
         # 检查Authorization头部
         auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        logger.warning(f"Authorization头: {auth_header}")
         
         if not auth_header or not auth_header.startswith('Bearer '):
-            logger.warning("请求缺少有效的Bearer token")
+            hot_logger.info("请求缺少有效的Bearer token: 路径=%s", request.path)
             # 返回False表示权限被拒绝
             return False
             
@@ -254,13 +254,10 @@ class TenantApiPermission(permissions.BasePermission):
             request.user.is_super_admin
         )
         
-        logger.warning(f"用户超级管理员状态: {getattr(request.user, 'is_super_admin', False)}")
-        logger.warning(f"权限检查结果: {is_super_admin}")
-        
         if not is_super_admin:
-            logger.warning(
-                f"用户 {request.user.username if request.user.is_authenticated else 'Anonymous'} "
-                f"尝试访问租户API {request.path}，但不是超级管理员"
+            hot_logger.warning(
+                "用户 %s 尝试访问租户API %s，但不是超级管理员",
+                request.user.username if request.user.is_authenticated else 'Anonymous', request.path
             )
             
         return is_super_admin
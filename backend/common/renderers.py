@@ -1,16 +1,140 @@
 """
 标准响应渲染器模块，确保所有API返回统一格式
+
+标准格式的构建集中在build_standard_response中，DRF响应由渲染器在序列化时
+包装一次，非DRF的JSON响应由ResponseStandardizationMiddleware包装一次
+
+安装了orjson时渲染器使用orjson序列化，未安装或遇到orjson不支持的数据时
+回退到标准库json，两者输出一致
 """
-import json
+import logging
+from django.conf import settings
+from rest_framework.utils import encoders
 from rest_framework.renderers import JSONRenderer
-from rest_framework.utils.serializer_helpers import ReturnList, ReturnDict
-from rest_framework.response import Response
 from rest_framework.status import is_success, is_client_error, is_server_error
 
+from common.utils.profiling import profile_render
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 标准格式包含的字段
+ENVELOPE_KEYS = ('success', 'code', 'message', 'data')
+
+# 从原始数据中提取后需要移除的字段，避免在data中重复
+ENVELOPE_META_KEYS = ('success', 'code', 'message', 'detail')
+
+
+def is_standard_response(data):
+    """
+    判断数据是否已经是标准格式
+    """
+    return isinstance(data, dict) and all(key in data for key in ENVELOPE_KEYS)
+
+
+def get_business_code(status_code):
+    """
+    根据HTTP状态码映射业务状态码
+    """
+    if is_success(status_code):
+        return 2000  # 成功
+    elif status_code == 401:
+        return 4001  # 认证失败
+    elif status_code == 403:
+        return 4003  # 权限不足
+    elif status_code == 404:
+        return 4004  # 资源不存在
+    elif is_client_error(status_code):
+        return 4000  # 客户端错误
+    elif is_server_error(status_code):
+        return 5000  # 服务器错误
+    else:
+        return status_code
+
+
+def get_default_message(status_code):
+    """
+    根据HTTP状态码返回默认消息
+    """
+    if is_success(status_code):
+        return '操作成功'
+    elif status_code == 401:
+        return '认证失败'
+    elif status_code == 403:
+        return '权限不足'
+    elif status_code == 404:
+        return '资源不存在'
+    elif is_client_error(status_code):
+        return '请求参数错误'
+    elif is_server_error(status_code):
+        return '服务器内部错误'
+    else:
+        return '未知错误'
+
+
+def build_standard_response(data, status_code):
+    """
+    将原始响应数据包装为标准格式
+
+    Args:
+        data: 原始响应数据
+        status_code: HTTP状态码
+
+    Returns:
+        dict: {success, code, message, data}，已是标准格式时原样返回
+    """
+    if is_standard_response(data):
+        return data
+
+    code = get_business_code(status_code)
+    message = get_default_message(status_code)
+    body = data
+
+    if isinstance(data, dict):
+        # 响应数据中的code、message/detail优先
+        if 'code' in data:
+            code = data['code']
+        if 'message' in data:
+            message = data['message']
+        elif 'detail' in data:
+            message = data['detail']
+
+        # 分页格式保持不变；其他字典只在包含元信息字段时才复制
+        if not ('pagination' in data and 'results' in data) \
+                and any(key in data for key in ENVELOPE_META_KEYS):
+            body = {key: value for key, value in data.items() if key not in ENVELOPE_META_KEYS}
+
+    return {
+        'success': is_success(status_code),
+        'code': code,
+        'message': message,
+        'data': body
+    }
+
+
+def get_json_backend():
+    """
+    获取渲染器使用的JSON序列化后端
+
+    settings.JSON_RENDERER_BACKEND: auto(默认，安装了orjson时使用orjson) / orjson / stdlib
+
+    Returns:
+        str: orjson 或 stdlib
+    """
+    backend = getattr(settings, 'JSON_RENDERER_BACKEND', 'auto')
+    if backend == 'stdlib' or orjson is None:
+        return 'stdlib'
+    return 'orjson'
+
+
 class StandardJSONRenderer(JSONRenderer):
     """
     统一响应格式的JSON渲染器
-    
+
     将所有API响应包装为以下格式：
     {
         "success": true/false,
@@ -19,109 +143,62 @@ class StandardJSONRenderer(JSONRenderer):
         "data": { ... }
     }
     """
-    
+
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
         渲染响应数据为标准格式的JSON
-        
+
         Args:
             data: 原始响应数据
             accepted_media_type: 接受的媒体类型
             renderer_context: 渲染上下文
-            
+
         Returns:
             bytes: 渲染后的JSON字节数据
         """
         if renderer_context is None:
             renderer_context = {}
-            
+
         response = renderer_context.get('response')
-        request = renderer_context.get('request')
-        
-        # 已处理过的标准格式响应直接返回
-        if isinstance(data, dict) and all(k in data for k in ['success', 'code', 'message', 'data']):
-            return super().render(data, accepted_media_type, renderer_context)
-            
-        # 获取响应状态码
         status_code = response.status_code if response else 200
-        
-        # 标准响应结构
-        standard_response = {
-            'success': is_success(status_code),
-            'code': self._get_business_code(status_code, data),
-            'message': self._get_message(status_code, data),
-            'data': self._get_response_data(data, status_code)
-        }
-        
-        # 调用父类渲染方法
-        return super().render(standard_response, accepted_media_type, renderer_context)
-    
-    def _get_business_code(self, status_code, data):
-        """获取业务状态码"""
-        # 如果响应数据中包含code字段，优先使用
-        if isinstance(data, dict) and 'code' in data:
-            return data['code']
-            
-        # 根据HTTP状态码映射业务状态码
-        if is_success(status_code):
-            return 2000  # 成功
-        elif status_code == 401:
-            return 4001  # 认证失败
-        elif status_code == 403:
-            return 4003  # 权限不足
-        elif status_code == 404:
-            return 4004  # 资源不存在
-        elif is_client_error(status_code):
-            return 4000  # 客户端错误
-        elif is_server_error(status_code):
-            return 5000  # 服务器错误
-        else:
-            return status_code
-    
-    def _get_message(self, status_code, data):
-        """获取响应消息"""
-        # 如果响应数据中包含message字段，优先使用
-        if isinstance(data, dict):
-            if 'message' in data:
-                return data['message']
-            elif 'detail' in data:
-                return data['detail']
-                
-        # 根据状态码返回默认消息
-        if is_success(status_code):
-            return '操作成功'
-        elif status_code == 401:
-            return '认证失败'
-        elif status_code == 403:
-            return '权限不足'
-        elif status_code == 404:
-            return '资源不存在'
-        elif is_client_error(status_code):
-            return '请求参数错误'
-        elif is_server_error(status_code):
-            return '服务器内部错误'
-        else:
-            return '未知错误'
-    
-    def _get_response_data(self, data, status_code):
-        """获取响应数据体"""
-        if data is None:
-            return None
-            
-        # 处理列表和字典数据
-        if isinstance(data, (ReturnList, list)):
-            return data
-        elif isinstance(data, (ReturnDict, dict)):
-            # 检查是否为分页格式
-            if 'pagination' in data and 'results' in data:
-                # 保留分页格式，不做处理
-                return data
-            
-            # 移除可能存在的消息字段，避免重复
-            result = data.copy()
-            for key in ['success', 'code', 'message', 'detail']:
-                if key in result:
-                    result.pop(key)
-            return result
-        else:
-            return data 
\ No newline at end of file
+
+        standard_response = build_standard_response(data, status_code)
+
+        with profile_render():
+            if self._can_use_orjson(accepted_media_type, renderer_context):
+                try:
+                    return self._render_orjson(standard_response)
+                except orjson.JSONEncodeError as e:
+                    # 超过64位的整数等orjson不支持的数据由标准库处理
+                    logger.debug(f"orjson序列化失败，回退到标准库json: {str(e)}")
+
+            return super().render(standard_response, accepted_media_type, renderer_context)
+
+    def _can_use_orjson(self, accepted_media_type, renderer_context):
+        """
+        orjson只输出紧凑、非ASCII转义的JSON，需要缩进或ASCII转义时使用标准库
+        """
+        return (
+            get_json_backend() == 'orjson'
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def _render_orjson(self, data):
+        """
+        使用orjson序列化
+
+        datetime等交给DRF的JSONEncoder处理，保证与标准库输出一致；
+        Decimal、惰性翻译字符串等orjson不支持的类型同样由其处理
+        """
+        ret = orjson.dumps(
+            data,
+            default=_drf_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        # 与JSONRenderer一致，转义\u2028和\u2029
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+_drf_encoder = encoders.JSONEncoder()
@@ -1,3 +1,659 @@
-from django.test import TestCase
+from django.db import connection
+import csv
+import datetime
+import gzip
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+from django.http import JsonResponse
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from common.middleware.enhanced_api_logging_middleware import EnhancedAPILoggingMiddleware
+from common.middleware.query_inspection_middleware import QueryInspectionMiddleware
+from common.middleware.response_standardization_middleware import ResponseStandardizationMiddleware
+from common.models import APILog
+from common.renderers import StandardJSONRenderer, orjson
+from common.views import APILogExportView
+from tenants.models import Tenant
+from users.models import User
+from common.utils.api_log_archive import get_archive_path, rehydrate_archive
+from common.utils.api_log_writer import APILogWriter, get_api_log_writer, shutdown_api_log_writer
+from common.utils.hot_path_logging import HotPathLogger, get_sample_rate
+from common.utils.profiling import get_profile_aggregator
+from common.utils.query_inspector import (
+    QueryInspectionTestMixin, QueryInspector, QueryReportStore, fingerprint
+)
 
-# Create your tests here.
+
+def _make_log(path='/api/v1/test/'):
+    return APILog(
+        request_method='GET',
+        request_path=path,
+        status_code=200,
+        status_type='success',
+        response_time=1,
+        ip_address='127.0.0.1'
+    )
+
+
+class APILogWriterTestCase(TestCase):
+    """
+    API日志批量写入器测试
+    """
+    def test_flush_writes_batches(self):
+        """
+        测试刷新时批量写入队列中的记录
+        """
+        writer = APILogWriter(max_queue_size=100, batch_size=10)
+        for i in range(25):
+            self.assertTrue(writer.enqueue(_make_log(f'/api/v1/test/{i}/')))
+
+        # 写入前不应产生数据库记录
+        self.assertEqual(APILog.objects.count(), 0)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(writer.flush(), 25)
+
+        self.assertEqual(APILog.objects.count(), 25)
+        stats = writer.get_stats()
+        self.assertEqual(stats['queued'], 25)
+        self.assertEqual(stats['flushed'], 25)
+        self.assertEqual(stats['batches'], 3)
+        self.assertEqual(stats['pending'], 0)
+
+    def test_drop_policy(self):
+        """
+        测试队列满时丢弃记录
+        """
+        writer = APILogWriter(max_queue_size=5, batch_size=10, overflow_policy='drop')
+        accepted = [writer.enqueue(_make_log()) for _ in range(8)]
+
+        self.assertEqual(accepted.count(True), 5)
+        stats = writer.get_stats()
+        self.assertEqual(stats['queued'], 5)
+        self.assertEqual(stats['dropped'], 3)
+
+    def test_sample_policy(self):
+        """
+        测试超过高水位后按采样率保留记录
+        """
+        writer = APILogWriter(
+            max_queue_size=10, batch_size=10, overflow_policy='sample',
+            sample_rate=0.0, sample_high_watermark=0.5
+        )
+        for _ in range(10):
+            writer.enqueue(_make_log())
+
+        stats = writer.get_stats()
+        self.assertEqual(stats['queued'], 5)
+        self.assertEqual(stats['sampled_out'], 5)
+        self.assertEqual(stats['dropped'], 5)
+
+    def test_block_policy_times_out(self):
+        """
+        测试阻塞策略超时后丢弃记录
+        """
+        writer = APILogWriter(max_queue_size=1, overflow_policy='block', block_timeout=0.01)
+        self.assertTrue(writer.enqueue(_make_log()))
+        self.assertFalse(writer.enqueue(_make_log()))
+        self.assertEqual(writer.get_stats()['dropped'], 1)
+
+    def test_shutdown_flushes_pending(self):
+        """
+        测试停止写入器时写入剩余记录
+        """
+        writer = APILogWriter(max_queue_size=100, batch_size=50)
+        for _ in range(3):
+            writer.enqueue(_make_log())
+
+        writer.shutdown()
+
+        self.assertEqual(APILog.objects.count(), 3)
+        self.assertEqual(writer.get_stats()['flushed'], 3)
+
+    def test_lazy_strings_do_not_fail_batch(self):
+        """
+        测试响应体中的延迟翻译字符串可以写入，不会导致整批写入失败
+        """
+        writer = APILogWriter(max_queue_size=100, batch_size=10)
+        log = _make_log()
+        log.response_body = {'detail': _("文章不存在")}
+        writer.enqueue(log)
+        writer.enqueue(_make_log())
+
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(APILog.objects.count(), 2)
+        self.assertEqual(writer.get_stats()['failed'], 0)
+
+    def test_invalid_policy(self):
+        """
+        测试无效的背压策略
+        """
+        with self.assertRaises(ValueError):
+            APILogWriter(overflow_policy='unknown')
+
+
+@override_settings(API_LOG_WRITER=dict(settings.API_LOG_WRITER, ENABLED=True, FLUSH_INTERVAL=0.05))
+class APILogWriterEnabledTestCase(TransactionTestCase):
+    """
+    启用异步写入时中间件通过后台线程写入API日志
+
+    后台线程使用独立的数据库连接，需要TransactionTestCase
+    """
+    def setUp(self):
+        shutdown_api_log_writer()
+        self.addCleanup(shutdown_api_log_writer)
+
+    def test_middleware_enqueues_to_background_writer(self):
+        """
+        测试请求不同步写入日志，停止写入器后日志已写入
+        """
+        request = RequestFactory().get('/api/v1/test/')
+        request.user = AnonymousUser()
+        EnhancedAPILoggingMiddleware(lambda request: JsonResponse({}))(request)
+
+        writer = get_api_log_writer()
+        self.assertIsNotNone(writer)
+        self.assertTrue(writer.is_running)
+
+        shutdown_api_log_writer()
+        self.assertEqual(APILog.objects.filter(request_path='/api/v1/test/').count(), 1)
+        self.assertEqual(writer.get_stats()['flushed'], 1)
+
+
+class CursorPaginationTestCase(TestCase):
+    """
+    游标分页测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        APILog.objects.bulk_create([_make_log() for _ in range(25)])
+        self.admin = User.objects.create_user(
+            username='super', email='super@example.com', password='password123',
+            is_super_admin=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('common:api-log-list')
+
+    def _get(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        queries = [
+            query for query in context.captured_queries
+            if not query['sql'].startswith('INSERT')
+        ]
+        return response.json()['data'], len(queries)
+
+    def test_walk_pages_with_cursor(self):
+        """
+        测试按游标遍历全部数据，页面之间不重复且不统计总数
+        """
+        params = {'mode': 'cursor', 'page_size': 10, 'search': '/api/v1/test/'}
+        data, _ = self._get(self.url, params)
+        self.assertIsNone(data['pagination']['count'])
+        self.assertIsNone(data['pagination']['previous'])
+
+        ids = [item['id'] for item in data['results']]
+        first_page_ids = list(ids)
+        next_link = data['pagination']['next']
+        while next_link:
+            data, query_count = self._get(next_link)
+            # 只有一次定位查询，没有COUNT
+            self.assertEqual(query_count, 1)
+            ids.extend(item['id'] for item in data['results'])
+            previous_link = data['pagination']['previous']
+            next_link = data['pagination']['next']
+
+        expected = list(
+            APILog.objects.filter(request_path='/api/v1/test/')
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+        # 从最后一页向前翻页
+        data, _ = self._get(previous_link)
+        self.assertEqual([item['id'] for item in data['results']], expected[10:20])
+        data, _ = self._get(data['pagination']['previous'])
+        self.assertEqual([item['id'] for item in data['results']], first_page_ids)
+        self.assertIsNone(data['pagination']['previous'])
+
+    def test_cursor_count_modes(self):
+        """
+        测试游标分页的精确总数和估算总数
+        """
+        params = {'mode': 'cursor', 'search': '/api/v1/test/', 'count': 'exact'}
+        data, _ = self._get(self.url, params)
+        self.assertEqual(data['pagination']['count'], 25)
+        self.assertFalse(data['pagination']['count_is_estimate'])
+
+        params['count'] = 'estimate'
+        data, _ = self._get(self.url, params)
+        self.assertEqual(data['pagination']['count'], 25)
+        self.assertTrue(data['pagination']['count_is_estimate'])
+
+
+class ResponseStandardizationMiddlewareTestCase(TestCase):
+    """
+    统一响应格式中间件测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.request = RequestFactory().get('/api/v1/test/')
+        self.middleware = ResponseStandardizationMiddleware(lambda request: None)
+
+    def test_wraps_json_response_once(self):
+        """
+        测试非标准JSON响应被包装，原内容原样作为data
+        """
+        response = self.middleware.process_response(
+            self.request, JsonResponse([{'id': 1}, {'id': 2}], safe=False, status=404)
+        )
+        self.assertEqual(json.loads(response.content), {
+            'success': False,
+            'code': 4004,
+            'message': '资源不存在',
+            'data': [{'id': 1}, {'id': 2}],
+        })
+
+    def test_standard_json_response_untouched(self):
+        """
+        测试已是标准格式的JSON响应不被修改
+        """
+        original = JsonResponse({'success': True, 'code': 2001, 'message': '自定义', 'data': None})
+        content = original.content
+        response = self.middleware.process_response(self.request, original)
+        self.assertEqual(response.content, content)
+
+
+@skipIf(orjson is None, '未安装orjson')
+class StandardJSONRendererBackendTestCase(TestCase):
+    """
+    渲染器JSON序列化后端测试
+    """
+    def test_orjson_output_matches_stdlib(self):
+        """
+        测试orjson与标准库的输出一致
+        """
+        data = ReturnDict({
+            'title': _('文章统计'),
+            'bounce_rate': Decimal('12.50'),
+            'created_at': datetime.datetime(2024, 1, 1, 8, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2024, 1, 1),
+            'items': ReturnList([{'id': 1, 'text': '行分隔符\u2028'}], serializer=None),
+        }, serializer=None)
+        renderer = StandardJSONRenderer()
+
+        with self.settings(JSON_RENDERER_BACKEND='stdlib'):
+            expected = renderer.render(data)
+        with self.settings(JSON_RENDERER_BACKEND='orjson'):
+            content = renderer.render(data)
+
+        self.assertEqual(content, expected)
+        self.assertEqual(json.loads(content)['data']['bounce_rate'], 12.5)
+
+    def test_falls_back_to_stdlib(self):
+        """
+        测试orjson不支持的数据回退到标准库
+        """
+        with self.settings(JSON_RENDERER_BACKEND='orjson'):
+            content = StandardJSONRenderer().render({'value': 2 ** 70})
+        self.assertEqual(json.loads(content)['data']['value'], 2 ** 70)
+
+
+class APILogExportTestCase(TestCase):
+    """
+    API日志导出测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        logs = [_make_log() for _ in range(5)]
+        logs[0].user_agent = '=HYPERLINK("http://example.com")'
+        APILog.objects.bulk_create(logs)
+        self.admin = User.objects.create_user(
+            username='super', email='super@example.com', password='password123',
+            is_super_admin=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('common:api-log-export')
+        self.expected_ids = list(
+            APILog.objects.filter(request_path__startswith='/api/v1/test/')
+            .order_by('-id').values_list('id', flat=True)
+        )
+
+    def test_export_csv_in_batches(self):
+        """
+        测试CSV按批次流式导出全部匹配的日志
+        """
+        with patch.object(APILogExportView, 'export_batch_size', 2):
+            response = self.client.get(self.url, {'search': '/api/v1/test/'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual([int(row[0]) for row in rows[1:]], self.expected_ids)
+        # 公式前缀被转义
+        self.assertIn('\'=HYPERLINK("http://example.com")', [row[-1] for row in rows[1:]])
+
+    def test_export_xlsx(self):
+        """
+        测试XLSX导出
+        """
+        response = self.client.get(self.url, {'search': '/api/v1/test/', 'export_format': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual([row[0] for row in rows[1:]], self.expected_ids)
+
+    def test_invalid_format(self):
+        """
+        测试不支持的导出格式
+        """
+        response = self.client.get(self.url, {'export_format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+
+class APILogArchiveTestCase(TestCase):
+    """
+    API日志归档测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.old_time = timezone.now() - datetime.timedelta(days=100)
+        logs = [_make_log() for _ in range(5)]
+        for index, log in enumerate(logs):
+            log.created_at = self.old_time
+            log.request_body = {'index': index}
+            log.tenant = self.tenant if index % 2 else None
+        APILog.objects.bulk_create(logs + [_make_log()])
+
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+
+    def _archive(self):
+        call_command(
+            'archive_api_logs', days=90, batch_size=2, archive_dir=self.archive_dir, stdout=io.StringIO()
+        )
+
+    def _read_archive(self, tenant_id):
+        day = timezone.localtime(self.old_time).date()
+        path = get_archive_path(self.archive_dir, day, tenant_id)
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            return path, [json.loads(line) for line in archive]
+
+    def test_archive_and_rehydrate(self):
+        """
+        测试过期日志按租户归档后删除，归档可以恢复且重复归档不产生重复记录
+        """
+        self._archive()
+        self.assertEqual(APILog.objects.count(), 1)
+
+        path, rows = self._read_archive(self.tenant.id)
+        self.assertEqual(len(rows), 2)
+        _, rows = self._read_archive(None)
+        self.assertEqual([row['request_body']['index'] for row in rows], [0, 2, 4])
+
+        rehydrate_archive(path)
+        restored = APILog.objects.filter(tenant=self.tenant)
+        self.assertEqual(restored.count(), 2)
+        self.assertTrue(all(log.created_at == self.old_time for log in restored))
+
+        self._archive()
+        self.assertEqual(APILog.objects.count(), 1)
+        _, rows = self._read_archive(self.tenant.id)
+        self.assertEqual(len(rows), 2)
+
+
+@override_settings(API_LOG_WRITER=dict(settings.API_LOG_WRITER, ENABLED=False))
+class APILogCapturePolicyTestCase(TestCase):
+    """
+    API日志请求体/响应体记录策略测试
+    """
+    def _call(self, response, request=None):
+        request = request or RequestFactory().get('/api/v1/test/')
+        request.user = AnonymousUser()
+        EnhancedAPILoggingMiddleware(lambda request: response)(request)
+        return APILog.objects.latest('id')
+
+    def test_errors_mode_captures_error_bodies_only(self):
+        """
+        测试errors模式只记录错误响应的响应体，敏感字段脱敏
+        """
+        with self.settings(API_LOGGING={'RESPONSE_BODY_MODE': 'errors', 'RESPONSE_BODY_SAMPLE_RATE': 0}):
+            log = self._call(JsonResponse({'id': 1}))
+            self.assertIsNone(log.response_body)
+
+            log = self._call(JsonResponse({'detail': '参数错误', 'token': 'abc'}, status=400))
+        self.assertEqual(log.error_message, '参数错误')
+        self.assertEqual(log.response_body, {'detail': '参数错误', 'token': '******'})
+
+    def test_rules_and_size_cap(self):
+        """
+        测试路径规则覆盖模式，超过大小上限的响应体被截断
+        """
+        config = {
+            'RESPONSE_BODY_MODE': 'none',
+            'RESPONSE_BODY_RULES': [{'path': '/api/v1/test/', 'status': '2xx', 'sample_rate': 1}],
+            'MAX_BODY_BYTES': 100,
+        }
+        with self.settings(API_LOGGING=config):
+            log = self._call(JsonResponse([{'id': index} for index in range(100)], safe=False))
+        self.assertTrue(log.response_body['_truncated'])
+        self.assertGreater(log.response_body['size'], 100)
+        self.assertEqual(len(log.response_body['preview']), 100)
+
+    def test_request_body_redacted(self):
+        """
+        测试请求体中的密码被脱敏
+        """
+        request = RequestFactory().post(
+            '/api/v1/test/', {'username': 'admin', 'password': 'secret123'}, content_type='application/json'
+        )
+        log = self._call(JsonResponse({}), request)
+        self.assertEqual(log.request_body, {'username': 'admin', 'password': '******'})
+
+    def test_raw_request_body_follows_policy(self):
+        """
+        测试其他内容类型的请求体同样遵循字节上限和脱敏规则
+        """
+        request = RequestFactory().post('/api/v1/test/', 'password=secret123', content_type='text/plain')
+        log = self._call(JsonResponse({}), request)
+        self.assertEqual(log.request_body, {'raw': '******'})
+
+        with self.settings(API_LOGGING={'MAX_BODY_BYTES': 10}):
+            request = RequestFactory().post('/api/v1/test/', 'x' * 100, content_type='text/plain')
+            log = self._call(JsonResponse({}), request)
+        self.assertTrue(log.request_body['_truncated'])
+        self.assertEqual(log.request_body['preview'], 'x' * 10)
+
+    def test_path_rules_and_view_info(self):
+        """
+        测试排除的路径不记录日志，视图信息复用Django的URL解析结果
+        """
+        admin = User.objects.create_user(
+            username='super', email='super@example.com', password='password123', is_super_admin=True
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        with self.settings(API_LOGGING={'EXCLUDE_PATHS': ['/api/v1/common/api-logs/']}):
+            client.get(reverse('common:api-log-list'))
+        self.assertFalse(APILog.objects.filter(request_path=reverse('common:api-log-list')).exists())
+
+        with self.settings(API_LOGGING={'INCLUDE_PATHS': []}):
+            client = APIClient()
+            client.force_authenticate(user=admin)
+            client.get(reverse('common:api-log-list'))
+        self.assertFalse(APILog.objects.filter(request_path=reverse('common:api-log-list')).exists())
+
+        with patch('common.middleware.enhanced_api_logging_middleware.resolve') as mock_resolve:
+            APIClient().get(reverse('common:api-log-list'))
+        mock_resolve.assert_not_called()
+        log = APILog.objects.get(request_path=reverse('common:api-log-list'))
+        self.assertEqual(log.view_name, 'common:api-log-list')
+
+
+class RequestProfilingTestCase(TestCase):
+    """
+    请求性能分析测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        get_profile_aggregator().reset()
+        self.admin = User.objects.create_user(
+            username='super', email='super@example.com', password='password123', is_super_admin=True
+        )
+
+    def test_server_timing_and_histograms(self):
+        """
+        测试启用后响应包含Server-Timing头，并按视图汇总
+        """
+        with self.settings(REQUEST_PROFILING={'ENABLED': True, 'SAMPLE_RATE': 1}):
+            client = APIClient()
+            client.force_authenticate(user=self.admin)
+            response = client.get(reverse('common:api-log-list'))
+            self.assertIn('db;dur=', response['Server-Timing'])
+            self.assertIn('render;dur=', response['Server-Timing'])
+
+            response = client.get(reverse('common:request-profiling'))
+        views = {item['view_name']: item for item in response.json()['data']['views']}
+        stats = views['common:api-log-list']
+        self.assertEqual(stats['count'], 1)
+        self.assertGreater(stats['avg_queries'], 0)
+        self.assertEqual(sum(stats['histogram'].values()), 1)
+
+    def test_disabled_by_default(self):
+        """
+        测试未启用时不添加Server-Timing头
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse('common:api-log-list'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class QueryInspectionTestCase(QueryInspectionTestMixin, TestCase):
+    """
+    SQL查询检查测试
+    """
+    def _repeat_queries(self, times):
+        for index in range(times):
+            User.objects.filter(pk=index).exists()
+
+    def test_fingerprint(self):
+        """
+        测试参数值不同的SQL得到相同的指纹
+        """
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'a' LIMIT 21"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s) AND name = 'b' LIMIT 1"),
+        )
+
+    def test_detects_repeated_queries(self):
+        """
+        测试重复的SQL被识别为疑似N+1，并记录调用位置
+        """
+        inspector = QueryInspector(n_plus_one_threshold=3)
+        with inspector.capture():
+            self._repeat_queries(3)
+        duplicates = inspector.get_duplicates()
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]['count'], 3)
+        self.assertIn('_repeat_queries', duplicates[0]['call_site'][0])
+
+        with self.assertRaises(AssertionError):
+            with self.assertNoDuplicateQueries(threshold=3):
+                self._repeat_queries(3)
+
+    def test_middleware_writes_view_report(self):
+        """
+        测试中间件按视图写入报告文件
+        """
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        config = {
+            'ENABLED': True, 'SAMPLE_RATE': 1, 'N_PLUS_ONE_THRESHOLD': 2,
+            'REPORT_DIR': report_dir, 'REPORT_INTERVAL': 0,
+        }
+
+        def get_response(request):
+            self._repeat_queries(2)
+            return JsonResponse({})
+
+        with self.settings(QUERY_INSPECTION=config):
+            middleware = QueryInspectionMiddleware(get_response)
+            middleware.report_store = QueryReportStore(report_dir, 0)
+            middleware(RequestFactory().get('/api/v1/test/'))
+
+        with open(os.path.join(report_dir, 'unresolved.json'), encoding='utf-8') as report_file:
+            report = json.load(report_file)
+        self.assertEqual(report['flagged_requests'], 1)
+        self.assertEqual(report['issues'][0]['type'], 'n_plus_one')
+        self.assertEqual(report['issues'][0]['max_count'], 2)
+
+
+class HotPathLoggingTestCase(TestCase):
+    """
+    热路径日志测试
+    """
+    def test_sample_rate_prefix_match(self):
+        """
+        测试采样比例按logger名称最长前缀匹配
+        """
+        rates = {'common': 0.5, 'common.utils': 0.1, 'common.utils.tenant_manager': 0.01}
+        self.assertEqual(get_sample_rate('common.utils.tenant_manager', rates), 0.01)
+        self.assertEqual(get_sample_rate('common.utils.tenant_context', rates), 0.1)
+        self.assertEqual(get_sample_rate('common.viewsets', rates), 0.5)
+        self.assertEqual(get_sample_rate('commonx', rates), 1.0)
+
+    def test_disabled_level_is_not_formatted(self):
+        """
+        测试未启用的级别不格式化参数，采样只作用于WARNING以下级别
+        """
+        class Unformattable:
+            def __str__(self):
+                raise AssertionError('不应格式化')
+
+        logger = logging.getLogger('common.tests.hot_path')
+        logger.setLevel(logging.INFO)
+        self.addCleanup(logger.setLevel, logging.NOTSET)
+        hot_logger = HotPathLogger(logger, sample_rate=0)
+
+        with self.assertNoLogs(logger, level=logging.DEBUG):
+            hot_logger.debug("%s", Unformattable())
+            hot_logger.info("被采样丢弃")
+        with self.assertLogs(logger, level=logging.WARNING) as captured:
+            hot_logger.warning("租户 %s", 3)
+        self.assertEqual(captured.records[0].getMessage(), "租户 3")
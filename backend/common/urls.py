@@ -20,9 +20,15 @@ urlpatterns = [
     # API日志列表
     path('api-logs/', views.APILogListView.as_view(), name='api-log-list'),
     
+    # API日志导出
+    path('api-logs/export/', views.APILogExportView.as_view(), name='api-log-export'),
+    
     # API日志详情
     path('api-logs/<int:pk>/', views.APILogDetailView.as_view(), name='api-log-detail'),
     
+    # 请求性能数据
+    path('profiling/', views.RequestProfilingView.as_view(), name='request-profiling'),
+    
     # 测试标准响应格式 - 类视图
     path('test-format-class/', TestStandardResponseView.as_view(), name='test-standard-response-class'),
     
@@ -0,0 +1,255 @@
+"""
+API日志保留与归档
+- 超过保留天数的日志按天、按租户写入压缩归档文件(JSONL + gzip)
+- 归档文件落盘后再分批删除数据库中的记录，单次DELETE的行数有上限
+- 归档文件可以重新导入数据库用于排查问题
+
+归档文件路径: <ARCHIVE_DIR>/<YYYY-MM>/<YYYY-MM-DD>/tenant_<租户ID或none>.jsonl.gz
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from common.models import APILog
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.API_LOG_RETENTION 覆盖
+DEFAULT_RETENTION_CONFIG = {
+    # 数据库中保留的天数
+    'DAYS': 90,
+    # 归档文件目录
+    'ARCHIVE_DIR': os.path.join(settings.BASE_DIR, 'archives', 'api_logs'),
+    # 每批读取和删除的行数
+    'BATCH_SIZE': 1000,
+}
+
+# 没有租户的日志使用的文件名
+NO_TENANT = 'none'
+
+
+def get_retention_config():
+    """
+    获取合并了默认值的保留配置
+
+    Returns:
+        dict: 保留配置
+    """
+    config = dict(DEFAULT_RETENTION_CONFIG)
+    config.update(getattr(settings, 'API_LOG_RETENTION', {}) or {})
+    return config
+
+
+def _day_range(day):
+    """
+    获取某一天在当前时区下的起止时间
+    """
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+def get_archive_path(archive_dir, day, tenant_id):
+    """
+    获取某天某租户的归档文件路径
+
+    Args:
+        archive_dir: 归档目录
+        day: 日期
+        tenant_id: 租户ID，None表示没有租户的日志
+
+    Returns:
+        str: 归档文件路径
+    """
+    tenant_part = NO_TENANT if tenant_id is None else tenant_id
+    return os.path.join(
+        archive_dir, f"{day:%Y-%m}", day.isoformat(), f"tenant_{tenant_part}.jsonl.gz"
+    )
+
+
+def get_archivable_days(days):
+    """
+    获取需要归档的日期，即保留期之前有日志的每一天
+
+    Args:
+        days: 保留天数
+
+    Returns:
+        list: 日期列表，从早到晚
+    """
+    cutoff = timezone.localdate() - datetime.timedelta(days=days)
+    cutoff_start, _ = _day_range(cutoff)
+    first = APILog.objects.filter(created_at__lt=cutoff_start).aggregate(first=Min('created_at'))['first']
+    if first is None:
+        return []
+
+    day = timezone.localtime(first).date()
+    result = []
+    while day < cutoff:
+        result.append(day)
+        day += datetime.timedelta(days=1)
+    return result
+
+
+def _iter_rows(queryset, batch_size, fields):
+    """
+    按主键顺序分批读取日志，不使用OFFSET
+    """
+    queryset = queryset.order_by('pk').values(*fields)
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_pk = rows[-1]['id']
+
+
+def _write_archive(path, queryset, batch_size):
+    """
+    将查询集写入归档文件
+
+    先写临时文件再原子替换，进程中断不会留下损坏的归档；归档文件已存在时
+    (上次归档后删除未完成，或恢复的日志再次归档)保留原有内容，跳过重复的记录
+
+    Returns:
+        (写入的行数, 最大主键)
+    """
+    fields = [field.attname for field in APILog._meta.concrete_fields]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    existing_ids = set()
+    count = 0
+    max_pk = None
+    with open(tmp_path, 'wb') as raw:
+        with gzip.open(raw, 'wt', encoding='utf-8') as output:
+            if os.path.exists(path):
+                with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                    for line in archive:
+                        existing_ids.add(json.loads(line)['id'])
+                        output.write(line)
+
+            for row in _iter_rows(queryset, batch_size, fields):
+                max_pk = row['id']
+                if row['id'] in existing_ids:
+                    continue
+                # str()保留datetime的微秒，恢复时由字段的to_python解析
+                output.write(json.dumps(row, ensure_ascii=False, default=str))
+                output.write('\n')
+                count += 1
+
+        # 确认归档已写入磁盘后才会删除数据库中的记录
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    os.replace(tmp_path, path)
+    return count, max_pk
+
+
+def _delete_archived(queryset, max_pk, batch_size):
+    """
+    分批删除已归档的日志，每批一个短事务
+    """
+    queryset = queryset.filter(pk__lte=max_pk)
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            deleted += APILog.objects.filter(pk__in=ids).delete()[0]
+
+
+def archive_day(day, archive_dir=None, batch_size=None, dry_run=False):
+    """
+    归档并删除某一天的日志，每个租户一个归档文件
+
+    Args:
+        day: 日期
+        archive_dir: 归档目录，默认使用配置
+        batch_size: 每批读取和删除的行数，默认使用配置
+        dry_run: 只统计不归档
+
+    Returns:
+        list: [(租户ID, 归档行数, 删除行数)]
+    """
+    config = get_retention_config()
+    archive_dir = archive_dir or config['ARCHIVE_DIR']
+    batch_size = batch_size or config['BATCH_SIZE']
+
+    start, end = _day_range(day)
+    day_logs = APILog.objects.filter(created_at__gte=start, created_at__lt=end)
+    tenant_ids = list(day_logs.order_by().values_list('tenant_id', flat=True).distinct())
+
+    result = []
+    for tenant_id in tenant_ids:
+        queryset = day_logs.filter(tenant_id=tenant_id) if tenant_id is not None \
+            else day_logs.filter(tenant__isnull=True)
+        if dry_run:
+            result.append((tenant_id, queryset.count(), 0))
+            continue
+
+        path = get_archive_path(archive_dir, day, tenant_id)
+        archived, max_pk = _write_archive(path, queryset, batch_size)
+        deleted = _delete_archived(queryset, max_pk, batch_size) if max_pk is not None else 0
+        logger.info(f"API日志已归档: {day} tenant_id={tenant_id} 归档{archived}条 删除{deleted}条 -> {path}")
+        result.append((tenant_id, archived, deleted))
+    return result
+
+
+def rehydrate_archive(path, batch_size=None):
+    """
+    将归档文件中的日志重新导入数据库
+
+    已存在的主键会被跳过；关联的用户或租户已删除时对应字段置空
+
+    Args:
+        path: 归档文件路径
+        batch_size: 每批写入的行数，默认使用配置
+
+    Returns:
+        int: 读取的行数
+    """
+    from tenants.models import Tenant
+    from users.models import User
+
+    batch_size = batch_size or get_retention_config()['BATCH_SIZE']
+    created_at_field = APILog._meta.get_field('created_at')
+
+    def flush(batch):
+        user_ids = set(User.objects.filter(
+            pk__in={log.user_id for log in batch if log.user_id}
+        ).values_list('pk', flat=True))
+        tenant_ids = set(Tenant.objects.filter(
+            pk__in={log.tenant_id for log in batch if log.tenant_id}
+        ).values_list('pk', flat=True))
+        for log in batch:
+            if log.user_id not in user_ids:
+                log.user_id = None
+            if log.tenant_id not in tenant_ids:
+                log.tenant_id = None
+        APILog.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+
+    count = 0
+    batch = []
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            data = json.loads(line)
+            data['created_at'] = created_at_field.to_python(data['created_at'])
+            batch.append(APILog(**data))
+            count += 1
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+    if batch:
+        flush(batch)
+
+    logger.info(f"API日志归档已恢复: {path} 共{count}条")
+    return count
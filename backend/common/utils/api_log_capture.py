@@ -0,0 +1,216 @@
+"""
+API日志的记录策略
+- 需要记录的路径前缀和排除的路径前缀
+- 响应体按模式(全部/只记录错误/不记录)、路径前缀和状态码规则采样
+- 超过字节上限的内容只保留截断后的预览
+- 密码、令牌等敏感字段在写入日志前脱敏
+"""
+import json
+import logging
+import random
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.API_LOGGING 覆盖
+DEFAULT_CAPTURE_CONFIG = {
+    # 需要记录日志的路径前缀
+    'INCLUDE_PATHS': ['/api/'],
+    # 不记录日志的路径前缀，优先于INCLUDE_PATHS
+    'EXCLUDE_PATHS': ['/api/v1/schema/', '/api/v1/docs/', '/api/v1/redoc/', '/api/v1/health/'],
+    # 是否记录请求体
+    'LOG_REQUEST_BODY': True,
+    # 响应体记录模式: all(全部) / errors(错误响应全部记录，成功响应按比例采样) / none(不记录)
+    'RESPONSE_BODY_MODE': 'errors',
+    # errors模式下成功响应的响应体采样比例
+    'RESPONSE_BODY_SAMPLE_RATE': 0.01,
+    # 按路径前缀和状态码覆盖采样比例，先匹配的规则生效，例如:
+    # {'path': '/api/v1/auth/', 'sample_rate': 0}
+    # {'status': '5xx', 'sample_rate': 1}
+    # {'path': '/api/v1/cms/', 'status': 200, 'sample_rate': 0.001}
+    'RESPONSE_BODY_RULES': [],
+    # 请求体/响应体的最大字节数，超出时只保留截断后的预览
+    'MAX_BODY_BYTES': 4096,
+    # 敏感字段，字段名(不区分大小写)包含其中任意一项时脱敏
+    'SENSITIVE_FIELDS': [
+        'password', 'token', 'secret', 'authorization', 'api_key', 'credential',
+    ],
+}
+
+RESPONSE_BODY_MODES = ('all', 'errors', 'none')
+
+# 脱敏后的值
+REDACTED = '******'
+
+
+def get_capture_config():
+    """
+    获取合并了默认值的记录策略配置
+
+    Returns:
+        dict: 记录策略配置
+    """
+    config = dict(DEFAULT_CAPTURE_CONFIG)
+    config.update(getattr(settings, 'API_LOGGING', {}) or {})
+    return config
+
+
+def _status_matcher(status):
+    """
+    将规则中的状态码(200、'2xx'、[401, 403])转换为判断函数
+    """
+    if status is None:
+        return lambda status_code: True
+    if isinstance(status, (list, tuple, set)):
+        matchers = [_status_matcher(item) for item in status]
+        return lambda status_code: any(matcher(status_code) for matcher in matchers)
+    if isinstance(status, str) and status.lower().endswith('xx'):
+        status_class = int(status[0])
+        return lambda status_code: status_code // 100 == status_class
+    status = int(status)
+    return lambda status_code: status_code == status
+
+
+class BodyCapturePolicy:
+    """
+    请求体/响应体记录策略
+
+    规则在初始化时编译一次，每个请求只做前缀和状态码比较
+    """
+
+    def __init__(self, config=None):
+        config = config or get_capture_config()
+        self.log_request_body = config['LOG_REQUEST_BODY']
+        self.mode = config['RESPONSE_BODY_MODE']
+        if self.mode not in RESPONSE_BODY_MODES:
+            raise ValueError(f"无效的响应体记录模式: {self.mode}，可选值: {', '.join(RESPONSE_BODY_MODES)}")
+        self.sample_rate = float(config['RESPONSE_BODY_SAMPLE_RATE'])
+        self.max_bytes = int(config['MAX_BODY_BYTES'])
+        self.sensitive_fields = tuple(field.lower() for field in config['SENSITIVE_FIELDS'])
+        self.rules = [
+            (rule.get('path', ''), _status_matcher(rule.get('status')), float(rule['sample_rate']))
+            for rule in config['RESPONSE_BODY_RULES']
+        ]
+        self._sensitive_cache = {}
+
+    def get_sample_rate(self, path, status_code):
+        """
+        获取响应体的采样比例
+
+        Args:
+            path: 请求路径
+            status_code: 响应状态码
+
+        Returns:
+            float: 0~1之间的采样比例
+        """
+        for prefix, status_matches, sample_rate in self.rules:
+            if path.startswith(prefix) and status_matches(status_code):
+                return sample_rate
+        if self.mode == 'all':
+            return 1.0
+        if self.mode == 'none':
+            return 0.0
+        return 1.0 if status_code >= 400 else self.sample_rate
+
+    def should_capture_response(self, path, status_code):
+        """
+        判断是否记录本次请求的响应体
+        """
+        sample_rate = self.get_sample_rate(path, status_code)
+        return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+    def is_sensitive(self, key):
+        """
+        判断字段名是否为敏感字段
+        """
+        result = self._sensitive_cache.get(key)
+        if result is None:
+            lowered = str(key).lower()
+            result = any(field in lowered for field in self.sensitive_fields)
+            if len(self._sensitive_cache) < 1000:
+                self._sensitive_cache[key] = result
+        return result
+
+    def redact(self, data):
+        """
+        递归脱敏敏感字段，返回新的数据，不修改原数据
+
+        Args:
+            data: 字典、列表或其他值
+
+        Returns:
+            脱敏后的数据
+        """
+        if isinstance(data, dict):
+            return {
+                key: REDACTED if self.is_sensitive(key) and value not in (None, '') else self.redact(value)
+                for key, value in data.items()
+            }
+        if isinstance(data, (list, tuple)):
+            return [self.redact(item) for item in data]
+        return data
+
+    def truncate(self, content):
+        """
+        生成超出字节上限的内容的截断预览
+
+        Args:
+            content: 序列化后的字节内容
+
+        Returns:
+            dict: 截断标记、原始大小和预览
+        """
+        preview = content[:self.max_bytes].decode('utf-8', errors='ignore')
+        return {'_truncated': True, 'size': len(content), 'preview': preview}
+
+    def capture(self, data, content=None):
+        """
+        按字节上限和脱敏规则处理要记录的内容
+
+        Args:
+            data: 已解析的数据
+            content: 已序列化的字节内容，未提供时序列化data计算大小
+
+        Returns:
+            可写入日志的数据
+        """
+        if data is None:
+            return None
+        if content is None:
+            try:
+                content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+            except (TypeError, ValueError) as e:
+                logger.warning(f"无法序列化日志内容: {str(e)}")
+                return {'error': f"无法序列化日志内容: {str(e)}"}
+        if len(content) > self.max_bytes:
+            # 截断的预览无法逐字段脱敏，包含敏感字段名时不保留预览
+            truncated = self.truncate(content)
+            truncated['preview'] = self.redact_text(truncated['preview'])
+            return truncated
+        return self.redact(data)
+
+    def redact_text(self, text):
+        """
+        脱敏无法逐字段处理的文本，包含敏感字段名时整体替换
+        """
+        lowered = text.lower()
+        if any(field in lowered for field in self.sensitive_fields):
+            return REDACTED
+        return text
+
+    def capture_raw(self, content):
+        """
+        按字节上限和脱敏规则处理非JSON/表单的原始内容
+
+        Args:
+            content: 原始字节内容
+
+        Returns:
+            dict: {'raw': 文本}，超出字节上限时为截断预览
+        """
+        if len(content) > self.max_bytes:
+            return self.capture({}, content)
+        return {'raw': self.redact_text(content.decode('utf-8', errors='replace'))}
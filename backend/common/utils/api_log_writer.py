@@ -0,0 +1,295 @@
+"""
+API日志异步批量写入器
+将API日志放入有界内存队列，由后台线程批量写入数据库，避免请求路径上的同步INSERT
+"""
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.API_LOG_WRITER 覆盖
+DEFAULT_WRITER_CONFIG = {
+    # 是否启用异步写入，关闭后退化为同步写入(settings中运行测试时默认关闭)
+    'ENABLED': True,
+    # 队列最大长度
+    'MAX_QUEUE_SIZE': 10000,
+    # 每批写入的最大记录数
+    'BATCH_SIZE': 200,
+    # 两次刷新之间的最长间隔(秒)
+    'FLUSH_INTERVAL': 2.0,
+    # 队列满时的背压策略: drop(丢弃) / sample(采样) / block(阻塞)
+    'OVERFLOW_POLICY': 'drop',
+    # sample策略下，队列超过高水位后保留记录的比例
+    'SAMPLE_RATE': 0.1,
+    # sample策略的高水位(队列占用比例)
+    'SAMPLE_HIGH_WATERMARK': 0.8,
+    # block策略下的最长等待时间(秒)，超时后丢弃
+    'BLOCK_TIMEOUT': 0.5,
+}
+
+OVERFLOW_POLICIES = ('drop', 'sample', 'block')
+
+
+def get_writer_config():
+    """
+    获取合并了默认值的写入器配置
+
+    Returns:
+        dict: 写入器配置
+    """
+    config = dict(DEFAULT_WRITER_CONFIG)
+    config.update(getattr(settings, 'API_LOG_WRITER', {}) or {})
+    return config
+
+
+class APILogWriter:
+    """
+    API日志批量写入器
+
+    - 请求线程只负责将未保存的APILog对象放入队列
+    - 后台工作线程按BATCH_SIZE或FLUSH_INTERVAL触发bulk_create
+    - 队列满时按OVERFLOW_POLICY执行背压策略
+    - 进程退出时刷新剩余记录
+    """
+
+    def __init__(self, max_queue_size=10000, batch_size=200, flush_interval=2.0,
+                 overflow_policy='drop', sample_rate=0.1, sample_high_watermark=0.8,
+                 block_timeout=0.5):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"无效的背压策略: {overflow_policy}，可选值: {', '.join(OVERFLOW_POLICIES)}")
+
+        self.max_queue_size = max_queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.sample_rate = sample_rate
+        self.sample_high_watermark = sample_high_watermark
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._worker = None
+        self._stats = {
+            'queued': 0,
+            'flushed': 0,
+            'dropped': 0,
+            'sampled_out': 0,
+            'failed': 0,
+            'batches': 0,
+        }
+
+    @classmethod
+    def from_settings(cls):
+        """
+        根据settings.API_LOG_WRITER创建写入器
+        """
+        config = get_writer_config()
+        return cls(
+            max_queue_size=config['MAX_QUEUE_SIZE'],
+            batch_size=config['BATCH_SIZE'],
+            flush_interval=config['FLUSH_INTERVAL'],
+            overflow_policy=config['OVERFLOW_POLICY'],
+            sample_rate=config['SAMPLE_RATE'],
+            sample_high_watermark=config['SAMPLE_HIGH_WATERMARK'],
+            block_timeout=config['BLOCK_TIMEOUT'],
+        )
+
+    def _incr(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def get_stats(self):
+        """
+        获取写入器计数器
+
+        Returns:
+            dict: queued/flushed/dropped等计数以及当前队列长度
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        stats['running'] = self.is_running
+        return stats
+
+    @property
+    def is_running(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def start(self):
+        """
+        启动后台工作线程
+        """
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(
+            target=self._run,
+            name='api-log-writer',
+            daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            f"API日志写入器已启动: batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval}s, policy={self.overflow_policy}"
+        )
+
+    def enqueue(self, log_entry):
+        """
+        将日志记录放入队列
+
+        Args:
+            log_entry: 未保存的APILog对象
+
+        Returns:
+            布尔值，指示记录是否被接受
+        """
+        if self.overflow_policy == 'sample':
+            # 队列超过高水位时按比例采样，减小写入压力
+            high_watermark = self.max_queue_size * self.sample_high_watermark
+            if self._queue.qsize() >= high_watermark and random.random() >= self.sample_rate:
+                self._incr('sampled_out')
+                self._incr('dropped')
+                return False
+
+        try:
+            if self.overflow_policy == 'block':
+                self._queue.put(log_entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(log_entry)
+        except queue.Full:
+            self._incr('dropped')
+            return False
+
+        self._incr('queued')
+        return True
+
+    def _drain(self, limit):
+        """
+        从队列中取出最多limit条记录
+        """
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        """
+        批量写入一批日志记录
+        """
+        from common.models import APILog
+
+        try:
+            APILog.objects.bulk_create(batch, batch_size=self.batch_size)
+            self._incr('flushed', len(batch))
+            self._incr('batches')
+        except Exception as e:
+            # 写入失败不重试，避免失败的批次阻塞后续日志
+            self._incr('failed', len(batch))
+            logger.error(f"批量写入API日志失败({len(batch)}条): {str(e)}")
+
+    def flush(self):
+        """
+        将队列中的全部记录写入数据库
+
+        Returns:
+            int: 本次写入(含失败)的记录数
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    break
+                self._write_batch(batch)
+                written += len(batch)
+        return written
+
+    def _run(self):
+        """
+        工作线程主循环
+        """
+        last_flush = time.monotonic()
+        while not self._stop_event.is_set():
+            elapsed = time.monotonic() - last_flush
+            if self._queue.qsize() >= self.batch_size or elapsed >= self.flush_interval:
+                close_old_connections()
+                try:
+                    self.flush()
+                finally:
+                    close_old_connections()
+                last_flush = time.monotonic()
+                continue
+            # 等待新的记录或刷新间隔到期
+            self._stop_event.wait(min(0.05, self.flush_interval))
+
+        # 停止前写入剩余记录
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def shutdown(self, timeout=5.0):
+        """
+        停止工作线程并刷新剩余记录
+
+        Args:
+            timeout: 等待工作线程结束的最长时间(秒)
+        """
+        if self.is_running:
+            self._stop_event.set()
+            self._worker.join(timeout)
+            self._worker = None
+        # 工作线程未启动或超时未结束时，由当前线程写入剩余记录
+        if self._queue.qsize():
+            self.flush()
+        logger.info(f"API日志写入器已停止: {self.get_stats()}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_api_log_writer():
+    """
+    获取进程级共享的API日志写入器，首次调用时创建并启动
+
+    Returns:
+        APILogWriter对象，未启用异步写入时返回None
+    """
+    global _writer
+    if _writer is not None:
+        return _writer
+
+    if not get_writer_config()['ENABLED']:
+        return None
+
+    with _writer_lock:
+        if _writer is None:
+            writer = APILogWriter.from_settings()
+            writer.start()
+            atexit.register(writer.shutdown)
+            _writer = writer
+    return _writer
+
+
+def shutdown_api_log_writer():
+    """
+    停止进程级共享的写入器（例如在worker退出钩子中调用）
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.shutdown()
+            _writer = None
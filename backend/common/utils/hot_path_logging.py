@@ -0,0 +1,118 @@
+"""
+热路径日志工具
+每个请求都会执行多次的代码(租户中间件、租户管理器、视图集基类、模型保存等)使用的日志封装：
+- 先判断日志级别，未启用的级别不创建日志记录，也不格式化消息
+- 消息使用 %s 占位符延迟格式化，只在确实输出时拼接
+- 可按模块设置采样比例，高频日志只输出一部分
+- 结构化字段通过 extra 传给处理器
+
+用法:
+    hot_logger = get_hot_logger(__name__)
+    hot_logger.debug("按租户ID过滤查询集: %s", tenant_id, extra={'tenant_id': tenant_id})
+
+参数本身的计算(例如访问惰性对象的属性)仍会在调用前执行，需要时先判断 hot_logger.isEnabledFor(level)
+"""
+import logging
+import random
+import threading
+
+from django.conf import settings
+
+# 默认配置，可通过 settings.HOT_PATH_LOGGING 覆盖
+DEFAULT_HOT_PATH_LOGGING_CONFIG = {
+    # 按logger名称设置的采样比例，按最长前缀匹配，例如 {'common.utils.tenant_manager': 0.01}
+    # 未匹配的logger为1.0，WARNING及以上级别不采样
+    'SAMPLE_RATES': {},
+}
+
+
+def get_hot_path_logging_config():
+    """
+    获取合并了默认值的热路径日志配置
+
+    Returns:
+        dict: 热路径日志配置
+    """
+    config = dict(DEFAULT_HOT_PATH_LOGGING_CONFIG)
+    config.update(getattr(settings, 'HOT_PATH_LOGGING', {}) or {})
+    return config
+
+
+def get_sample_rate(name, sample_rates):
+    """
+    按最长前缀匹配logger名称的采样比例
+
+    Args:
+        name: logger名称
+        sample_rates: {logger名称前缀: 采样比例}
+
+    Returns:
+        float: 采样比例
+    """
+    matched = None
+    for prefix in sample_rates:
+        if (name == prefix or name.startswith(prefix + '.')) and (matched is None or len(prefix) > len(matched)):
+            matched = prefix
+    return float(sample_rates[matched]) if matched is not None else 1.0
+
+
+class HotPathLogger:
+    """
+    级别判断在前、延迟格式化、可采样的logger封装
+    """
+
+    __slots__ = ('logger', 'sample_rate')
+
+    def __init__(self, logger, sample_rate=1.0):
+        self.logger = logger
+        self.sample_rate = sample_rate
+
+    def isEnabledFor(self, level):
+        """
+        判断级别是否启用(使用logging模块按logger缓存的结果)
+        """
+        return self.logger.isEnabledFor(level)
+
+    def _log(self, level, msg, args, kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING and self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        kwargs.setdefault('stacklevel', 3)
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        self._log(logging.DEBUG, msg, args, kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self._log(logging.INFO, msg, args, kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self._log(logging.WARNING, msg, args, kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self._log(logging.ERROR, msg, args, kwargs)
+
+
+_hot_loggers = {}
+_hot_loggers_lock = threading.Lock()
+
+
+def get_hot_logger(name):
+    """
+    获取热路径logger，同名只创建一次
+
+    Args:
+        name: logger名称，通常为 __name__
+
+    Returns:
+        HotPathLogger
+    """
+    hot_logger = _hot_loggers.get(name)
+    if hot_logger is None:
+        with _hot_loggers_lock:
+            hot_logger = _hot_loggers.get(name)
+            if hot_logger is None:
+                sample_rate = get_sample_rate(name, get_hot_path_logging_config()['SAMPLE_RATES'])
+                hot_logger = _hot_loggers[name] = HotPathLogger(logging.getLogger(name), sample_rate)
+    return hot_logger
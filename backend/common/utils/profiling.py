@@ -0,0 +1,289 @@
+"""
+请求性能分析工具
+- RequestProfile记录单个请求的SQL次数与耗时、序列化、渲染、视图和中间件耗时
+- 通过connection.execute_wrapper统计SQL，通过包装BaseSerializer.data统计序列化耗时
+- ProfileAggregator按视图名称汇总耗时分布，供管理接口查询
+
+当前线程没有正在分析的请求时，各个钩子只做一次线程本地变量读取
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+
+# 默认配置，可通过 settings.REQUEST_PROFILING 覆盖
+DEFAULT_PROFILING_CONFIG = {
+    # 是否启用，关闭时中间件不加载
+    'ENABLED': False,
+    # 采样比例，生产环境建议使用较小的值
+    'SAMPLE_RATE': 1.0,
+    # 是否在响应中添加Server-Timing头
+    'SERVER_TIMING': True,
+    # 总耗时分布的桶上限(毫秒)
+    'HISTOGRAM_BUCKETS': [10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    # 最多汇总的视图数量，超出后新的视图归入"other"
+    'MAX_VIEWS': 500,
+}
+
+# 汇总的耗时指标
+TIMING_METRICS = ('total', 'db', 'serializer', 'render', 'view', 'middleware')
+
+_thread_local = threading.local()
+
+
+def get_profiling_config():
+    """
+    获取合并了默认值的性能分析配置
+
+    Returns:
+        dict: 性能分析配置
+    """
+    config = dict(DEFAULT_PROFILING_CONFIG)
+    config.update(getattr(settings, 'REQUEST_PROFILING', {}) or {})
+    return config
+
+
+def get_current_profile():
+    """
+    获取当前线程正在分析的请求
+
+    Returns:
+        RequestProfile或None
+    """
+    return getattr(_thread_local, 'profile', None)
+
+
+class RequestProfile:
+    """
+    单个请求的性能数据，时间单位为秒
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.end = None
+        self.view_start = None
+        self.render_end = None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.render_time = 0.0
+        self._serializer_depth = 0
+
+    def __enter__(self):
+        _thread_local.profile = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _thread_local.profile = None
+        self.end = time.perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        connection.execute_wrapper钩子，统计SQL次数和耗时
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += time.perf_counter() - start
+
+    def get_metrics(self):
+        """
+        计算各阶段耗时(毫秒)
+
+        视图阶段从process_view开始，到DRF渲染结束(非DRF响应为返回到中间件时)，
+        中间件耗时为总耗时减去视图阶段
+
+        Returns:
+            dict: 各阶段耗时和SQL次数
+        """
+        end = self.end or time.perf_counter()
+        total = end - self.start
+        if self.view_start is None:
+            view = 0.0
+            middleware = total
+        else:
+            app = (self.render_end or end) - self.view_start
+            view = max(app - self.render_time, 0.0)
+            middleware = max(total - app, 0.0)
+        return {
+            'total': total * 1000,
+            'db': self.query_time * 1000,
+            'serializer': self.serializer_time * 1000,
+            'render': self.render_time * 1000,
+            'view': view * 1000,
+            'middleware': middleware * 1000,
+            'queries': self.query_count,
+        }
+
+    def server_timing(self, metrics=None):
+        """
+        生成Server-Timing响应头
+
+        Returns:
+            str: 例如 db;dur=12.3;desc="5 queries", total;dur=45.6
+        """
+        metrics = metrics or self.get_metrics()
+        parts = [f'db;dur={metrics["db"]:.1f};desc="{metrics["queries"]} queries"']
+        parts.extend(
+            f'{name};dur={metrics[name]:.1f}'
+            for name in ('serializer', 'render', 'view', 'middleware', 'total')
+        )
+        return ', '.join(parts)
+
+
+@contextmanager
+def _render_timer(profile):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.render_end = time.perf_counter()
+        profile.render_time += profile.render_end - start
+
+
+def profile_render():
+    """
+    统计渲染耗时的上下文管理器，没有正在分析的请求时不做任何事
+    """
+    profile = get_current_profile()
+    if profile is None:
+        return nullcontext()
+    return _render_timer(profile)
+
+
+_serializer_timing_installed = False
+
+
+def install_serializer_timing():
+    """
+    包装BaseSerializer.data，统计最外层序列化器的耗时(包括序列化期间执行的SQL)
+
+    可重复调用，只包装一次
+    """
+    global _serializer_timing_installed
+    if _serializer_timing_installed:
+        return
+
+    from rest_framework.serializers import BaseSerializer
+
+    original_data = BaseSerializer.data.fget
+
+    def data(self):
+        profile = get_current_profile()
+        if profile is None or profile._serializer_depth:
+            return original_data(self)
+        profile._serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_data(self)
+        finally:
+            profile.serializer_time += time.perf_counter() - start
+            profile._serializer_depth -= 1
+
+    BaseSerializer.data = property(data)
+    _serializer_timing_installed = True
+
+
+class ProfileAggregator:
+    """
+    按视图名称汇总请求性能数据
+
+    数据保存在进程内存中，多进程部署时每个进程分别汇总
+    """
+
+    def __init__(self, buckets=None, max_views=500):
+        self.buckets = sorted(buckets or DEFAULT_PROFILING_CONFIG['HISTOGRAM_BUCKETS'])
+        self.max_views = max_views
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def _new_entry(self):
+        entry = {'count': 0, 'queries': 0, 'max_queries': 0, 'histogram': [0] * (len(self.buckets) + 1)}
+        entry.update({f'{name}_sum': 0.0 for name in TIMING_METRICS})
+        entry['total_max'] = 0.0
+        return entry
+
+    def record(self, view_name, metrics):
+        """
+        记录一个请求的性能数据
+
+        Args:
+            view_name: 视图名称
+            metrics: RequestProfile.get_metrics()的结果
+        """
+        bucket = bisect.bisect_left(self.buckets, metrics['total'])
+
+        with self._lock:
+            if view_name not in self._views and len(self._views) >= self.max_views:
+                view_name = 'other'
+            entry = self._views.get(view_name)
+            if entry is None:
+                entry = self._views[view_name] = self._new_entry()
+            entry['count'] += 1
+            entry['queries'] += metrics['queries']
+            entry['max_queries'] = max(entry['max_queries'], metrics['queries'])
+            entry['total_max'] = max(entry['total_max'], metrics['total'])
+            entry['histogram'][bucket] += 1
+            for name in TIMING_METRICS:
+                entry[f'{name}_sum'] += metrics[name]
+
+    def snapshot(self):
+        """
+        获取汇总结果，按总耗时之和倒序
+
+        Returns:
+            list: 每个视图的请求数、平均耗时、SQL次数和耗时分布
+        """
+        with self._lock:
+            views = {name: dict(entry, histogram=list(entry['histogram'])) for name, entry in self._views.items()}
+
+        labels = [f'<={upper}ms' for upper in self.buckets] + [f'>{self.buckets[-1]}ms']
+        result = []
+        for view_name, entry in views.items():
+            count = entry['count']
+            item = {
+                'view_name': view_name,
+                'count': count,
+                'avg_queries': round(entry['queries'] / count, 2),
+                'max_queries': entry['max_queries'],
+                'max_total_ms': round(entry['total_max'], 2),
+                'histogram': dict(zip(labels, entry['histogram'])),
+            }
+            item.update({
+                f'avg_{name}_ms': round(entry[f'{name}_sum'] / count, 2) for name in TIMING_METRICS
+            })
+            result.append((entry['total_sum'], item))
+
+        result.sort(key=lambda pair: pair[0], reverse=True)
+        return [item for _, item in result]
+
+    def reset(self):
+        """
+        清空汇总数据
+        """
+        with self._lock:
+            self._views = {}
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_profile_aggregator():
+    """
+    获取进程内的汇总器单例
+
+    Returns:
+        ProfileAggregator
+    """
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                config = get_profiling_config()
+                _aggregator = ProfileAggregator(config['HISTOGRAM_BUCKETS'], config['MAX_VIEWS'])
+    return _aggregator
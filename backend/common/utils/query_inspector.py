@@ -0,0 +1,297 @@
+"""
+SQL查询检查工具
+- 将SQL规范化为指纹(去掉字面量、合并IN列表)，同一请求中重复次数超过阈值的指纹视为疑似N+1
+- 记录超过阈值的慢查询及调用位置
+- QueryReportStore按视图名称汇总问题并写入排序后的报告文件
+- QueryInspectionTestMixin在测试中断言没有疑似N+1，用于发现性能回退
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.QUERY_INSPECTION 覆盖
+DEFAULT_INSPECTION_CONFIG = {
+    # 是否启用检查中间件，关闭时中间件不加载
+    'ENABLED': False,
+    # 采样比例
+    'SAMPLE_RATE': 1.0,
+    # 同一请求中同一指纹的SQL执行次数达到该值时视为疑似N+1
+    'N_PLUS_ONE_THRESHOLD': 10,
+    # 慢查询阈值(毫秒)
+    'SLOW_QUERY_MS': 200,
+    # 调用位置保留的栈帧数
+    'STACK_DEPTH': 5,
+    # 报告目录，每个视图一个JSON文件
+    'REPORT_DIR': os.path.join(settings.BASE_DIR, 'logs', 'query_reports'),
+    # 同一视图的报告文件最短写入间隔(秒)
+    'REPORT_INTERVAL': 60,
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+# 调用位置中忽略的文件
+_IGNORED_FRAME_PATHS = (os.sep + 'site-packages' + os.sep, os.sep + 'lib' + os.sep + 'python', __file__)
+
+
+def get_inspection_config():
+    """
+    获取合并了默认值的查询检查配置
+
+    Returns:
+        dict: 查询检查配置
+    """
+    config = dict(DEFAULT_INSPECTION_CONFIG)
+    config.update(getattr(settings, 'QUERY_INSPECTION', {}) or {})
+    return config
+
+
+def fingerprint(sql):
+    """
+    将SQL规范化为指纹，参数值不同但结构相同的SQL得到相同的指纹
+
+    Args:
+        sql: SQL语句
+
+    Returns:
+        str: 规范化后的SQL
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql.replace('%s', '?'))
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def get_call_site(depth=5):
+    """
+    获取项目代码中的调用位置，忽略Django、第三方库和本模块的栈帧
+
+    Args:
+        depth: 保留的栈帧数
+
+    Returns:
+        list: 由内到外的 "文件:行号 函数名" 列表
+    """
+    frames = []
+    for frame in reversed(traceback.extract_stack()):
+        if any(path in frame.filename for path in _IGNORED_FRAME_PATHS):
+            continue
+        frames.append(f"{os.path.relpath(frame.filename, settings.BASE_DIR)}:{frame.lineno} {frame.name}")
+        if len(frames) >= depth:
+            break
+    return frames
+
+
+class QueryInspector:
+    """
+    记录一个请求(或一段代码)中执行的SQL，作为connection.execute_wrapper使用
+    """
+
+    def __init__(self, n_plus_one_threshold=10, slow_query_ms=200, stack_depth=5):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_query_ms = slow_query_ms
+        self.stack_depth = stack_depth
+        self.fingerprints = {}
+        self.slow_queries = []
+        self.query_count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.record(sql, duration)
+
+    def record(self, sql, duration):
+        """
+        记录一条SQL
+
+        Args:
+            sql: SQL语句
+            duration: 耗时(毫秒)
+        """
+        self.query_count += 1
+        key = fingerprint(sql)
+        entry = self.fingerprints.get(key)
+        if entry is None:
+            entry = self.fingerprints[key] = {'count': 0, 'time': 0.0, 'call_site': None}
+        entry['count'] += 1
+        entry['time'] += duration
+        # 只在达到阈值时获取一次调用位置，避免每条SQL都提取调用栈
+        if entry['count'] == self.n_plus_one_threshold:
+            entry['call_site'] = get_call_site(self.stack_depth)
+
+        if duration >= self.slow_query_ms:
+            call_site = get_call_site(self.stack_depth)
+            self.slow_queries.append({'sql': key, 'time': round(duration, 2), 'call_site': call_site})
+            logger.warning(f"慢查询 {duration:.1f}ms: {key[:500]} 调用位置: {' <- '.join(call_site)}")
+
+    @contextmanager
+    def capture(self):
+        """
+        在代码块执行期间检查所有数据库连接上的SQL
+        """
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def get_duplicates(self):
+        """
+        获取疑似N+1的SQL，按重复次数倒序
+
+        Returns:
+            list: [{'sql', 'count', 'time', 'call_site'}]
+        """
+        duplicates = [
+            {'sql': sql, 'count': entry['count'], 'time': round(entry['time'], 2), 'call_site': entry['call_site']}
+            for sql, entry in self.fingerprints.items()
+            if entry['count'] >= self.n_plus_one_threshold
+        ]
+        duplicates.sort(key=lambda item: item['count'], reverse=True)
+        return duplicates
+
+    def has_issues(self):
+        return bool(self.slow_queries) or any(
+            entry['count'] >= self.n_plus_one_threshold for entry in self.fingerprints.values()
+        )
+
+
+class QueryReportStore:
+    """
+    按视图名称汇总疑似N+1和慢查询，并写入排序后的报告文件
+
+    报告文件: <REPORT_DIR>/<视图名称>.json，同一视图按REPORT_INTERVAL限制写入频率
+    """
+
+    def __init__(self, report_dir, report_interval=60):
+        self.report_dir = report_dir
+        self.report_interval = report_interval
+        self._lock = threading.Lock()
+        self._views = {}
+        self._written_at = {}
+
+    def record(self, view_name, inspector):
+        """
+        记录一个请求的检查结果
+
+        Args:
+            view_name: 视图名称
+            inspector: QueryInspector
+        """
+        with self._lock:
+            view = self._views.setdefault(view_name, {'flagged_requests': 0, 'issues': {}})
+            view['flagged_requests'] += 1
+            for duplicate in inspector.get_duplicates():
+                issue = view['issues'].setdefault(('n_plus_one', duplicate['sql']), {
+                    'type': 'n_plus_one', 'sql': duplicate['sql'], 'occurrences': 0,
+                    'max_count': 0, 'total_time': 0.0, 'call_site': duplicate['call_site'],
+                })
+                issue['occurrences'] += 1
+                issue['max_count'] = max(issue['max_count'], duplicate['count'])
+                issue['total_time'] += duplicate['time']
+            for slow_query in inspector.slow_queries:
+                issue = view['issues'].setdefault(('slow', slow_query['sql']), {
+                    'type': 'slow', 'sql': slow_query['sql'], 'occurrences': 0,
+                    'max_time': 0.0, 'total_time': 0.0, 'call_site': slow_query['call_site'],
+                })
+                issue['occurrences'] += 1
+                issue['max_time'] = max(issue['max_time'], slow_query['time'])
+                issue['total_time'] += slow_query['time']
+
+            now = time.monotonic()
+            if now - self._written_at.get(view_name, float('-inf')) < self.report_interval:
+                return
+            self._written_at[view_name] = now
+            report = self._build_report(view_name, view)
+
+        self._write(view_name, report)
+
+    def _build_report(self, view_name, view):
+        issues = sorted(view['issues'].values(), key=lambda issue: issue['total_time'], reverse=True)
+        return {
+            'view_name': view_name,
+            'flagged_requests': view['flagged_requests'],
+            'issues': [dict(issue, total_time=round(issue['total_time'], 2)) for issue in issues],
+        }
+
+    def get_report(self, view_name):
+        """
+        获取视图的报告，问题按累计耗时倒序
+
+        Returns:
+            dict或None
+        """
+        with self._lock:
+            view = self._views.get(view_name)
+            return self._build_report(view_name, view) if view else None
+
+    def _write(self, view_name, report):
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            filename = re.sub(r'[^\w.-]', '_', view_name) + '.json'
+            path = os.path.join(self.report_dir, filename)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入查询报告失败: {view_name} {str(e)}")
+
+
+_report_store = None
+_report_store_lock = threading.Lock()
+
+
+def get_query_report_store():
+    """
+    获取进程内的报告汇总单例
+
+    Returns:
+        QueryReportStore
+    """
+    global _report_store
+    if _report_store is None:
+        with _report_store_lock:
+            if _report_store is None:
+                config = get_inspection_config()
+                _report_store = QueryReportStore(config['REPORT_DIR'], config['REPORT_INTERVAL'])
+    return _report_store
+
+
+class QueryInspectionTestMixin:
+    """
+    测试用例混入类，断言代码块中没有疑似N+1
+
+    示例:
+        with self.assertNoDuplicateQueries(threshold=5):
+            self.client.get(url)
+    """
+
+    @contextmanager
+    def assertNoDuplicateQueries(self, threshold=None):
+        threshold = threshold or get_inspection_config()['N_PLUS_ONE_THRESHOLD']
+        inspector = QueryInspector(n_plus_one_threshold=threshold, slow_query_ms=float('inf'))
+        with inspector.capture():
+            yield inspector
+
+        duplicates = inspector.get_duplicates()
+        if duplicates:
+            details = '\n'.join(
+                f"  {item['count']}次: {item['sql'][:300]}\n    调用位置: {' <- '.join(item['call_site'] or [])}"
+                for item in duplicates
+            )
+            self.fail(f"发现疑似N+1的SQL(阈值{threshold}次):\n{details}")
@@ -0,0 +1,112 @@
+"""
+大数据量导出工具
+- 按主键分批读取查询集，每批一次查询，内存占用与总行数无关
+- CSV逐行生成，配合StreamingHttpResponse在查询完成前开始输出
+- XLSX使用openpyxl的只写模式，行数据写入临时文件而不是保存在内存中
+"""
+import csv
+import datetime
+import tempfile
+
+from django.utils import timezone
+from openpyxl import Workbook
+
+# 以这些字符开头的单元格会被电子表格软件当作公式执行
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """
+    只返回写入内容的伪文件对象，供csv.writer逐行生成数据
+    """
+    def write(self, value):
+        return value
+
+
+def iter_queryset(queryset, batch_size=2000):
+    """
+    按主键倒序分批遍历查询集
+
+    每批通过 pk < 上一批最小主键 定位，不使用OFFSET，也不依赖数据库驱动的
+    服务端游标(MySQL驱动默认会把整个结果集读入内存)
+
+    Args:
+        queryset: values_list查询集，第一列必须为主键
+        batch_size: 每批读取的行数
+
+    Returns:
+        generator: 逐行返回查询结果
+    """
+    queryset = queryset.order_by('-pk')
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__lt=last_pk)
+        rows = list(batch[:batch_size])
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_pk = rows[-1][0]
+
+
+def format_cell(value):
+    """
+    转换单元格的值：时间转为本地时间，字符串转义公式前缀
+
+    Args:
+        value: 原始值
+
+    Returns:
+        可写入CSV/XLSX的值
+    """
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        # Excel不支持带时区的时间
+        return value.replace(tzinfo=None)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(header, rows):
+    """
+    逐行生成CSV内容
+
+    Args:
+        header: 表头
+        rows: 行数据的可迭代对象
+
+    Returns:
+        generator: 逐行返回CSV文本，首行带BOM以便Excel识别UTF-8
+    """
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([format_cell(value) for value in row])
+
+
+def write_xlsx(header, rows, title='Sheet1'):
+    """
+    使用只写模式生成XLSX文件
+
+    XLSX是zip格式，需要在全部行写入后才能生成文件，因此无法边查询边输出，
+    但只写模式下内存占用与行数无关
+
+    Args:
+        header: 表头
+        rows: 行数据的可迭代对象
+        title: 工作表名称
+
+    Returns:
+        file: 指向文件开头的临时文件，关闭后自动删除
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append([format_cell(value) for value in row])
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
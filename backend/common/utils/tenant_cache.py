@@ -0,0 +1,188 @@
+"""
+租户感知的缓存工具
+- 缓存键按租户ID划分命名空间
+- 模型版本戳：模型数据保存或删除后更新版本戳，包含旧版本戳的缓存键随之失效
+- cache_response装饰器缓存视图集list/retrieve等只读动作的响应数据
+"""
+import functools
+import hashlib
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# 响应缓存默认过期时间(秒)，模型变更时通过版本戳主动失效
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'TENANT_CACHE_TIMEOUT', 300)
+
+# 不属于任何租户的数据(tenant_id为空)的版本戳范围
+GLOBAL_SCOPE = 'global'
+# 跨租户视图(超级管理员、未指定租户)使用的版本戳范围，任意租户的数据变更都会更新
+ANY_SCOPE = 'any'
+
+
+def tenant_cache_key(tenant_id, *parts):
+    """
+    生成按租户划分命名空间的缓存键
+
+    Args:
+        tenant_id: 租户ID，None表示不限租户
+        parts: 键的其余部分
+
+    Returns:
+        str: 缓存键
+    """
+    scope = tenant_id if tenant_id is not None else ANY_SCOPE
+    return ':'.join(['tenant', str(scope)] + [str(part) for part in parts])
+
+
+def _version_key(model, scope):
+    return f"cache_version:{model._meta.label_lower}:{scope}"
+
+
+def _version_scopes(tenant_id):
+    """
+    租户视图依赖本租户及全局数据的版本戳，跨租户视图依赖ANY_SCOPE版本戳
+    """
+    if tenant_id is None:
+        return [ANY_SCOPE]
+    return [GLOBAL_SCOPE, tenant_id]
+
+
+def get_model_versions(models, tenant_id=None):
+    """
+    获取模型在租户范围内的版本戳，一次读取全部版本戳
+
+    Args:
+        models: 模型类列表
+        tenant_id: 租户ID，None表示跨租户
+
+    Returns:
+        list: 版本戳列表，顺序与models一致
+    """
+    keys = [_version_key(model, scope) for model in models for scope in _version_scopes(tenant_id)]
+    versions = cache.get_many(keys)
+
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        # 版本戳不过期，被淘汰时重新生成即可，旧缓存键不会再被读取
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model, tenant_id=None):
+    """
+    更新模型的版本戳，使依赖该模型的缓存失效
+
+    Args:
+        model: 模型类
+        tenant_id: 发生变更的数据所属租户ID，None表示全局数据
+    """
+    scope = tenant_id if tenant_id is not None else GLOBAL_SCOPE
+    cache.set_many({
+        _version_key(model, scope): uuid.uuid4().hex,
+        _version_key(model, ANY_SCOPE): uuid.uuid4().hex,
+    }, None)
+    logger.debug(f"缓存版本戳已更新: {model._meta.label_lower} tenant_id={tenant_id}")
+
+
+def _model_changed(sender, instance, **kwargs):
+    """
+    模型保存或删除后更新版本戳
+
+    在事务提交后执行，避免其他请求在提交前用旧数据重新填充缓存
+    """
+    tenant_id = getattr(instance, 'tenant_id', None)
+    transaction.on_commit(lambda: bump_model_version(sender, tenant_id))
+
+
+def register_cached_models(*models):
+    """
+    为模型注册版本戳信号，可重复调用
+
+    Args:
+        models: 模型类
+    """
+    for model in models:
+        dispatch_uid = f"tenant_cache:{model._meta.label_lower}"
+        post_save.connect(_model_changed, sender=model, dispatch_uid=dispatch_uid)
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=dispatch_uid)
+
+
+def get_request_scope(request):
+    """
+    获取请求的缓存范围
+
+    Args:
+        request: 请求对象
+
+    Returns:
+        (tenant_id, role): 租户ID和用户角色
+    """
+    user = getattr(request, 'user', None)
+    tenant_id = getattr(request, 'tenant_id', None)
+
+    if not user or not user.is_authenticated:
+        role = 'anonymous'
+    elif user.is_super_admin:
+        role = 'super_admin'
+    else:
+        role = 'admin' if user.is_admin else 'member'
+        # 非超级管理员只能访问自己租户的数据
+        tenant_id = tenant_id or user.tenant_id
+
+    if tenant_id is not None:
+        tenant_id = int(tenant_id)
+    return tenant_id, role
+
+
+def cache_response(models, timeout=None, vary_on_user=False, condition=None):
+    """
+    缓存视图集只读动作的响应数据
+
+    缓存键包含租户ID、用户角色、完整请求路径以及依赖模型的版本戳，
+    依赖模型保存或删除后缓存自动失效
+
+    Args:
+        models: 响应数据依赖的模型类列表
+        timeout: 过期时间(秒)，默认为TENANT_CACHE_TIMEOUT
+        vary_on_user: 响应是否因用户而异(例如按用户分配的数据)
+        condition: 可选函数，接收request，返回False时不使用缓存
+
+    Returns:
+        装饰器
+    """
+    models = tuple(models)
+    register_cached_models(*models)
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET' or (condition and not condition(request)):
+                return view_func(self, request, *args, **kwargs)
+
+            tenant_id, role = get_request_scope(request)
+            versions = get_model_versions(models, tenant_id)
+            user_part = request.user.pk if vary_on_user and request.user.is_authenticated else ''
+            digest = hashlib.md5(
+                '|'.join([request.get_full_path(), str(user_part)] + versions).encode('utf-8')
+            ).hexdigest()
+            key = tenant_cache_key(
+                tenant_id, 'response', self.__class__.__name__, view_func.__name__, role, digest
+            )
+
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view_func(self, request, *args, **kwargs)
+            if response.status_code == 200 and getattr(response, 'data', None) is not None:
+                cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+            return response
+        return wrapper
+    return decorator
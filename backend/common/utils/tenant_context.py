@@ -4,9 +4,12 @@
 import threading
 import logging
 
+from common.utils.hot_path_logging import get_hot_logger
+
 # 创建线程本地存储
 _thread_local = threading.local()
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
 
 def get_current_tenant():
     """
@@ -22,12 +25,14 @@ def set_current_tenant(tenant):
     设置当前线程的租户
     
     Args:
-        tenant: 租户对象，设置为None表示清除租户上下文
+        tenant: 租户对象(或惰性租户对象)，设置为None表示清除租户上下文
     """
-    if tenant:
-        logger.debug(f"设置当前租户: {tenant.name} (ID: {tenant.id})")
-    else:
-        logger.debug("清除当前租户上下文")
+    # tenant可能是惰性对象，只在需要输出调试日志时才解析
+    if hot_logger.isEnabledFor(logging.DEBUG):
+        if tenant:
+            hot_logger.debug("设置当前租户: %s (ID: %s)", tenant.name, tenant.id)
+        else:
+            hot_logger.debug("清除当前租户上下文")
     
     _thread_local.tenant = tenant
 
@@ -36,5 +41,5 @@ def clear_current_tenant():
     清除当前线程的租户上下文
     """
     if hasattr(_thread_local, 'tenant'):
-        logger.debug("清除当前租户上下文")
+        hot_logger.debug("清除当前租户上下文")
         del _thread_local.tenant 
\ No newline at end of file
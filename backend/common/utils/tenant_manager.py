@@ -3,9 +3,11 @@
 """
 import logging
 from django.db import models
+from common.utils.hot_path_logging import get_hot_logger
 from common.utils.tenant_context import get_current_tenant, set_current_tenant, clear_current_tenant
 
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
 
 class TenantManager(models.Manager):
     """
@@ -23,9 +25,9 @@ class TenantManager(models.Manager):
         
         if tenant:
             # 如果有租户上下文，则过滤结果
-            logger.debug(f"TenantManager: 过滤租户 {tenant.name} (ID: {tenant.id}) 的数据")
+            hot_logger.debug("TenantManager: 过滤租户 %s 的数据", tenant.pk)
             return queryset.filter(tenant=tenant)
         
         # 如果没有租户上下文（例如超级管理员访问），返回全部结果
-        logger.debug("TenantManager: 无租户上下文，返回全部数据")
+        hot_logger.debug("TenantManager: 无租户上下文，返回全部数据")
         return queryset 
\ No newline at end of file
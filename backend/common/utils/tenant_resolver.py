@@ -0,0 +1,182 @@
+"""
+租户解析缓存
+- 进程内缓存 租户ID -> 租户对象(含状态、名称和配额)，请求处理中不再逐次查询租户表
+- 每个条目记录缓存时租户的版本戳，版本戳存于共享缓存(settings.CACHES)；
+  租户或配额保存、删除后更新版本戳，所有进程下一次读取时发现版本不一致即重新加载，租户暂停立即生效
+- get_lazy_tenant返回惰性租户对象，只有访问其属性时才解析，只用到租户ID的请求不查询租户表
+"""
+import copy
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.TENANT_RESOLUTION 覆盖
+DEFAULT_TENANT_RESOLUTION_CONFIG = {
+    # 缓存条目过期时间(秒)，0表示不缓存
+    'TIMEOUT': 60,
+    # 每个进程最多缓存的租户数量，超出后淘汰最久未使用的条目
+    'MAX_ENTRIES': 1000,
+}
+
+
+def get_tenant_resolution_config():
+    """
+    获取合并了默认值的租户解析配置
+
+    Returns:
+        dict: 租户解析配置
+    """
+    config = dict(DEFAULT_TENANT_RESOLUTION_CONFIG)
+    config.update(getattr(settings, 'TENANT_RESOLUTION', {}) or {})
+    return config
+
+
+def _version_key(tenant_id):
+    return f"tenant_resolution:version:{tenant_id}"
+
+
+def _get_version(tenant_id):
+    """
+    获取租户当前版本戳，不存在时生成新的版本戳
+    """
+    version = cache.get(_version_key(tenant_id))
+    if version is None:
+        version = uuid.uuid4().hex
+        # 版本戳不过期，被淘汰时重新生成即可，各进程的旧条目随之失效
+        cache.set(_version_key(tenant_id), version, None)
+    return version
+
+
+class TenantRegistry:
+    """
+    进程内的租户缓存
+
+    缓存不存在的租户ID(值为None)，避免无效的X-Tenant-ID反复查询数据库；
+    返回的是缓存对象的副本，调用方修改不会影响其他请求；
+    每次读取比较共享缓存中的版本戳，其他进程使租户失效后本进程立即重新加载
+    """
+
+    def __init__(self, timeout=60, max_entries=1000):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, tenant_id):
+        """
+        获取租户，已预加载配额
+
+        Args:
+            tenant_id: 租户ID(整数或数字字符串)
+
+        Returns:
+            Tenant对象，不存在时返回None
+        """
+        tenant_id = int(tenant_id)
+        if not self.timeout:
+            return self._load(tenant_id)
+
+        now = time.monotonic()
+        version = _get_version(tenant_id)
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                self._entries.move_to_end(tenant_id)
+                tenant = entry[2]
+                return copy.deepcopy(tenant) if tenant is not None else None
+
+        tenant = self._load(tenant_id)
+        with self._lock:
+            self._entries[tenant_id] = (now + self.timeout, version, tenant)
+            self._entries.move_to_end(tenant_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return copy.deepcopy(tenant) if tenant is not None else None
+
+    def _load(self, tenant_id):
+        from tenants.models import Tenant
+
+        return Tenant.objects.select_related('quota').filter(pk=tenant_id).first()
+
+    def invalidate(self, tenant_id=None):
+        """
+        使租户的缓存条目失效，更新共享的版本戳使所有进程的条目失效
+
+        Args:
+            tenant_id: 租户ID，None表示清空本进程的全部条目
+        """
+        if tenant_id is not None:
+            cache.set(_version_key(int(tenant_id)), uuid.uuid4().hex, None)
+        with self._lock:
+            if tenant_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(tenant_id), None)
+        logger.debug(f"租户解析缓存已失效: tenant_id={tenant_id}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_tenant_registry():
+    """
+    获取进程内的租户缓存单例
+
+    Returns:
+        TenantRegistry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = get_tenant_resolution_config()
+                _registry = TenantRegistry(config['TIMEOUT'], config['MAX_ENTRIES'])
+    return _registry
+
+
+def get_cached_tenant(tenant_id):
+    """
+    通过进程内缓存获取租户
+
+    Args:
+        tenant_id: 租户ID
+
+    Returns:
+        Tenant对象或None
+    """
+    return get_tenant_registry().get(tenant_id)
+
+
+def get_lazy_tenant(tenant_id):
+    """
+    获取惰性租户对象，第一次访问属性时才通过缓存解析
+
+    租户不存在时解析结果为None，惰性对象的布尔值为False，
+    因此应使用 if request.tenant 而不是 is None 判断
+
+    Args:
+        tenant_id: 租户ID
+
+    Returns:
+        SimpleLazyObject
+    """
+    return SimpleLazyObject(lambda: get_cached_tenant(tenant_id))
+
+
+def invalidate_cached_tenant(tenant_id=None):
+    """
+    使租户的缓存失效，所有进程生效
+
+    Args:
+        tenant_id: 租户ID，None表示清空本进程的全部条目
+    """
+    get_tenant_registry().invalidate(tenant_id)
@@ -1,13 +1,20 @@
 from django.shortcuts import render
+import datetime
 import logging
+import os
 from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import generics, status, serializers
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, inline_serializer
 from common.permissions import IsSuperAdminUser, IsAdminUser
 from common.models import APILog
 from common.serializers import APILogSerializer, APILogDetailSerializer
+from common.utils.profiling import get_profile_aggregator, get_profiling_config
+from common.utils.streaming_export import iter_queryset, stream_csv, write_xlsx
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 
@@ -20,6 +27,8 @@ class APILogListView(generics.ListAPIView):
     """
     serializer_class = APILogSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    # 支持mode=cursor游标分页，按(created_at, id)定位
+    cursor_ordering = ('-created_at', '-id')
     
     @extend_schema(
         parameters=[
@@ -104,14 +113,18 @@ class APILogListView(generics.ListAPIView):
                 Q(user__username__icontains=search)
             )
         
-        # 日期范围过滤
-        start_date = params.get('start_date')
+        # 日期范围过滤，转换为created_at的时间范围以使用索引
+        try:
+            start_date = datetime.date.fromisoformat(params['start_date']) if params.get('start_date') else None
+            end_date = datetime.date.fromisoformat(params['end_date']) if params.get('end_date') else None
+        except ValueError:
+            raise ValidationError({"detail": "日期格式无效，应为YYYY-MM-DD"})
+        
         if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
+            queryset = queryset.filter(created_at__gte=self._day_start(start_date))
         
-        end_date = params.get('end_date')
         if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
+            queryset = queryset.filter(created_at__lt=self._day_start(end_date + datetime.timedelta(days=1)))
         
         # 状态类型过滤
         status_type = params.get('status_type')
@@ -131,6 +144,13 @@ class APILogListView(generics.ListAPIView):
         
         return queryset
     
+    @staticmethod
+    def _day_start(day):
+        """
+        获取某一天在当前时区下的开始时间
+        """
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    
     def list(self, request, *args, **kwargs):
         """
         重写列表方法，自定义响应格式
@@ -154,6 +174,78 @@ class APILogListView(generics.ListAPIView):
         })
 
 
+class APILogExportView(APILogListView):
+    """
+    API日志导出视图
+    使用与列表相同的权限和过滤条件，以CSV或XLSX格式导出全部匹配的日志
+    """
+    # 导出的列: (字段, 表头)，第一列必须为主键
+    export_fields = (
+        ('id', 'ID'),
+        ('created_at', '创建时间'),
+        ('tenant__name', '租户'),
+        ('user__username', '用户'),
+        ('ip_address', 'IP地址'),
+        ('request_method', '请求方法'),
+        ('request_path', '请求路径'),
+        ('view_name', '视图名称'),
+        ('status_code', '状态码'),
+        ('status_type', '状态类型'),
+        ('response_time', '响应时间(ms)'),
+        ('error_message', '错误信息'),
+        ('user_agent', '用户代理'),
+    )
+    export_formats = ('csv', 'xlsx')
+    # 每批查询的行数
+    export_batch_size = 2000
+
+    @extend_schema(
+        parameters=[
+            {
+                'name': 'export_format',
+                'type': 'string',
+                'description': '导出格式 (csv/xlsx)，默认csv'
+            }
+        ],
+        responses={200: OpenApiResponse(description='CSV或XLSX文件')},
+        description="导出API日志，支持与日志列表相同的筛选条件",
+        summary="导出API日志",
+        tags=["系统", "日志"]
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        导出API日志
+
+        CSV逐批查询、逐行输出，首批数据查询完成后即开始响应；
+        XLSX在全部行写入临时文件后输出
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in self.export_formats:
+            return Response({
+                'success': False,
+                'code': 4000,
+                'message': f'不支持的导出格式: {export_format}',
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = [field for field, _ in self.export_fields]
+        header = [label for _, label in self.export_fields]
+        rows = iter_queryset(self.get_queryset().values_list(*fields), self.export_batch_size)
+        filename = f"api_logs_{timezone.localtime():%Y%m%d_%H%M%S}.{export_format}"
+
+        if export_format == 'xlsx':
+            return FileResponse(
+                write_xlsx(header, rows, title='API日志'),
+                as_attachment=True,
+                filename=filename,
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+
+        response = StreamingHttpResponse(stream_csv(header, rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class APILogDetailView(generics.RetrieveAPIView):
     """
     API日志详情视图
@@ -200,6 +292,45 @@ class APILogDetailView(generics.RetrieveAPIView):
             'data': serializer.data
         })
 
+class RequestProfilingView(APIView):
+    """
+    请求性能数据视图
+    查看本进程按视图汇总的请求耗时分布，仅超级管理员可用
+    """
+    permission_classes = [IsAuthenticated, IsSuperAdminUser]
+    
+    @extend_schema(
+        responses={200: OpenApiResponse(description='按视图汇总的请求性能数据')},
+        description="获取按视图汇总的SQL次数、序列化、渲染、中间件耗时及总耗时分布(仅当前进程)",
+        summary="获取请求性能数据",
+        tags=["系统"]
+    )
+    def get(self, request):
+        """
+        获取按视图汇总的请求性能数据
+        """
+        config = get_profiling_config()
+        return Response({
+            'enabled': config['ENABLED'],
+            'sample_rate': config['SAMPLE_RATE'],
+            'pid': os.getpid(),
+            'views': get_profile_aggregator().snapshot(),
+        })
+    
+    @extend_schema(
+        responses={204: None},
+        description="清空当前进程的请求性能数据",
+        summary="清空请求性能数据",
+        tags=["系统"]
+    )
+    def delete(self, request):
+        """
+        清空请求性能数据
+        """
+        get_profile_aggregator().reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 # 定义测试用序列化器
 class TestStandardResponseSerializer(serializers.Serializer):
     message = serializers.CharField(help_text="测试消息")
@@ -5,7 +5,10 @@ import logging
 from rest_framework import viewsets
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
+from common.utils.hot_path_logging import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
 
 class TenantModelViewSet(viewsets.ModelViewSet):
     """
@@ -32,12 +35,12 @@ class TenantModelViewSet(viewsets.ModelViewSet):
         # 如果用户是超级管理员且未指定租户ID，则可以查看所有数据
         user = getattr(self.request, 'user', None)
         if user and getattr(user, 'is_super_admin', False) and not tenant_id:
-            logger.debug("超级管理员访问，不过滤租户")
+            hot_logger.debug("超级管理员访问，不过滤租户")
             return queryset
             
         # 如果模型有tenant字段且有租户ID，则按租户过滤
         if tenant_id and hasattr(queryset.model, 'tenant'):
-            logger.debug(f"按租户ID过滤查询集: {tenant_id}")
+            hot_logger.debug("按租户ID过滤查询集: %s", tenant_id)
             try:
                 # 确保租户ID是整数
                 tenant_id = int(tenant_id)
@@ -58,7 +61,7 @@ class TenantModelViewSet(viewsets.ModelViewSet):
         
         # 如果模型有tenant字段且有租户ID，则自动设置
         if tenant_id and hasattr(serializer.Meta.model, 'tenant'):
-            logger.debug(f"创建对象时设置租户ID: {tenant_id}")
+            hot_logger.debug("创建对象时设置租户ID: %s", tenant_id)
             try:
                 # 确保租户ID是整数
                 tenant_id = int(tenant_id)
@@ -109,7 +112,7 @@ class TenantModelViewSet(viewsets.ModelViewSet):
             PermissionDenied: 如果对象不属于当前租户
         """
         # 如果对象没有tenant字段，则跳过验证
-        if not hasattr(obj, 'tenant'):
+        if not hasattr(obj, 'tenant_id'):
             return
             
         # 获取当前租户ID
@@ -126,7 +129,7 @@ class TenantModelViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("无法操作对象: 未提供租户ID")
             
         # 验证对象所属租户与当前租户ID是否匹配
-        obj_tenant_id = str(obj.tenant.id) if obj.tenant else None
+        obj_tenant_id = str(obj.tenant_id) if obj.tenant_id else None
         if obj_tenant_id and obj_tenant_id != tenant_id:
             logger.warning(f"尝试操作不属于当前租户的对象: 对象租户ID={obj_tenant_id}, 当前租户ID={tenant_id}")
             raise PermissionDenied("无法操作不属于当前租户的对象") 
\ No newline at end of file
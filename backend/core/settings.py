@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 import datetime
 import pymysql
@@ -35,6 +37,9 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-w7&3bzjc1s*bty@)%c3w&#fro!
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 
+# 是否在运行测试(manage.py test)，测试时默认关闭后台线程写入，避免在测试事务之外写测试数据库
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # 从环境变量读取ALLOWED_HOSTS，并添加espressox.online
 allowed_hosts_from_env = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 ALLOWED_HOSTS = allowed_hosts_from_env + ['espressox.online']
@@ -68,6 +73,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 请求性能分析中间件(REQUEST_PROFILING未启用时不加载)，放在第一位以统计其他中间件的耗时
+    'common.middleware.profiling_middleware.RequestProfilingMiddleware',
+    # SQL查询检查中间件(QUERY_INSPECTION未启用时不加载)，发现疑似N+1和慢查询
+    'common.middleware.query_inspection_middleware.QueryInspectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -120,11 +129,48 @@ DATABASES = {
             'use_unicode': True,
             'init_command': "SET NAMES 'utf8mb4' COLLATE 'utf8mb4_unicode_ci'",
             'autocommit': True,
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '10')),
         },
+        # 持久连接：同一线程在CONN_MAX_AGE秒内复用连接，避免每个请求重新建立连接并执行init_command
+        # 0表示每个请求结束后关闭连接，None表示不限时复用
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        # 复用连接前检查连接是否可用，避免MySQL wait_timeout断开后首个查询失败
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
     }
 }
 
 
+# 缓存配置
+# locmem: 进程内缓存，各worker互不共享；file: 基于文件的缓存，同一主机的worker共享
+# 文件缓存默认放在系统临时目录，不写入代码目录
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'file')
+if CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'integrated-project',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'integrated-project-cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# 租户响应缓存默认过期时间(秒)，依赖的模型变更时通过版本戳主动失效
+TENANT_CACHE_TIMEOUT = int(os.getenv('TENANT_CACHE_TIMEOUT', '300'))
+
+# 租户解析缓存(进程内，租户ID -> 租户及配额)，租户保存后通过共享缓存中的版本戳使所有进程的条目立即失效
+TENANT_RESOLUTION = {
+    'TIMEOUT': int(os.getenv('TENANT_RESOLUTION_TIMEOUT', '60')),
+    'MAX_ENTRIES': 1000,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -197,12 +243,17 @@ REST_FRAMEWORK = {
     ),
 }
 
+# StandardJSONRenderer的JSON序列化后端: auto(安装了orjson时使用orjson) / orjson / stdlib
+JSON_RENDERER_BACKEND = os.getenv('JSON_RENDERER_BACKEND', 'auto')
+
 # JWT 设置
 JWT_AUTH = {
     'JWT_SECRET_KEY': SECRET_KEY,
     'JWT_ALGORITHM': 'HS256',
     'JWT_EXPIRATION_DELTA': 24 * 3600,  # 24小时有效期
     'JWT_REFRESH_EXPIRATION_DELTA': 7 * 24 * 3600,  # 7天刷新期
+    # 认证主体(用户及租户)缓存时间(秒)，0表示不缓存
+    'PRINCIPAL_CACHE_TIMEOUT': int(os.getenv('JWT_PRINCIPAL_CACHE_TIMEOUT', '60')),
 }
 
 # CORS 设置
@@ -263,6 +314,47 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# API日志异步批量写入配置
+# 日志先进入有界内存队列，由后台线程批量写入common_api_log
+API_LOG_WRITER = {
+    'ENABLED': os.getenv('API_LOG_ASYNC', 'False' if TESTING else 'True').lower() == 'true',
+    'MAX_QUEUE_SIZE': int(os.getenv('API_LOG_QUEUE_SIZE', '10000')),
+    'BATCH_SIZE': int(os.getenv('API_LOG_BATCH_SIZE', '200')),
+    'FLUSH_INTERVAL': float(os.getenv('API_LOG_FLUSH_INTERVAL', '2.0')),
+    # 队列满时的背压策略: drop / sample / block
+    'OVERFLOW_POLICY': os.getenv('API_LOG_OVERFLOW_POLICY', 'drop'),
+    'SAMPLE_RATE': 0.1,
+    'SAMPLE_HIGH_WATERMARK': 0.8,
+    'BLOCK_TIMEOUT': 0.5,
+}
+
+# 请求性能分析配置
+# 启用后按采样比例记录SQL、序列化、渲染和中间件耗时，添加Server-Timing响应头，
+# 并按视图汇总，超级管理员可通过 /api/v1/common/profiling/ 查看
+REQUEST_PROFILING = {
+    'ENABLED': os.getenv('REQUEST_PROFILING', 'False').lower() == 'true',
+    'SAMPLE_RATE': float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', '0.05')),
+    'SERVER_TIMING': os.getenv('REQUEST_PROFILING_SERVER_TIMING', 'True').lower() == 'true',
+    'HISTOGRAM_BUCKETS': [10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    'MAX_VIEWS': 500,
+}
+
+# API日志内容记录策略
+# 错误响应的响应体全部记录，成功响应按比例采样；超过大小上限的内容只保留截断预览；敏感字段脱敏
+API_LOGGING = {
+    # 记录日志的路径前缀和排除的路径前缀(排除优先)，启动时编译为一个正则表达式
+    'INCLUDE_PATHS': ['/api/'],
+    'EXCLUDE_PATHS': ['/api/v1/schema/', '/api/v1/docs/', '/api/v1/redoc/', '/api/v1/health/'],
+    'LOG_REQUEST_BODY': os.getenv('API_LOG_REQUEST_BODY', 'True').lower() == 'true',
+    # 响应体记录模式: all / errors / none
+    'RESPONSE_BODY_MODE': os.getenv('API_LOG_RESPONSE_BODY_MODE', 'errors'),
+    'RESPONSE_BODY_SAMPLE_RATE': float(os.getenv('API_LOG_RESPONSE_BODY_SAMPLE_RATE', '0.01')),
+    # 按路径前缀和状态码覆盖采样比例，例如 {'path': '/api/v1/auth/', 'sample_rate': 0}
+    'RESPONSE_BODY_RULES': [],
+    'MAX_BODY_BYTES': int(os.getenv('API_LOG_MAX_BODY_BYTES', '4096')),
+    'SENSITIVE_FIELDS': ['password', 'token', 'secret', 'authorization', 'api_key', 'credential'],
+}
+
 # 是否启用debug日志文件记录
 DEBUG_LOG_ENABLED = True
 
@@ -271,6 +363,60 @@ LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 if not os.path.exists(LOGS_DIR):
     os.makedirs(LOGS_DIR)
 
+# 文章访问日志缓冲写入配置
+# 阅读事件先追加到本地spool文件，由后台线程批量写入cms_access_log，进程重启后由spool恢复
+CMS_ACCESS_LOG_BUFFER = {
+    'ENABLED': os.getenv('CMS_ACCESS_LOG_ASYNC', 'False' if TESTING else 'True').lower() == 'true',
+    'SPOOL_DIR': os.getenv('CMS_ACCESS_LOG_SPOOL_DIR', os.path.join(LOGS_DIR, 'access_log_spool')),
+    'BATCH_SIZE': int(os.getenv('CMS_ACCESS_LOG_BATCH_SIZE', '500')),
+    'FLUSH_INTERVAL': float(os.getenv('CMS_ACCESS_LOG_FLUSH_INTERVAL', '2.0')),
+    'STALE_SEGMENT_AGE': 60,
+    'MAX_SEGMENT_ATTEMPTS': 5,
+}
+
+# 文章版本存储配置
+# 每隔SNAPSHOT_INTERVAL个版本保存一次完整内容，其余版本保存相对上一版本的差异
+CMS_ARTICLE_VERSIONING = {
+    'SNAPSHOT_INTERVAL': int(os.getenv('CMS_ARTICLE_VERSION_SNAPSHOT_INTERVAL', '20')),
+    'MAX_DELTA_RATIO': 0.5,
+}
+
+# 文章全文检索配置
+# 倒排索引在文章保存后更新，修改FIELD_WEIGHTS后需执行 python manage.py rebuild_search_index
+CMS_SEARCH = {
+    'FIELD_WEIGHTS': {'title': 10, 'excerpt': 3, 'content': 1},
+    'MAX_CANDIDATES': int(os.getenv('CMS_SEARCH_MAX_CANDIDATES', '1000')),
+    'MAX_QUERY_TOKENS': 16,
+    'SNIPPET_LENGTH': 120,
+}
+
+# SQL查询检查配置
+# 同一请求中结构相同的SQL执行次数达到阈值时视为疑似N+1，超过阈值的SQL记为慢查询，
+# 按视图写入 logs/query_reports/<视图名称>.json
+QUERY_INSPECTION = {
+    'ENABLED': os.getenv('QUERY_INSPECTION', 'False').lower() == 'true',
+    'SAMPLE_RATE': float(os.getenv('QUERY_INSPECTION_SAMPLE_RATE', '0.05')),
+    'N_PLUS_ONE_THRESHOLD': int(os.getenv('QUERY_INSPECTION_N_PLUS_ONE_THRESHOLD', '10')),
+    'SLOW_QUERY_MS': int(os.getenv('QUERY_INSPECTION_SLOW_QUERY_MS', '200')),
+    'STACK_DEPTH': 5,
+    'REPORT_DIR': os.path.join(LOGS_DIR, 'query_reports'),
+    'REPORT_INTERVAL': 60,
+}
+
+# API日志保留配置
+# 超过保留天数的日志由 archive_api_logs 命令按天、按租户归档为JSONL.gz文件后从数据库删除
+API_LOG_RETENTION = {
+    'DAYS': int(os.getenv('API_LOG_RETENTION_DAYS', '90')),
+    'ARCHIVE_DIR': os.getenv('API_LOG_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archives', 'api_logs')),
+    'BATCH_SIZE': int(os.getenv('API_LOG_ARCHIVE_BATCH_SIZE', '1000')),
+}
+
+# 热路径日志(租户中间件、租户管理器、视图集基类等)的按模块采样比例，按logger名称最长前缀匹配，
+# 只影响DEBUG/INFO级别，例如 {'common.utils.tenant_manager': 0.01}
+HOT_PATH_LOGGING = {
+    'SAMPLE_RATES': {},
+}
+
 # 日志配置
 LOGGING = {
     'version': 1,
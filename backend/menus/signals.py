@@ -0,0 +1,8 @@
+"""
+菜单系统信号处理器
+"""
+from common.utils.tenant_cache import register_cached_models
+from .models import Menu, UserMenu
+
+# 菜单或用户菜单变更时更新缓存版本戳，使菜单树缓存失效
+register_cached_models(Menu, UserMenu)
@@ -1,3 +1,43 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from common.utils.tenant_cache import get_model_versions
+from menus.models import Menu, UserMenu
+from users.models import User
+
+
+class AdminMenuAssignTestCase(TestCase):
+    """
+    管理员菜单分配测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        self.super_admin = User.objects.create_user(
+            username='super', email='super@example.com', password='password123', is_super_admin=True
+        )
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password123', is_admin=True
+        )
+        self.menus = [Menu.objects.create(name=f'菜单{index}', code=f'menu-{index}') for index in range(2)]
+        for menu in self.menus:
+            UserMenu.objects.create(user=self.admin, menu=menu)
+
+    def test_assign_disables_other_menus_and_invalidates_cache(self):
+        """
+        测试分配菜单时禁用不在列表中的菜单，批量更新后菜单缓存失效
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.super_admin)
+        before = get_model_versions([UserMenu])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                reverse('menus:admin-menu-list', kwargs={'user_id': self.admin.id}),
+                {'menu_ids': [self.menus[0].id]}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(UserMenu.objects.get(user=self.admin, menu=self.menus[1]).is_active)
+        self.assertNotEqual(get_model_versions([UserMenu]), before)
@@ -9,6 +9,7 @@ from rest_framework.decorators import action
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample, OpenApiResponse
 
 from common.permissions import IsAdmin
+from common.utils.tenant_cache import bump_model_version
 from menus.models import UserMenu, Menu
 from menus.serializers import (
     UserMenuDetailSerializer,
@@ -217,6 +218,8 @@ class AdminMenuViewSet(mixins.ListModelMixin,
         with transaction.atomic():
             # 首先禁用不在当前列表中的所有菜单
             UserMenu.objects.filter(user=user).exclude(menu_id__in=menu_ids).update(is_active=False)
+            # update()不发送post_save信号，手动使菜单缓存失效(UserMenu没有租户字段，按全局数据处理)
+            transaction.on_commit(lambda: bump_model_version(UserMenu))
             
             # 然后添加或激活请求中的菜单
             for menu in menus:
@@ -9,6 +9,7 @@ from rest_framework.decorators import action
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
 from common.permissions import IsAdmin, IsSuperAdmin
+from common.utils.tenant_cache import cache_response
 from menus.models import Menu, UserMenu
 from menus.serializers import MenuSerializer, MenuTreeSerializer
 
@@ -151,6 +152,7 @@ class MenuViewSet(viewsets.ModelViewSet):
         responses={200: MenuTreeSerializer(many=True)}
     )
     @action(detail=False, methods=['get'], url_path='tree')
+    @cache_response(models=(Menu, UserMenu), vary_on_user=True)
     def tree(self, request):
         """
         获取菜单树形结构
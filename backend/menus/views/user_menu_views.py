@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiResponse
 
+from common.utils.tenant_cache import cache_response
 from menus.models import Menu, UserMenu
 from menus.serializers import MenuTreeSerializer
 
@@ -115,6 +116,7 @@ class UserMenuViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
             parent__isnull=True
         )
     
+    @cache_response(models=(Menu, UserMenu), vary_on_user=True)
     def list(self, request, *args, **kwargs):
         """
         获取当前用户的菜单
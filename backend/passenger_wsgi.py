@@ -11,8 +11,8 @@ sys.path.insert(0, CURRENT_DIR)
 # 设置Django设置模块
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-# 设置pymysql选项
-pymysql.connect_timeout = 30
+# 使用pymysql代替mysqlclient
+# 连接超时和持久连接通过settings.DATABASES配置(DB_CONNECT_TIMEOUT、DB_CONN_MAX_AGE)
 pymysql.install_as_MySQLdb()
 
 # 应用程序对象
@@ -0,0 +1,37 @@
+"""
+租户系统信号处理器
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.authentication.principal_cache import invalidate_tenant_principals
+from common.utils.tenant_resolver import invalidate_cached_tenant
+from .models import Tenant, TenantQuota
+
+
+@receiver(post_save, sender=Tenant)
+def tenant_changed(sender, instance, created, **kwargs):
+    """
+    租户保存后使其下所有用户的认证主体缓存失效
+
+    缓存的用户对象包含租户状态，租户暂停、激活或删除后需要重新加载
+    """
+    if created:
+        return
+    tenant_id = instance.pk
+    transaction.on_commit(lambda: invalidate_tenant_principals(tenant_id))
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=TenantQuota)
+@receiver(post_delete, sender=TenantQuota)
+def tenant_resolution_changed(sender, instance, **kwargs):
+    """
+    租户或配额变更后使进程内的租户解析缓存失效
+
+    新建租户也需要失效，之前可能缓存了该ID不存在的结果
+    """
+    tenant_id = instance.pk if sender is Tenant else instance.tenant_id
+    transaction.on_commit(lambda: invalidate_cached_tenant(tenant_id))
@@ -1,9 +1,12 @@
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from users.models import User
 from tenants.models import Tenant, TenantQuota
+from common.middleware.tenant_middleware import TenantMiddleware
+from common.utils.tenant_resolver import TenantRegistry, invalidate_cached_tenant
 
 class TenantPermissionTestCase(TestCase):
     """
@@ -150,3 +153,64 @@ class TenantPermissionTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         response = self.client.get(other_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TenantResolutionTestCase(TestCase):
+    """
+    租户解析缓存和惰性request.tenant测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        invalidate_cached_tenant()
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.middleware = TenantMiddleware(lambda request: None)
+        self.factory = RequestFactory()
+
+    def _process(self):
+        request = self.factory.get('/api/v1/cms/articles/', HTTP_X_TENANT_ID=str(self.tenant.id))
+        request.user = AnonymousUser()
+        self.middleware.process_request(request)
+        return request
+
+    def test_header_only_request_is_lazy_and_cached(self):
+        """
+        测试只用到租户ID的请求不查询租户表，解析结果在进程内缓存
+        """
+        with self.assertNumQueries(0):
+            request = self._process()
+        self.assertEqual(request.tenant_id, str(self.tenant.id))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(request.tenant.name, '测试租户')
+            self.assertEqual(request.tenant.quota.max_users, 10)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._process().tenant.status, 'active')
+
+    def test_tenant_save_invalidates_cache(self):
+        """
+        测试租户保存后缓存失效
+        """
+        self.assertEqual(self._process().tenant.status, 'active')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tenant.status = 'suspended'
+            self.tenant.save()
+
+        self.assertEqual(self._process().tenant.status, 'suspended')
+
+    def test_invalidation_reaches_other_processes(self):
+        """
+        测试其他进程(另一个TenantRegistry)使租户失效后，本进程的缓存条目不再使用
+        """
+        registry = TenantRegistry()
+        self.assertEqual(registry.get(self.tenant.id).status, 'active')
+
+        Tenant.objects.filter(pk=self.tenant.pk).update(status='suspended')
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get(self.tenant.id).status, 'active')
+
+        TenantRegistry().invalidate(self.tenant.id)
+        self.assertEqual(registry.get(self.tenant.id).status, 'suspended')
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        """
+        应用准备就绪时的回调函数
+        """
+        # 导入信号处理器
+        import users.signals
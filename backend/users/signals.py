@@ -0,0 +1,22 @@
+"""
+用户系统信号处理器
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from common.authentication.principal_cache import invalidate_principal
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    用户保存或删除后使其认证主体缓存失效
+
+    覆盖状态变更、软删除、修改密码等所有通过save()完成的修改，
+    在事务提交后执行，避免其他请求在提交前用旧数据重新填充缓存
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_principal(user_id))
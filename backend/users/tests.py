@@ -1,3 +1,79 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+from users.models import User
+from tenants.models import Tenant
+from common.authentication.jwt_auth import JWTAuthentication, generate_jwt_token
+from common.authentication.principal_cache import _get_version, _principal_key
 
-# Create your tests here.
+
+class PrincipalCacheTestCase(TestCase):
+    """
+    JWT认证主体缓存测试
+    """
+    def setUp(self):
+        """
+        测试准备
+        """
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='测试租户', code='test', status='active')
+        self.user = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='password123',
+            tenant=self.tenant
+        )
+        token = generate_jwt_token(self.user)['access_token']
+        self.request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.auth = JWTAuthentication()
+
+    def test_warm_cache_needs_no_queries(self):
+        """
+        测试缓存命中时认证不查询数据库
+        """
+        with self.assertNumQueries(1):
+            self.auth.authenticate(self.request)
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate(self.request)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.tenant.name, self.tenant.name)
+
+    def test_cache_omits_password_hash(self):
+        """
+        测试缓存中不保存密码哈希，需要时从数据库延迟加载
+        """
+        self.auth.authenticate(self.request)
+        cached = cache.get(_principal_key(self.user.pk, _get_version(self.user.pk)))
+        self.assertNotIn('password', cached['user'])
+        self.assertEqual(cached['tenant']['name'], self.tenant.name)
+
+        user, _ = self.auth.authenticate(self.request)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('password123'))
+
+    def test_user_change_invalidates_cache(self):
+        """
+        测试用户状态变更后缓存失效
+        """
+        self.auth.authenticate(self.request)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.status = 'suspended'
+            self.user.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate(self.request)
+
+    def test_tenant_suspend_invalidates_cache(self):
+        """
+        测试租户暂停后缓存失效
+        """
+        self.auth.authenticate(self.request)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tenant.status = 'suspended'
+            self.tenant.save(update_fields=['status', 'updated_at'])
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate(self.request)